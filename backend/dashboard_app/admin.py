@@ -4,7 +4,8 @@ from django.utils import timezone
 from django.contrib import messages
 from .models import (
     Customer, BatchJob, VolumetricData, SLAData, 
-    BatchSchedule, FileUpload, AccountRequest, SLADefinition,
+    BatchSchedule, FileUpload, ProcessingTask, ColumnMapping, WatchedFile, ChunkedUpload, AccountRequest, SLADefinition,
+    SLAAnalysisWatermark, SLARecomputeRequest, SLAAtRiskRun,
     PredictionModel, PredictionResult, HistoricalPattern, PredictionAlert
 )
 
@@ -209,6 +210,35 @@ class SLADataAdmin(admin.ModelAdmin):
         return False  # SLA data is auto-generated, not manually editable
 
 
+@admin.register(SLAAnalysisWatermark)
+class SLAAnalysisWatermarkAdmin(admin.ModelAdmin):
+    """Admin configuration for incremental SLA analysis; delete a watermark to analyze that customer and product in full again"""
+    list_display = ['customer', 'product', 'analyzed_through', 'updated_at']
+    list_filter = ['product', 'customer']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(SLARecomputeRequest)
+class SLARecomputeRequestAdmin(admin.ModelAdmin):
+    """Admin configuration for jobs waiting for SLA recomputation after their SLA definition changed"""
+    list_display = ['customer', 'product', 'job_name', 'requested_at']
+    list_filter = ['product']
+    search_fields = ['job_name']
+    readonly_fields = ['requested_at']
+
+
+@admin.register(SLAAtRiskRun)
+class SLAAtRiskRunAdmin(admin.ModelAdmin):
+    """Admin configuration for in-flight runs projected to miss their SLA; rebuilt by evaluate_sla_risk"""
+    list_display = ['job_name', 'customer', 'product', 'job_status', 'risk_level', 'sla_deadline', 'projected_completion', 'evaluated_at']
+    list_filter = ['risk_level', 'product', 'customer']
+    search_fields = ['job_name', 'customer__name']
+    ordering = ['sla_deadline']
+
+    def has_add_permission(self, request):
+        return False  # Runs at risk are evaluated, not entered
+
+
 @admin.register(BatchSchedule)
 class BatchScheduleAdmin(admin.ModelAdmin):
     """Admin configuration for BatchSchedule model"""
@@ -241,10 +271,11 @@ class BatchScheduleAdmin(admin.ModelAdmin):
 @admin.register(FileUpload)
 class FileUploadAdmin(admin.ModelAdmin):
     """Admin configuration for FileUpload model"""
-    list_display = ['file_name', 'customer', 'file_type', 'file_size_mb', 'processed', 'upload_date']
-    list_filter = ['file_type', 'processed', 'customer', 'upload_date']
+    list_display = ['file_name', 'customer', 'file_type', 'file_size_mb', 'status', 'processed', 'upload_date']
+    list_filter = ['file_type', 'status', 'processed', 'customer', 'upload_date']
     search_fields = ['file_name', 'customer__name', 'uploaded_by__username']
-    readonly_fields = ['file_size', 'upload_date']
+    readonly_fields = ['file_size', 'content_hash', 'upload_date', 'stage', 'rows_total', 'rows_read', 'rows_written',
+                       'processing_started_at', 'processing_finished_at']
     date_hierarchy = 'upload_date'
     ordering = ['-upload_date']
     
@@ -260,17 +291,53 @@ class FileUploadAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('File Information', {
-            'fields': ('customer', 'file_type', 'file_name', 'file_path')
+            'fields': ('customer', 'product', 'file_type', 'file_name', 'file_path')
         }),
         ('Processing', {
-            'fields': ('processed', 'processing_log')
+            'fields': ('processed', 'processing_log', 'status', 'stage', 'rows_total', 'rows_read',
+                       'rows_written', 'processing_started_at', 'processing_finished_at')
         }),
         ('Metadata', {
-            'fields': ('uploaded_by', 'upload_date', 'file_size')
+            'fields': ('uploaded_by', 'upload_date', 'file_size', 'content_hash')
         }),
     )
 
 
+@admin.register(ColumnMapping)
+class ColumnMappingAdmin(admin.ModelAdmin):
+    """Admin configuration for cached column mappings; delete an entry to force re-matching"""
+    list_display = ['customer', 'file_type', 'header_signature', 'hit_count', 'last_used_at']
+    list_filter = ['file_type', 'customer']
+    readonly_fields = ['header_signature', 'header', 'positions', 'missing_columns', 'hit_count', 'created_at', 'last_used_at']
+
+
+@admin.register(WatchedFile)
+class WatchedFileAdmin(admin.ModelAdmin):
+    """Admin configuration for the ingest_watch manifest; delete an entry to ingest the file again"""
+    list_display = ['path', 'file_type', 'size', 'file_upload', 'ingested_at']
+    list_filter = ['file_type']
+    search_fields = ['path']
+    readonly_fields = ['ingested_at']
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    """Admin configuration for resumable chunked uploads"""
+    list_display = ['file_name', 'customer', 'file_type', 'file_size', 'status', 'file_upload', 'updated_at']
+    list_filter = ['status', 'file_type', 'customer']
+    search_fields = ['file_name']
+    readonly_fields = ['received_chunks', 'created_at', 'updated_at']
+
+
+@admin.register(ProcessingTask)
+class ProcessingTaskAdmin(admin.ModelAdmin):
+    """Admin configuration for the background task queue"""
+    list_display = ['id', 'task_type', 'status', 'file_upload', 'attempts', 'worker', 'created_at', 'finished_at']
+    list_filter = ['task_type', 'status']
+    readonly_fields = ['created_at', 'started_at', 'heartbeat_at', 'finished_at', 'worker', 'attempts', 'error']
+    ordering = ['-created_at']
+
+
 # Smart Predictor Admin Interfaces
 
 @admin.register(PredictionModel)
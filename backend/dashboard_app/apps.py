@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class DashboardAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard_app'
-    verbose_name = 'Dashboard Application' 
\ No newline at end of file
+    verbose_name = 'Dashboard Application'
+
+    def ready(self):
+        # Keeps SLA results in step with SLA definition changes
+        from . import signals  # noqa: F401
@@ -0,0 +1,295 @@
+import importlib.util
+import logging
+import os
+import zipfile
+from datetime import date, datetime
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# File signatures used to sniff the real format of an upload
+ZIP_SIGNATURE = b'PK\x03\x04'
+OLE2_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Text cells that pandas.read_excel treats as missing by default
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+
+def detect_file_format(file_path):
+    """
+    Detect the real format of a spreadsheet file from its content.
+
+    Returns 'xlsx', 'xlsb', 'xls' or 'csv'. The file extension is ignored, so a
+    workbook saved with a .csv name is still read as a workbook.
+    """
+    with open(file_path, 'rb') as f:
+        signature = f.read(8)
+
+    if signature.startswith(ZIP_SIGNATURE):
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            raise ValueError(f"{os.path.basename(file_path)} looks like a zip archive but cannot be opened")
+        if 'xl/workbook.xml' in names:
+            return 'xlsx'
+        if 'xl/workbook.bin' in names:
+            return 'xlsb'
+        raise ValueError(f"{os.path.basename(file_path)} is a zip archive but not an Excel workbook")
+
+    if signature == OLE2_SIGNATURE:
+        return 'xls'
+
+    return 'csv'
+
+
+def header_to_columns(header):
+    """Build column names from a header row the way pandas.read_excel names them"""
+    columns = []
+    seen = {}
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+class BaseExcelReader:
+    """
+    Base class for spreadsheet reader engines.
+
+    Subclasses implement iter_rows(), which yields the header row followed by the
+    data rows of one sheet as tuples. Chunking and whole-sheet reads are built on
+    top of it, so every engine produces DataFrames with the same shape and naming.
+    """
+    name = ''
+    module = ''
+    formats = ()
+    # True when the engine holds at most one row in memory while iterating
+    streaming = False
+
+    @classmethod
+    def is_available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def iter_rows(self, file_path, sheet_name=None):
+        raise NotImplementedError
+
+    def iter_chunks(self, file_path, chunk_size, sheet_name=None, nrows=None):
+        """
+        Yield DataFrames of at most chunk_size rows.
+
+        Blank rows are skipped but still counted, so chunk indexes match the data
+        row positions in the sheet. A sheet with only a header yields one empty
+        DataFrame; an empty sheet yields nothing.
+        """
+        rows = self.iter_rows(file_path, sheet_name)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = header_to_columns(header)
+        width = len(columns)
+        buffer = []
+        index = []
+        yielded = False
+        remaining = nrows
+
+        for row_number, row in enumerate(rows):
+            if remaining is not None and remaining <= 0:
+                break
+            row = tuple(
+                None if isinstance(value, str) and value in NA_STRINGS else value
+                for value in row[:width]
+            )
+            if all(value is None for value in row):
+                continue
+            buffer.append(row + (None,) * (width - len(row)))
+            index.append(row_number)
+            if remaining is not None:
+                remaining -= 1
+
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=columns, index=index)
+                yielded = True
+                buffer = []
+                index = []
+
+        if buffer or not yielded:
+            yield pd.DataFrame.from_records(buffer, columns=columns, index=index)
+
+    def read(self, file_path, sheet_name=None, nrows=None):
+        """Read a whole sheet (or its first nrows data rows) into one DataFrame indexed from 0"""
+        frames = list(self.iter_chunks(file_path, chunk_size=100000, sheet_name=sheet_name, nrows=nrows))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+
+class CalamineReader(BaseExcelReader):
+    """Rust-based reader from the optional python-calamine package; much faster than openpyxl"""
+    name = 'calamine'
+    module = 'python_calamine'
+    formats = ('xlsx', 'xlsb', 'xls')
+
+    def iter_rows(self, file_path, sheet_name=None):
+        from python_calamine import CalamineWorkbook
+
+        workbook = CalamineWorkbook.from_path(str(file_path))
+        if sheet_name is None or isinstance(sheet_name, int):
+            sheet = workbook.get_sheet_by_index(sheet_name or 0)
+        else:
+            sheet = workbook.get_sheet_by_name(sheet_name)
+
+        for row in sheet.iter_rows():
+            yield tuple(CalamineReader._convert_cell(value) for value in row)
+
+    @staticmethod
+    def _convert_cell(value):
+        # calamine returns every number as float and date-only cells as date; match openpyxl
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        return value
+
+
+class OpenpyxlReader(BaseExcelReader):
+    """openpyxl in read-only mode; streams rows so memory stays bounded on very large workbooks"""
+    name = 'openpyxl'
+    module = 'openpyxl'
+    formats = ('xlsx',)
+    streaming = True
+
+    def iter_rows(self, file_path, sheet_name=None):
+        import openpyxl
+
+        # Pass a file object: openpyxl rejects paths whose extension is not .xlsx/.xlsm
+        with open(file_path, 'rb') as f:
+            workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+            try:
+                if sheet_name is None or isinstance(sheet_name, int):
+                    worksheet = workbook.worksheets[sheet_name or 0]
+                else:
+                    worksheet = workbook[sheet_name]
+                yield from worksheet.iter_rows(values_only=True)
+            finally:
+                workbook.close()
+
+
+class XlrdReader(BaseExcelReader):
+    """Legacy .xls reader; xlrd needs the workbook date mode, so rows come through pandas"""
+    name = 'xlrd'
+    module = 'xlrd'
+    formats = ('xls',)
+
+    def iter_rows(self, file_path, sheet_name=None):
+        df = pd.read_excel(file_path, sheet_name=sheet_name or 0, header=None, engine='xlrd')
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(None if pd.isna(value) else value for value in row)
+
+
+class CsvReader(BaseExcelReader):
+    """Plain-text CSV files"""
+    name = 'csv'
+    module = 'pandas'
+    formats = ('csv',)
+    streaming = True
+
+    def iter_chunks(self, file_path, chunk_size, sheet_name=None, nrows=None):
+        yielded = False
+        for chunk in pd.read_csv(file_path, chunksize=chunk_size, nrows=nrows):
+            yielded = True
+            yield chunk
+        if not yielded:
+            yield pd.read_csv(file_path, nrows=0)
+
+
+# Engines in order of preference
+READERS = [CalamineReader, OpenpyxlReader, XlrdReader, CsvReader]
+
+
+def available_readers(file_format=None):
+    """Reader classes that are installed, optionally restricted to one file format"""
+    return [
+        reader for reader in READERS
+        if reader.is_available() and (file_format is None or file_format in reader.formats)
+    ]
+
+
+def get_reader(file_path, engine=None, streaming=None):
+    """
+    Pick a reader for a file.
+
+    The format is sniffed from the file content. An explicit engine (or the
+    EXCEL_READER_ENGINE setting) is used when it is installed and supports the
+    format; otherwise the fastest available engine is chosen. Files larger than
+    EXCEL_STREAMING_THRESHOLD_MB prefer an engine that streams rows, so memory
+    stays bounded; pass streaming=True/False to override that decision.
+    """
+    file_format = detect_file_format(file_path)
+    candidates = available_readers(file_format)
+    if not candidates:
+        raise ValueError(f"No reader engine installed for {file_format} files")
+
+    engine = engine or getattr(settings, 'EXCEL_READER_ENGINE', 'auto')
+    if engine != 'auto':
+        for reader in candidates:
+            if reader.name == engine:
+                return reader()
+        logger.warning(f"Excel reader engine '{engine}' is not available for {file_format} files, selecting automatically")
+
+    if streaming is None:
+        threshold_mb = getattr(settings, 'EXCEL_STREAMING_THRESHOLD_MB', 50)
+        streaming = os.path.getsize(file_path) > threshold_mb * 1024 * 1024
+
+    if streaming:
+        for reader in candidates:
+            if reader.streaming:
+                return reader()
+
+    return candidates[0]()
+
+
+def estimate_row_count(file_path, sheet_name=None):
+    """
+    Cheaply estimate the number of data rows in a file, or return None.
+
+    For .xlsx this reads the sheet dimension recorded in the workbook instead of
+    parsing the cells, so it may include trailing blank rows. CSV files are
+    counted line by line.
+    """
+    try:
+        file_format = detect_file_format(file_path)
+        if file_format == 'xlsx' and OpenpyxlReader.is_available():
+            import openpyxl
+
+            with open(file_path, 'rb') as f:
+                workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+                try:
+                    if sheet_name is None or isinstance(sheet_name, int):
+                        worksheet = workbook.worksheets[sheet_name or 0]
+                    else:
+                        worksheet = workbook[sheet_name]
+                    max_row = worksheet.max_row
+                finally:
+                    workbook.close()
+            return max(max_row - 1, 0) if max_row else None
+
+        if file_format == 'csv':
+            with open(file_path, 'rb') as f:
+                return max(sum(1 for _ in f) - 1, 0)
+    except Exception as e:
+        logger.warning(f"Could not estimate row count for {file_path}: {str(e)}")
+
+    return None
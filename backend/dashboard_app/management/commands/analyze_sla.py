@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from dashboard_app.models import Customer
+from dashboard_app.sla_pool import analyze_sla_in_pool
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Analyze batch jobs against their SLA definitions, one (customer, product) '
+        'partition per worker process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Analyze every customer and product'
+        )
+        parser.add_argument(
+            '--customer',
+            help='Code of the only customer to analyze'
+        )
+        parser.add_argument(
+            '--product',
+            help='Only analyze this product'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'SLA_ANALYSIS_PROCESSES', 0) or None,
+            help='Worker processes (default SLA_ANALYSIS_PROCESSES, or one per CPU)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Analyze every job again instead of only those changed since the last run'
+        )
+        parser.add_argument(
+            '--in-database',
+            action='store_true',
+            default=None,
+            help='Compute the results with SQL inside the database (default SLA_ANALYSIS_IN_DATABASE)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['all'] and not options['customer']:
+            raise CommandError('Pass --all, or --customer to analyze one customer')
+
+        customer_id = None
+        if options['customer']:
+            customer = Customer.objects.filter(code=options['customer']).first()
+            if customer is None:
+                raise CommandError(f"No customer with code {options['customer']}")
+            customer_id = customer.id
+
+        started = time.time()
+        summary = analyze_sla_in_pool(
+            customer_id=customer_id,
+            product=options['product'],
+            processes=options['workers'],
+            full=options['full'],
+            in_database=options['in_database']
+        )
+        elapsed = time.time() - started
+
+        for failure in summary['failed']:
+            self.stdout.write(self.style.ERROR(
+                f"Customer {failure['customer_id']} {failure['product']} failed: {failure['error']}"
+            ))
+        style = self.style.ERROR if summary['failed'] else self.style.SUCCESS
+        self.stdout.write(style(f"{summary['message']} in {elapsed:.1f}s"))
@@ -0,0 +1,106 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from dashboard_app.excel_readers import READERS, detect_file_format
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the installed spreadsheet reader engines against sample files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            type=str,
+            help='Files or directories to benchmark (defaults to sample_excel_files/)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of timed reads per file and engine (best time is reported)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Read in chunks of this many rows instead of whole sheets'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [os.path.join(settings.BASE_DIR.parent, 'sample_excel_files')]
+        repeat = max(options['repeat'], 1)
+        chunk_size = options['chunk_size']
+
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(
+                    os.path.join(path, name) for name in sorted(os.listdir(path))
+                    if name.lower().endswith(('.xlsx', '.xlsm', '.xlsb', '.xls', '.csv'))
+                )
+            elif os.path.isfile(path):
+                files.append(path)
+            else:
+                raise CommandError(f'Path not found: {path}')
+
+        if not files:
+            raise CommandError('No spreadsheet files found')
+
+        installed = [reader for reader in READERS if reader.is_available()]
+        missing = [reader.name for reader in READERS if not reader.is_available()]
+        self.stdout.write(f"Engines installed: {', '.join(reader.name for reader in installed)}")
+        if missing:
+            self.stdout.write(self.style.WARNING(f"Engines not installed: {', '.join(missing)}"))
+
+        self.stdout.write(f"\n{'File':<40} {'Format':<7} {'Engine':<10} {'Rows':>9} {'Seconds':>9} {'Rows/s':>11} {'MB/s':>8}")
+        self.stdout.write('-' * 100)
+
+        totals = {}
+        for file_path in files:
+            file_name = os.path.basename(file_path)
+            size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            try:
+                file_format = detect_file_format(file_path)
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(f"{file_name:<40} {str(e)}"))
+                continue
+
+            for reader_class in installed:
+                if file_format not in reader_class.formats:
+                    continue
+                reader = reader_class()
+                try:
+                    best, rows = self._time_reader(reader, file_path, repeat, chunk_size)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"{file_name:<40} {file_format:<7} {reader.name:<10} failed: {str(e)}"))
+                    continue
+
+                rows_per_second = rows / best if best else 0
+                mb_per_second = size_mb / best if best else 0
+                self.stdout.write(
+                    f"{file_name:<40} {file_format:<7} {reader.name:<10} {rows:>9} {best:>9.3f} "
+                    f"{rows_per_second:>11.0f} {mb_per_second:>8.2f}"
+                )
+                engine_rows, engine_seconds = totals.get(reader.name, (0, 0.0))
+                totals[reader.name] = (engine_rows + rows, engine_seconds + best)
+
+        self.stdout.write('\nTotals:')
+        for name, (rows, seconds) in totals.items():
+            rows_per_second = rows / seconds if seconds else 0
+            self.stdout.write(self.style.SUCCESS(f"  {name:<10} {rows:>9} rows in {seconds:.3f}s ({rows_per_second:.0f} rows/s)"))
+
+    def _time_reader(self, reader, file_path, repeat, chunk_size):
+        """Return the best wall time over repeat reads and the number of rows read"""
+        best = None
+        rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            if chunk_size:
+                rows = sum(len(chunk) for chunk in reader.iter_chunks(file_path, chunk_size))
+            else:
+                rows = len(reader.read(file_path))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, rows
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections
+from dashboard_app.utils import SLAAnalyzer
+import time
+
+
+class Command(BaseCommand):
+    help = 'Project the completion of pending and long running jobs and keep the SLA at-risk runs up to date'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Evaluate once and exit instead of repeating'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=getattr(settings, 'SLA_RISK_EVALUATION_INTERVAL', 60),
+            help='Seconds between evaluations'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                close_old_connections()
+                started = time.time()
+                try:
+                    result = SLAAnalyzer.evaluate_sla_risk()
+                    self.stdout.write(f"{result['message']} ({time.time() - started:.1f}s)")
+                except Exception as e:
+                    # Keep evaluating; the next pass starts from the current state again
+                    self.stdout.write(self.style.ERROR(f'SLA risk evaluation failed: {str(e)}'))
+
+                if options['once']:
+                    break
+                time.sleep(max(options['interval'] - (time.time() - started), 0))
+
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, stopping SLA risk evaluation')
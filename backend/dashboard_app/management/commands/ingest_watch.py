@@ -0,0 +1,192 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db import close_old_connections
+from dashboard_app.models import Customer, FileUpload, WatchedFile
+from dashboard_app.upload_pool import process_uploads_in_pool
+from dashboard_app.upload_storage import register_upload
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Watch the EXCEL_DATA_PATHS drop directories and ingest new or changed files. '
+        'Files go in <directory>/<customer code>/[<product>/]<file>; files directly in '
+        'a drop directory use --customer.'
+    )
+
+    ALLOWED_EXTENSIONS = ('.xlsx', '.xlsm', '.xlsb', '.xls', '.csv')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Scan the directories once and exit instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'INGEST_WATCH_POLL_INTERVAL', 30),
+            help='Seconds to wait between scans'
+        )
+        parser.add_argument(
+            '--settle-seconds',
+            type=float,
+            default=10,
+            help='Skip files modified more recently than this, as they may still be being written'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Worker processes used to ingest the files found in one scan'
+        )
+        parser.add_argument(
+            '--customer',
+            help='Code of the customer for files placed directly in a drop directory'
+        )
+
+    def handle(self, *args, **options):
+        directories = {
+            file_type: directory
+            for file_type, directory in getattr(settings, 'EXCEL_DATA_PATHS', {}).items()
+            if file_type in dict(FileUpload.FILE_TYPE_CHOICES)
+        }
+        if not directories:
+            raise CommandError('EXCEL_DATA_PATHS is not configured')
+
+        for file_type, directory in directories.items():
+            if not os.path.isdir(directory):
+                self.stdout.write(self.style.WARNING(f'{file_type}: {directory} does not exist, skipping until it is created'))
+
+        # Files skipped because no customer matched; warned about once per run
+        self._unassigned = {}
+
+        # Manifest of files already ingested, so a restart does not reprocess them
+        manifest = {
+            path: (size, mtime)
+            for path, size, mtime in WatchedFile.objects.values_list('path', 'size', 'mtime')
+        }
+        self.stdout.write(f'Watching {len(directories)} directories, {len(manifest)} files already ingested')
+
+        # Uploads recorded by a previous run that stopped before finishing them
+        interrupted = list(
+            FileUpload.objects.filter(watched_files__isnull=False, status__in=['QUEUED', 'PROCESSING'])
+            .values_list('id', flat=True).distinct()
+        )
+        if interrupted:
+            self.stdout.write(self.style.WARNING(f'Resuming {len(interrupted)} interrupted uploads'))
+            self._process(interrupted, options['processes'])
+
+        try:
+            while True:
+                close_old_connections()
+                ingested = self._scan(directories, manifest, options)
+                if ingested:
+                    self.stdout.write(f'Scan finished: {ingested} files ingested')
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, stopping watcher')
+
+    def _scan(self, directories, manifest, options):
+        """Register files that are new or whose size or mtime changed, then process them"""
+        settled_before = time.time() - options['settle_seconds']
+        new_uploads = []
+        ingested = 0
+
+        for file_type, directory in directories.items():
+            for path, stat in self._iter_files(directory):
+                if manifest.get(path) == (stat.st_size, stat.st_mtime):
+                    continue
+                if stat.st_mtime > settled_before:
+                    continue
+
+                if self._unassigned.get(path) == (stat.st_size, stat.st_mtime):
+                    continue
+                customer, product = self._resolve_customer(directory, path, options['customer'])
+                if customer is None:
+                    # Not recorded in the manifest, so a restart after adding the customer picks it up
+                    self._unassigned[path] = (stat.st_size, stat.st_mtime)
+                    continue
+
+                with open(path, 'rb') as source:
+                    file_upload, duplicate = register_upload(
+                        customer, product, file_type, os.path.basename(path),
+                        iter(lambda: source.read(1024 * 1024), b'')
+                    )
+                # Recorded before processing so that a crash resumes this upload instead of scanning again
+                self._record(path, file_type, stat, file_upload, manifest)
+                ingested += 1
+
+                if duplicate:
+                    self.stdout.write(f'{path}: unchanged content, already ingested as upload #{file_upload.id}')
+                else:
+                    new_uploads.append(file_upload.id)
+
+        if new_uploads:
+            self._process(new_uploads, options['processes'])
+        return ingested
+
+    def _process(self, file_upload_ids, processes):
+        results = process_uploads_in_pool(file_upload_ids, processes=processes)
+        names = dict(FileUpload.objects.filter(id__in=file_upload_ids).values_list('id', 'file_name'))
+        for file_upload_id, (success, message) in results.items():
+            line = f'{names.get(file_upload_id)} (upload #{file_upload_id}): {message}'
+            self.stdout.write(self.style.SUCCESS(line) if success else self.style.ERROR(line))
+
+    def _iter_files(self, directory):
+        """Yield (path, stat) for spreadsheet files under directory, skipping hidden and temporary files"""
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for filename in filenames:
+                if filename.startswith(('.', '~$')) or not filename.lower().endswith(self.ALLOWED_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    # Moved away between listing and stat
+                    continue
+
+    def _resolve_customer(self, directory, path, default_customer_code):
+        """Customer and product for a dropped file from its <customer code>/[<product>/] subdirectories"""
+        parts = os.path.relpath(path, directory).split(os.sep)[:-1]
+        product = None
+        if len(parts) >= 2 and parts[1].upper() in dict(Customer.PRODUCT_CHOICES):
+            product = parts[1].upper()
+
+        customer_code = parts[0] if parts else default_customer_code
+        if not customer_code:
+            self.stdout.write(self.style.WARNING(f'{path}: not in a customer directory and no --customer given, skipping'))
+            return None, None
+
+        customers = Customer.objects.filter(code=customer_code, is_active=True)
+        if product:
+            customers = customers.filter(product=product)
+        customers = list(customers[:2])
+        if len(customers) != 1:
+            problem = 'no active customer' if not customers else 'several customers'
+            self.stdout.write(self.style.WARNING(
+                f'{path}: {problem} with code {customer_code}'
+                f'{f" and product {product}" if product else ""}, skipping'
+            ))
+            return None, None
+
+        customer = customers[0]
+        return customer, product or customer.product
+
+    def _record(self, path, file_type, stat, file_upload, manifest):
+        WatchedFile.objects.update_or_create(
+            path=path,
+            defaults={
+                'file_type': file_type,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'file_upload': file_upload,
+            }
+        )
+        manifest[path] = (stat.st_size, stat.st_mtime)
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections
+from dashboard_app.tasks import claim_next_task, requeue_stale_tasks, run_task
+import os
+import socket
+import time
+
+
+class Command(BaseCommand):
+    help = 'Process queued background tasks such as uploaded files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling for new tasks'
+        )
+        parser.add_argument(
+            '--max-tasks',
+            type=int,
+            default=None,
+            help='Exit after processing this many tasks'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'TASK_WORKER_POLL_INTERVAL', 2),
+            help='Seconds to sleep when the queue is empty'
+        )
+        parser.add_argument(
+            '--requeue-stale',
+            action='store_true',
+            help='On start, put tasks whose worker stopped sending heartbeats back on the queue'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=10,
+            help='Minutes without a heartbeat after which --requeue-stale takes a task\'s worker for dead'
+        )
+
+    def handle(self, *args, **options):
+        worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        max_tasks = options['max_tasks']
+        processed = 0
+
+        if options['requeue_stale']:
+            requeued = requeue_stale_tasks(options['stale_after'])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale tasks'))
+
+        self.stdout.write(f'Task worker {worker_name} started')
+
+        try:
+            while max_tasks is None or processed < max_tasks:
+                close_old_connections()
+                task = claim_next_task(worker_name)
+
+                if task is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'Running {task}...')
+                started = time.time()
+                success = run_task(task)
+                processed += 1
+
+                elapsed = time.time() - started
+                if success:
+                    self.stdout.write(self.style.SUCCESS(f'Task #{task.id} completed in {elapsed:.1f}s'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'Task #{task.id} failed in {elapsed:.1f}s: {task.error.strip().splitlines()[-1] if task.error else ""}'))
+
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, stopping worker')
+
+        self.stdout.write(f'Task worker {worker_name} processed {processed} tasks')
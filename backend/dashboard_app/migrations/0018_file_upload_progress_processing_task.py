@@ -0,0 +1,93 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def mark_existing_uploads_finished(apps, schema_editor):
+    # Uploads before this migration were processed inside the request
+    FileUpload = apps.get_model('dashboard_app', 'FileUpload')
+    FileUpload.objects.filter(processed=True).update(status='COMPLETED', stage='done')
+    FileUpload.objects.filter(processed=False).update(status='FAILED', stage='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0017_alter_batchschedule_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(choices=[('PROCESS_UPLOAD', 'Process Uploaded File')], max_length=50)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('attempts', models.IntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='processing_finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='product',
+            field=models.CharField(blank=True, choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='rows_read',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='rows_total',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='rows_written',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='stage',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='QUEUED', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='fileupload',
+            index=models.Index(fields=['status'], name='dashboard_a_status_b4c0c9_idx'),
+        ),
+        migrations.AddField(
+            model_name='processingtask',
+            name='file_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='dashboard_app.fileupload'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(fields=['status', 'created_at'], name='dashboard_a_status_ee9a45_idx'),
+        ),
+        migrations.RunPython(mark_existing_uploads_finished, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:01
+
+from django.db import migrations
+from django.db.models import Min
+
+
+def remove_duplicate_runs(apps, schema_editor):
+    # Re-uploads used to insert every run again; keep the first copy of each run
+    BatchJob = apps.get_model('dashboard_app', 'BatchJob')
+    first_ids = (
+        BatchJob.objects.values('customer', 'product', 'jobrun_id', 'start_time')
+        .annotate(first_id=Min('id'))
+        .values('first_id')
+    )
+    _, deleted = BatchJob.objects.exclude(id__in=first_ids).delete()
+    print(f"Removed {deleted.get('dashboard_app.BatchJob', 0)} duplicate BatchJob records")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0018_file_upload_progress_processing_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_runs, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='batchjob',
+            unique_together={('customer', 'product', 'jobrun_id', 'start_time')},
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0020_fileupload_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColumnMapping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_type', models.CharField(choices=[('BATCH_PERFORMANCE', 'Batch Performance'), ('VOLUMETRICS', 'Volumetrics'), ('SLA_TRACKING', 'SLA Tracking'), ('BATCH_SCHEDULE', 'Batch Schedule')], max_length=50)),
+                ('header_signature', models.CharField(max_length=64)),
+                ('header', models.JSONField(default=list)),
+                ('positions', models.JSONField(default=dict)),
+                ('missing_columns', models.JSONField(default=list)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='column_mappings', to='dashboard_app.customer')),
+            ],
+            options={
+                'unique_together': {('customer', 'file_type', 'header_signature')},
+            },
+        ),
+    ]
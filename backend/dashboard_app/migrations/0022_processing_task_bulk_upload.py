@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0021_column_mapping_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingtask',
+            name='task_type',
+            field=models.CharField(choices=[('PROCESS_UPLOAD', 'Process Uploaded File'), ('PROCESS_UPLOAD_BATCH', 'Process Uploaded Files (Bulk)')], max_length=50),
+        ),
+    ]
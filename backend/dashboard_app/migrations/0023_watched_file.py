@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0022_processing_task_bulk_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WatchedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('file_type', models.CharField(choices=[('BATCH_PERFORMANCE', 'Batch Performance'), ('VOLUMETRICS', 'Volumetrics'), ('SLA_TRACKING', 'SLA Tracking'), ('BATCH_SCHEDULE', 'Batch Schedule')], max_length=50)),
+                ('size', models.BigIntegerField()),
+                ('mtime', models.FloatField(help_text='Modification time (seconds since the epoch)')),
+                ('ingested_at', models.DateTimeField(auto_now=True)),
+                ('file_upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='watched_files', to='dashboard_app.fileupload')),
+            ],
+            options={
+                'ordering': ['-ingested_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dashboard_app', '0023_watched_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('product', models.CharField(choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50)),
+                ('file_type', models.CharField(choices=[('BATCH_PERFORMANCE', 'Batch Performance'), ('VOLUMETRICS', 'Volumetrics'), ('SLA_TRACKING', 'SLA Tracking'), ('BATCH_SCHEDULE', 'Batch Schedule')], max_length=50)),
+                ('file_name', models.CharField(max_length=200)),
+                ('file_size', models.BigIntegerField()),
+                ('chunk_size', models.IntegerField()),
+                ('checksum', models.CharField(blank=True, max_length=64)),
+                ('received_chunks', models.JSONField(default=list)),
+                ('force', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Receiving Chunks'), ('COMPLETED', 'Completed'), ('ABORTED', 'Aborted'), ('EXPIRED', 'Expired')], default='ACTIVE', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='dashboard_app.customer')),
+                ('file_upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to='dashboard_app.fileupload')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='dashboard_a_status_5d6f75_idx')],
+            },
+        ),
+    ]
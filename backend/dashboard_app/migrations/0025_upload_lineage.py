@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0024_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batchjob',
+            name='file_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='batch_jobs', to='dashboard_app.fileupload'),
+        ),
+        migrations.AddField(
+            model_name='batchschedule',
+            name='file_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='batch_schedules', to='dashboard_app.fileupload'),
+        ),
+        migrations.AddField(
+            model_name='sladata',
+            name='file_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sla_data', to='dashboard_app.fileupload'),
+        ),
+        migrations.AddField(
+            model_name='volumetricdata',
+            name='file_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='volumetric_data', to='dashboard_app.fileupload'),
+        ),
+        migrations.AlterField(
+            model_name='fileupload',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('ROLLED_BACK', 'Rolled Back')], default='QUEUED', max_length=20),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0025_upload_lineage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchJobStaging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('load_id', models.CharField(max_length=32)),
+                ('product', models.CharField(choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50)),
+                ('jobrun_id', models.CharField(blank=True, max_length=100)),
+                ('start_time', models.DateTimeField()),
+                ('job_name', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('COMPLETED_NORMAL', 'Completed Normally'), ('COMPLETED_ABNORMAL', 'Completed Abnormally'), ('COMPLETED_NORMAL_STAR', 'Completed Normally*'), ('LONG_RUNNING', 'Long Running'), ('FAILED', 'Failed'), ('PENDING', 'Pending')], max_length=50)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('duration_minutes', models.FloatField(blank=True, null=True)),
+                ('exit_code', models.IntegerField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('month', models.CharField(max_length=7)),
+                ('year', models.IntegerField()),
+                ('is_long_running', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard_app.customer')),
+                ('file_upload', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard_app.fileupload')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['load_id', 'jobrun_id', 'start_time'], name='dashboard_a_load_id_e12ec1_idx'), models.Index(fields=['created_at'], name='dashboard_a_created_d1be44_idx')],
+            },
+        ),
+    ]
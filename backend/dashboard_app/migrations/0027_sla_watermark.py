@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0026_batch_job_staging'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SLAAnalysisWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.CharField(choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50)),
+                ('analyzed_through', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='batchjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='batchjob',
+            index=models.Index(fields=['customer', 'product', 'updated_at'], name='dashboard_a_custome_0555ed_idx'),
+        ),
+        migrations.AddField(
+            model_name='slaanalysiswatermark',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sla_watermarks', to='dashboard_app.customer'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='slaanalysiswatermark',
+            unique_together={('customer', 'product')},
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0027_sla_watermark'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingtask',
+            name='task_type',
+            field=models.CharField(choices=[('PROCESS_UPLOAD', 'Process Uploaded File'), ('PROCESS_UPLOAD_BATCH', 'Process Uploaded Files (Bulk)'), ('RECOMPUTE_SLA', 'Recompute SLA Results')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='SLARecomputeRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.CharField(choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50)),
+                ('job_name', models.CharField(max_length=200)),
+                ('requested_at', models.DateTimeField(auto_now=True)),
+                ('customer', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='dashboard_app.customer')),
+            ],
+            options={
+                'unique_together': {('customer', 'product', 'job_name')},
+            },
+        ),
+    ]
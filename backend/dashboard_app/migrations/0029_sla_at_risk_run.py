@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0028_sla_recompute_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SLAAtRiskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.CharField(choices=[('FACETS', 'Facets'), ('QNXT', 'QNXT'), ('CAE', 'CAE'), ('TMS', 'TMS'), ('EDM', 'EDM'), ('CLSP', 'CLSP')], max_length=50)),
+                ('job_name', models.CharField(max_length=200)),
+                ('job_status', models.CharField(choices=[('COMPLETED_NORMAL', 'Completed Normally'), ('COMPLETED_ABNORMAL', 'Completed Abnormally'), ('COMPLETED_NORMAL_STAR', 'Completed Normally*'), ('LONG_RUNNING', 'Long Running'), ('FAILED', 'Failed'), ('PENDING', 'Pending')], max_length=50)),
+                ('start_time', models.DateTimeField()),
+                ('sla_deadline', models.DateTimeField()),
+                ('projected_completion', models.DateTimeField(blank=True, null=True)),
+                ('projected_completion_late', models.DateTimeField(blank=True, null=True)),
+                ('history_runs', models.IntegerField(default=0)),
+                ('risk_level', models.CharField(choices=[('BREACHED', 'Still running past the SLA target'), ('LIKELY_MISS', 'Likely to miss'), ('AT_RISK', 'At risk')], max_length=20)),
+                ('minutes_to_deadline', models.FloatField()),
+                ('evaluated_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['sla_deadline'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='batchjob',
+            index=models.Index(fields=['customer', 'product', 'job_name', 'start_time'], name='dashboard_a_custome_ccf6e8_idx'),
+        ),
+        migrations.AddField(
+            model_name='slaatriskrun',
+            name='batch_job',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sla_risk', to='dashboard_app.batchjob'),
+        ),
+        migrations.AddField(
+            model_name='slaatriskrun',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sla_risks', to='dashboard_app.customer'),
+        ),
+        migrations.AddField(
+            model_name='slaatriskrun',
+            name='sla_definition',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='at_risk_runs', to='dashboard_app.sladefinition'),
+        ),
+        migrations.AddIndex(
+            model_name='slaatriskrun',
+            index=models.Index(fields=['customer', 'product', 'risk_level'], name='dashboard_a_custome_e38df2_idx'),
+        ),
+    ]
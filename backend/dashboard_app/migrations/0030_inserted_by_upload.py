@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_inserted_by_upload(apps, schema_editor):
+    # Which upload first inserted an existing row is not known; the one that last wrote it is the best guess
+    for model_name in ['BatchJob', 'VolumetricData']:
+        model = apps.get_model('dashboard_app', model_name)
+        model.objects.filter(file_upload__isnull=False).update(inserted_by_upload=models.F('file_upload'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0029_sla_at_risk_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batchjob',
+            name='inserted_by_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dashboard_app.fileupload'),
+        ),
+        migrations.AddField(
+            model_name='volumetricdata',
+            name='inserted_by_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dashboard_app.fileupload'),
+        ),
+        migrations.RunPython(backfill_inserted_by_upload, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard_app', '0030_inserted_by_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingtask',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
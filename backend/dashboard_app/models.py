@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from datetime import datetime
+import math
 import os
+import uuid
 from django.utils import timezone
 
 
@@ -53,6 +55,9 @@ class BatchJob(models.Model):
     ]
 
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='batch_jobs')
+    # Upload that last wrote this row; rolling the upload back deletes it if that upload also inserted it
+    file_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='batch_jobs')
+    inserted_by_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     job_name = models.CharField(max_length=200)
     job_id = models.CharField(max_length=100, blank=True)  # Keep for backward compatibility
     jobrun_id = models.CharField(max_length=100, blank=True)  # New field for job run ID
@@ -67,6 +72,8 @@ class BatchJob(models.Model):
     year = models.IntegerField()
     is_long_running = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set again whenever an upload changes the run; incremental SLA analysis starts from it
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # Auto-populate product from customer if not set
@@ -77,19 +84,29 @@ class BatchJob(models.Model):
     def __str__(self):
         return f"{self.job_name} - {self.status} ({self.customer.name}) - {self.product}"
 
+    # Natural key of a job run; re-uploading a file upserts on it instead of duplicating rows
+    NATURAL_KEY = ['customer', 'product', 'jobrun_id', 'start_time']
+
     class Meta:
         ordering = ['-start_time']
+        unique_together = ['customer', 'product', 'jobrun_id', 'start_time']
         indexes = [
             models.Index(fields=['customer', 'month']),
             models.Index(fields=['status']),
             models.Index(fields=['start_time']),
             models.Index(fields=['product']),
+            models.Index(fields=['customer', 'product', 'updated_at']),
+            # Run history of one job, read by the SLA risk evaluator
+            models.Index(fields=['customer', 'product', 'job_name', 'start_time']),
         ]
 
 
 class VolumetricData(models.Model):
     """Model for volumetric performance data"""
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='volumetric_data')
+    # As on BatchJob: the upload that last wrote the row, and the one that inserted it
+    file_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='volumetric_data')
+    inserted_by_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     job_name = models.CharField(max_length=200)
     date = models.DateField()
     total_volume = models.IntegerField()
@@ -151,6 +168,7 @@ class SLAData(models.Model):
     ]
 
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='sla_data')
+    file_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='sla_data')
     product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
     job_name = models.CharField(max_length=200)
     date = models.DateField()
@@ -217,6 +235,89 @@ class SLAData(models.Model):
         ]
 
 
+class SLAAnalysisWatermark(models.Model):
+    """
+    How far SLA analysis has got for one customer and product.
+
+    analyzed_through is the highest BatchJob.updated_at seen by the last
+    analysis run, so the next run only has to look at runs inserted or
+    changed after it.
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='sla_watermarks')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
+    analyzed_through = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.customer.name} - {self.product} (through {self.analyzed_through})"
+
+    class Meta:
+        unique_together = ['customer', 'product']
+
+
+class SLARecomputeRequest(models.Model):
+    """
+    A job whose SLA results are stale because an SLA definition for it changed.
+
+    Written by the SLADefinition signals and drained by the RECOMPUTE_SLA task,
+    one row per customer, product and job name however often it is edited.
+    The customer is not a database constraint, so a request recorded while its
+    customer is being deleted does not block the delete.
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
+    job_name = models.CharField(max_length=200)
+    requested_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.customer_id} - {self.product} - {self.job_name} (requested {self.requested_at})"
+
+    class Meta:
+        unique_together = ['customer', 'product', 'job_name']
+
+
+class SLAAtRiskRun(models.Model):
+    """
+    An in-flight (pending or long running) run projected to miss its SLA.
+
+    A small table rebuilt every minute by SLAAnalyzer.evaluate_sla_risk from
+    the runs currently in flight, so the dashboard can show imminent misses
+    before the runs complete and are analyzed into SLAData.
+    """
+    RISK_LEVEL_CHOICES = [
+        ('BREACHED', 'Still running past the SLA target'),
+        ('LIKELY_MISS', 'Likely to miss'),
+        ('AT_RISK', 'At risk'),
+    ]
+
+    batch_job = models.OneToOneField(BatchJob, on_delete=models.CASCADE, related_name='sla_risk')
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='sla_risks')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
+    job_name = models.CharField(max_length=200)
+    job_status = models.CharField(max_length=50, choices=BatchJob.STATUS_CHOICES)
+    sla_definition = models.ForeignKey(SLADefinition, on_delete=models.CASCADE, related_name='at_risk_runs')
+    start_time = models.DateTimeField()
+    sla_deadline = models.DateTimeField()
+
+    # Completion projected from the durations of the job's past runs that outlasted this one so far
+    projected_completion = models.DateTimeField(null=True, blank=True)  # Median
+    projected_completion_late = models.DateTimeField(null=True, blank=True)  # 90th percentile
+    history_runs = models.IntegerField(default=0)  # Past runs the projection is based on
+
+    risk_level = models.CharField(max_length=20, choices=RISK_LEVEL_CHOICES)
+    minutes_to_deadline = models.FloatField()  # Negative once the deadline has passed
+    evaluated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.job_name} - {self.customer.name} ({self.risk_level}, deadline {self.sla_deadline})"
+
+    class Meta:
+        ordering = ['sla_deadline']
+        indexes = [
+            models.Index(fields=['customer', 'product', 'risk_level']),
+        ]
+
+
 class BatchSchedule(models.Model):
     """Model for batch schedule data - supports Tidal Excel format"""
     SCHEDULE_STATUS_CHOICES = [
@@ -250,6 +351,7 @@ class BatchSchedule(models.Model):
     ]
 
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='batch_schedules')
+    file_upload = models.ForeignKey('FileUpload', on_delete=models.SET_NULL, null=True, blank=True, related_name='batch_schedules')
     
     # Core job information
     job_name = models.CharField(max_length=200, help_text="JOBNAME from Excel")
@@ -346,8 +448,13 @@ class BatchSchedule(models.Model):
         
         super().save(*args, **kwargs)
     
-    def _determine_job_type(self):
-        """Determine job type based on naming patterns and characteristics"""
+    def _determine_job_type(self, is_parent_group=None):
+        """
+        Determine job type based on naming patterns and characteristics.
+
+        is_parent_group says whether another job lists this one in its PARENT GROUP;
+        bulk loaders that already know it pass it in, otherwise the database is queried.
+        """
         job_name = self.job_name.upper() if self.job_name else ''
         parent_group = self.parent_group.upper() if self.parent_group else ''
         
@@ -362,7 +469,9 @@ class BatchSchedule(models.Model):
             return 'RESOURCE_POOL'
         
         # Check if this job is referenced as a parent group by other jobs
-        if BatchSchedule.objects.filter(parent_group__icontains=self.job_name).exists():
+        if is_parent_group is None:
+            is_parent_group = BatchSchedule.objects.filter(parent_group__icontains=self.job_name).exists()
+        if is_parent_group:
             return 'JOB_GROUP'
         
         # Check for dependency/condition patterns
@@ -411,15 +520,45 @@ class FileUpload(models.Model):
         ('BATCH_SCHEDULE', 'Batch Schedule'),
     ]
 
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+        ('ROLLED_BACK', 'Rolled Back'),
+    ]
+
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='file_uploads')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES, blank=True)
     file_type = models.CharField(max_length=50, choices=FILE_TYPE_CHOICES)
     file_name = models.CharField(max_length=200)
     file_path = models.CharField(max_length=500)
     file_size = models.IntegerField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)  # SHA-256 of the file contents
     upload_date = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
     processing_log = models.TextField(blank=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Background processing progress, updated by the task worker
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    stage = models.CharField(max_length=50, blank=True)
+    rows_total = models.IntegerField(null=True, blank=True)  # Estimated from the sheet dimensions
+    rows_read = models.IntegerField(default=0)
+    rows_written = models.IntegerField(default=0)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    processing_finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds until the ingest stage finishes, from the read rate so far"""
+        if self.status != 'PROCESSING' or self.stage != 'ingesting' or not self.processing_started_at:
+            return None
+        if not self.rows_total or not self.rows_read:
+            return None
+        elapsed = (timezone.now() - self.processing_started_at).total_seconds()
+        remaining_rows = max(self.rows_total - self.rows_read, 0)
+        return round(elapsed / self.rows_read * remaining_rows, 1)
     
     def save(self, *args, **kwargs):
         # Automatically calculate file size if file_path exists
@@ -431,6 +570,19 @@ class FileUpload(models.Model):
                 self.file_size = 0
         super().save(*args, **kwargs)
 
+    @classmethod
+    def find_previous_upload(cls, customer, product, file_type, content_hash):
+        """Most recent upload of identical content that was processed or is still in progress"""
+        if not content_hash:
+            return None
+        return cls.objects.filter(
+            customer=customer,
+            product=product,
+            file_type=file_type,
+            content_hash=content_hash,
+            status__in=['QUEUED', 'PROCESSING', 'COMPLETED']
+        ).order_by('-upload_date').first()
+
     def __str__(self):
         return f"{self.file_name} - {self.file_type} ({self.customer.name})"
 
@@ -439,6 +591,177 @@ class FileUpload(models.Model):
         indexes = [
             models.Index(fields=['customer', 'file_type']),
             models.Index(fields=['processed']),
+            models.Index(fields=['status']),
+            models.Index(fields=['customer', 'product', 'file_type', 'content_hash']),
+        ]
+
+
+class ProcessingTask(models.Model):
+    """Database-backed work queue drained by the run_task_worker management command"""
+    TASK_TYPE_CHOICES = [
+        ('PROCESS_UPLOAD', 'Process Uploaded File'),
+        ('PROCESS_UPLOAD_BATCH', 'Process Uploaded Files (Bulk)'),
+        ('RECOMPUTE_SLA', 'Recompute SLA Results'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    task_type = models.CharField(max_length=50, choices=TASK_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    file_upload = models.ForeignKey(FileUpload, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
+    payload = models.JSONField(default=dict, blank=True)
+    attempts = models.IntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)  # Worker that claimed the task
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the claiming worker while the task runs; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_task_type_display()} #{self.id} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class ColumnMapping(models.Model):
+    """Resolved column positions for a file header, cached per customer and file type"""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='column_mappings')
+    file_type = models.CharField(max_length=50, choices=FileUpload.FILE_TYPE_CHOICES)
+    header_signature = models.CharField(max_length=64)  # SHA-256 of the header row and the expected columns
+    header = models.JSONField(default=list)
+    positions = models.JSONField(default=dict)  # Expected column name -> position in the header row
+    missing_columns = models.JSONField(default=list)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.customer.name} - {self.file_type} ({self.header_signature[:12]})"
+
+    class Meta:
+        unique_together = ['customer', 'file_type', 'header_signature']
+
+
+class BatchJobStaging(models.Model):
+    """
+    Batch performance rows of a file being ingested, before they are published to BatchJob.
+
+    Each load writes its chunks here under its own load_id; once the whole file
+    has been read the rows are published to BatchJob with one INSERT ... SELECT
+    in a single transaction and removed. Dashboards therefore never see a
+    partially loaded file, and a load that fails leaves BatchJob untouched.
+    """
+    load_id = models.CharField(max_length=32)
+    file_upload = models.ForeignKey(FileUpload, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='+')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
+    jobrun_id = models.CharField(max_length=100, blank=True)
+    start_time = models.DateTimeField()
+    job_name = models.CharField(max_length=200)
+    status = models.CharField(max_length=50, choices=BatchJob.STATUS_CHOICES)
+    end_time = models.DateTimeField(null=True, blank=True)
+    duration_minutes = models.FloatField(null=True, blank=True)
+    exit_code = models.IntegerField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+    month = models.CharField(max_length=7)
+    year = models.IntegerField()
+    is_long_running = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.job_name} ({self.jobrun_id}) in load {self.load_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['load_id', 'jobrun_id', 'start_time']),
+            models.Index(fields=['created_at']),
+        ]
+
+
+class WatchedFile(models.Model):
+    """
+    File seen in an EXCEL_DATA_PATHS drop directory by manage.py ingest_watch.
+
+    The size and modification time recorded when the file was ingested form the
+    watcher's manifest: a file is only ingested again once either changes.
+    """
+    path = models.CharField(max_length=500, unique=True)
+    file_type = models.CharField(max_length=50, choices=FileUpload.FILE_TYPE_CHOICES)
+    size = models.BigIntegerField()
+    mtime = models.FloatField(help_text="Modification time (seconds since the epoch)")
+    file_upload = models.ForeignKey(FileUpload, on_delete=models.SET_NULL, null=True, blank=True, related_name='watched_files')
+    ingested_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.path} ({self.file_type})"
+
+    class Meta:
+        ordering = ['-ingested_at']
+
+
+class ChunkedUpload(models.Model):
+    """
+    Resumable upload sent as numbered chunks, for files above the request size limit.
+
+    Each chunk is written at its offset in a temporary file, so chunks can be
+    retried or sent out of order. The FileUpload is only created, and the file
+    handed off for processing, when the upload is completed with every chunk
+    received and the checksum verified.
+    """
+    STATUS_CHOICES = [
+        ('ACTIVE', 'Receiving Chunks'),
+        ('COMPLETED', 'Completed'),
+        ('ABORTED', 'Aborted'),
+        ('EXPIRED', 'Expired'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='chunked_uploads')
+    product = models.CharField(max_length=50, choices=Customer.PRODUCT_CHOICES)
+    file_type = models.CharField(max_length=50, choices=FileUpload.FILE_TYPE_CHOICES)
+    file_name = models.CharField(max_length=200)
+    file_size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    checksum = models.CharField(max_length=64, blank=True)  # Expected SHA-256 of the whole file, if the client sent one
+    received_chunks = models.JSONField(default=list)  # Indexes of the chunks written so far
+    force = models.BooleanField(default=False)  # Process even if identical content was uploaded before
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
+    file_upload = models.ForeignKey(FileUpload, on_delete=models.SET_NULL, null=True, blank=True, related_name='chunked_uploads')
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_chunks(self):
+        return max(math.ceil(self.file_size / self.chunk_size), 1)
+
+    @property
+    def missing_chunks(self):
+        received = set(self.received_chunks)
+        return [index for index in range(self.total_chunks) if index not in received]
+
+    def chunk_length(self, index):
+        """Expected size in bytes of chunk index; only the last chunk may be short"""
+        return min(self.chunk_size, self.file_size - index * self.chunk_size)
+
+    def __str__(self):
+        return f"{self.file_name} ({len(self.received_chunks)}/{self.total_chunks} chunks, {self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
         ]
 
 
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import (
-    Customer, BatchJob, VolumetricData, SLAData, BatchSchedule, FileUpload, SLADefinition,
+    Customer, BatchJob, VolumetricData, SLAData, BatchSchedule, FileUpload, SLADefinition, SLAAtRiskRun,
     PredictionModel, PredictionResult, HistoricalPattern, PredictionAlert
 )
 from django.utils import timezone
@@ -147,6 +147,20 @@ class SLADataSerializer(serializers.ModelSerializer):
         return round(obj.actual_runtime_minutes / 60, 2) if obj.actual_runtime_minutes else 0
 
 
+class SLAAtRiskRunSerializer(serializers.ModelSerializer):
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    sla_target_time = serializers.TimeField(source='sla_definition.sla_target_time', read_only=True)
+
+    class Meta:
+        model = SLAAtRiskRun
+        fields = [
+            'id', 'batch_job', 'customer', 'customer_name', 'product', 'job_name', 'job_status',
+            'sla_definition', 'sla_target_time', 'start_time', 'sla_deadline',
+            'projected_completion', 'projected_completion_late', 'history_runs',
+            'risk_level', 'minutes_to_deadline', 'evaluated_at'
+        ]
+
+
 class SLASummarySerializer(serializers.Serializer):
     """Serializer for SLA summary statistics"""
     total_jobs = serializers.IntegerField()
@@ -225,12 +239,17 @@ class FileUploadSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     uploaded_by_username = serializers.CharField(source='uploaded_by.username', read_only=True)
     file_size_mb = serializers.SerializerMethodField()
+    eta_seconds = serializers.FloatField(read_only=True)
 
     class Meta:
         model = FileUpload
-        fields = ['id', 'customer', 'customer_name', 'file_type', 'file_name',
-                 'file_path', 'file_size', 'file_size_mb', 'upload_date',
-                 'processed', 'processing_log', 'uploaded_by', 'uploaded_by_username']
+        fields = ['id', 'customer', 'customer_name', 'product', 'file_type', 'file_name',
+                 'file_path', 'file_size', 'file_size_mb', 'content_hash', 'upload_date',
+                 'processed', 'processing_log', 'uploaded_by', 'uploaded_by_username',
+                 'status', 'stage', 'rows_total', 'rows_read', 'rows_written',
+                 'processing_started_at', 'processing_finished_at', 'eta_seconds']
+        read_only_fields = ['content_hash', 'status', 'stage', 'rows_total', 'rows_read', 'rows_written',
+                           'processing_started_at', 'processing_finished_at']
 
     def get_file_size_mb(self, obj):
         return round(obj.file_size / (1024 * 1024), 2)
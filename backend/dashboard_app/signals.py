@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import SLADefinition
+from .tasks import enqueue_sla_recompute
+
+# Fields of an SLA definition that SLA results depend on; other edits leave them as they are
+SLA_DEFINITION_FIELDS = ['customer_id', 'product', 'job_name', 'sla_target_time', 'is_active']
+
+
+def _job_key(values):
+    return values['customer_id'], values['product'], values['job_name']
+
+
+@receiver(pre_save, sender=SLADefinition)
+def remember_previous_sla_definition(sender, instance, raw=False, **kwargs):
+    instance._previous_sla_definition = None
+    if instance.pk and not raw:
+        instance._previous_sla_definition = (
+            SLADefinition.objects.filter(pk=instance.pk).values(*SLA_DEFINITION_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=SLADefinition)
+def sla_definition_saved(sender, instance, created, raw=False, **kwargs):
+    """Queue recomputation of the jobs a definition applies to, and applied to before a rename"""
+    if raw:
+        return
+    current = {field: getattr(instance, field) for field in SLA_DEFINITION_FIELDS}
+    previous = getattr(instance, '_previous_sla_definition', None)
+    if previous == current:
+        return
+    job_keys = {_job_key(current)}
+    if previous:
+        job_keys.add(_job_key(previous))
+    enqueue_sla_recompute(job_keys)
+
+
+@receiver(post_delete, sender=SLADefinition)
+def sla_definition_deleted(sender, instance, **kwargs):
+    enqueue_sla_recompute([(instance.customer_id, instance.product, instance.job_name)])
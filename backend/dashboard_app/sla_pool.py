@@ -0,0 +1,109 @@
+"""
+Process pool that runs SLA analysis for several customers and products at once.
+
+Each (customer, product) is analyzed on its own by analyze_batch_performance_for_sla
+in a worker process with its own database connection, so the Python part of the
+analysis uses every core. As in upload_pool, Django is only set up inside the
+worker initializer.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .upload_pool import _init_worker
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_sla_in_pool(customer_id=None, product=None, processes=None, full=False, in_database=None):
+    """
+    Analyze every (customer, product) with batch jobs, a partition per worker task, and merge the results.
+
+    processes defaults to SLA_ANALYSIS_PROCESSES, or the number of CPUs.
+    Partitions with the most batch jobs are submitted first, so a large
+    customer does not start last and hold up the end of the run. On SQLite the
+    workers share the ingestion write lock (see utils.write_phase) and only
+    compute in parallel. Returns the summary of analyze_batch_performance_for_sla
+    summed over the partitions, with the partitions that failed under 'failed'.
+    """
+    from django.conf import settings
+    from django.db import connection, connections, models
+    from .models import BatchJob
+    from .utils import SLAAnalyzer
+
+    batch_jobs = BatchJob.objects.all()
+    if customer_id:
+        batch_jobs = batch_jobs.filter(customer_id=customer_id)
+    if product:
+        batch_jobs = batch_jobs.filter(product=product)
+    partitions = [
+        (row['customer_id'], row['product'])
+        for row in batch_jobs.order_by().values('customer_id', 'product')
+        .annotate(job_count=models.Count('id')).order_by('-job_count', 'customer_id', 'product')
+    ]
+
+    processes = processes or getattr(settings, 'SLA_ANALYSIS_PROCESSES', 0) or os.cpu_count() or 1
+    processes = min(processes, len(partitions)) or 1
+
+    results = {}
+    if processes <= 1:
+        for partition in partitions:
+            results[partition] = _analyze_partition(partition, full, in_database)
+    else:
+        context = multiprocessing.get_context()
+        write_lock = context.RLock() if connection.vendor == 'sqlite' else None
+
+        # Workers open their own connections; a forked child must not reuse the parent's
+        connections.close_all()
+
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'), write_lock)
+        ) as pool:
+            futures = {
+                pool.submit(_analyze_partition, partition, full, in_database): partition
+                for partition in partitions
+            }
+            for future in as_completed(futures):
+                partition = futures[future]
+                try:
+                    results[partition] = future.result()
+                except Exception as e:
+                    # The worker died (e.g. killed for memory) before returning
+                    results[partition] = {'error': str(e)}
+
+    summary = {'partitions': len(partitions), 'analyzed_count': 0, 'created_count': 0, 'updated_count': 0, 'failed': []}
+    for (partition_customer_id, partition_product), result in sorted(results.items()):
+        if 'error' in result:
+            logger.error(f"SLA analysis failed for customer {partition_customer_id} {partition_product}: {result['error']}")
+            summary['failed'].append({
+                'customer_id': partition_customer_id,
+                'product': partition_product,
+                'error': result['error']
+            })
+            continue
+        for key in ('analyzed_count', 'created_count', 'updated_count'):
+            summary[key] += result[key]
+
+    summary['message'] = (
+        f"Analyzed {summary['analyzed_count']} batch jobs in {summary['partitions']} customer/product partitions "
+        f"with {processes} workers: {summary['created_count']} created, {summary['updated_count']} updated"
+    )
+    if summary['failed']:
+        summary['message'] += f", {len(summary['failed'])} partitions failed"
+    return summary
+
+
+def _analyze_partition(partition, full, in_database):
+    from .utils import SLAAnalyzer
+
+    customer_id, product = partition
+    try:
+        return SLAAnalyzer.analyze_batch_performance_for_sla(
+            customer_id=customer_id, product=product, full=full, in_database=in_database
+        )
+    except Exception as e:
+        return {'error': str(e)}
@@ -0,0 +1,342 @@
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, router
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .excel_readers import estimate_row_count
+from .models import BatchJob, BatchSchedule, FileUpload, ProcessingTask, SLAAtRiskRun, SLAData, SLARecomputeRequest, VolumetricData
+from .utils import ExcelProcessor, SLAAnalyzer, UploadProgress, ingestion_batch_size, write_phase
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_task(task_type, file_upload=None, payload=None):
+    """Add a task to the database-backed queue drained by run_task_worker"""
+    return ProcessingTask.objects.create(
+        task_type=task_type,
+        file_upload=file_upload,
+        payload=payload or {}
+    )
+
+
+def enqueue_file_upload(file_upload):
+    """Queue a FileUpload for background processing"""
+    FileUpload.objects.filter(pk=file_upload.pk).update(status='QUEUED', stage='queued')
+    return enqueue_task('PROCESS_UPLOAD', file_upload=file_upload)
+
+
+def enqueue_file_upload_batch(file_uploads, processes=None):
+    """Queue several FileUploads to be ingested together by a process pool"""
+    file_upload_ids = [file_upload.pk for file_upload in file_uploads]
+    FileUpload.objects.filter(pk__in=file_upload_ids).update(status='QUEUED', stage='queued')
+    return enqueue_task(
+        'PROCESS_UPLOAD_BATCH',
+        payload={'file_upload_ids': file_upload_ids, 'processes': processes}
+    )
+
+
+def enqueue_sla_recompute(job_keys):
+    """
+    Mark the SLA results of (customer id, product, job name) keys as stale and queue their recomputation.
+
+    Keys are recorded as SLARecomputeRequest rows, and a RECOMPUTE_SLA task is
+    only added when none is pending, so a burst of definition edits, such as an
+    admin import, is recomputed in one pass by the worker.
+    """
+    for customer_id, product, job_name in job_keys:
+        SLARecomputeRequest.objects.update_or_create(customer_id=customer_id, product=product, job_name=job_name)
+    if not ProcessingTask.objects.filter(task_type='RECOMPUTE_SLA', status='PENDING').exists():
+        return enqueue_task('RECOMPUTE_SLA')
+    return None
+
+
+def claim_next_task(worker_name):
+    """
+    Claim the oldest pending task, or return None when the queue is empty.
+
+    The claim is a conditional UPDATE that only succeeds while the task is still
+    PENDING, so several workers can share the queue on SQLite and PostgreSQL
+    without row locks.
+    """
+    while True:
+        task_id = (
+            ProcessingTask.objects.filter(status='PENDING')
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if task_id is None:
+            return None
+
+        now = timezone.now()
+        claimed = ProcessingTask.objects.filter(pk=task_id, status='PENDING').update(
+            status='RUNNING',
+            worker=worker_name,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return ProcessingTask.objects.select_related('file_upload').get(pk=task_id)
+
+
+def requeue_stale_tasks(older_than_minutes):
+    """
+    Put RUNNING tasks whose worker has died back on the queue.
+
+    A worker records a heartbeat on its task every TASK_HEARTBEAT_INTERVAL
+    seconds for as long as it runs (see run_task), however long the task takes,
+    so only tasks whose heartbeat stopped more than older_than_minutes ago are
+    requeued; tasks claimed before heartbeats were recorded fall back to their
+    start time.
+    """
+    cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+    stale = Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    return ProcessingTask.objects.filter(stale, status='RUNNING').update(
+        status='PENDING',
+        worker='',
+        heartbeat_at=None
+    )
+
+
+@contextmanager
+def _heartbeat(task):
+    """Refresh task.heartbeat_at from a background thread while the block runs"""
+    interval = getattr(settings, 'TASK_HEARTBEAT_INTERVAL', 30)
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                try:
+                    ProcessingTask.objects.filter(pk=task.pk, status='RUNNING', worker=task.worker).update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception as e:
+                    # A long SQLite write can hold the database past the busy timeout; the next beat retries
+                    logger.warning(f"Could not record heartbeat of task {task.id}: {str(e)}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'task-{task.id}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_task(task):
+    """
+    Run a claimed task and record the outcome; returns True on success.
+
+    The outcome is only written while the task is still RUNNING under this
+    worker, so a task that was requeued meanwhile keeps the state of its new run.
+    """
+    handler = TASK_HANDLERS.get(task.task_type)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown task type: {task.task_type}")
+        with _heartbeat(task):
+            success, message = handler(task)
+        task.status = 'COMPLETED' if success else 'FAILED'
+        task.error = '' if success else message
+    except Exception as e:
+        logger.error(f"Task {task.id} ({task.task_type}) failed: {str(e)}")
+        task.status = 'FAILED'
+        task.error = traceback.format_exc()
+
+    task.finished_at = timezone.now()
+    recorded = ProcessingTask.objects.filter(pk=task.pk, status='RUNNING', worker=task.worker).update(
+        status=task.status,
+        error=task.error,
+        finished_at=task.finished_at
+    )
+    if not recorded:
+        logger.warning(f"Task {task.id} was requeued while {task.worker} ran it; its outcome is not recorded")
+    return task.status == 'COMPLETED'
+
+
+def process_file_upload(file_upload):
+    """
+    Ingest a stored upload and record the result and progress on its FileUpload.
+
+    Used by the background worker, and inline by FileUploadAPIView when
+    FILE_PROCESSING_ASYNC is off. Returns (success, message).
+    """
+    progress = UploadProgress(file_upload.id)
+    progress.set_stage(
+        'ingesting',
+        status='PROCESSING',
+        rows_total=estimate_row_count(file_upload.file_path),
+        rows_read=0,
+        rows_written=0,
+        processing_started_at=timezone.now(),
+        processing_finished_at=None
+    )
+
+    try:
+        # Batch performance uploads also write the SLA analysis of their runs
+        success, message = _run_file_processor(file_upload, progress)
+
+    except Exception as processing_error:
+        logger.error(f"Error processing upload {file_upload.id}: {str(processing_error)}")
+        success, message = False, f"Processing error: {str(processing_error)}"
+
+    progress.set_stage(
+        'done',
+        processed=success,
+        processing_log=message,
+        status='COMPLETED' if success else 'FAILED',
+        processing_finished_at=timezone.now()
+    )
+    return success, message
+
+
+def rollback_file_upload(file_upload):
+    """
+    Delete the rows an upload inserted and mark it ROLLED_BACK.
+
+    Rows are selected through their indexed file_upload column and deleted a
+    chunk of ids at a time with plain DELETE statements, one transaction per
+    chunk, so a large upload neither holds a long lock nor loads its rows for
+    the ORM's per-object cascade. SLAData computed from the upload's batch jobs
+    is deleted with them, as are their SLAAtRiskRun rows. Rows a later upload
+    rewrote belong to that upload and are kept. Batch jobs and volumetrics the
+    upload updated but an earlier upload inserted are kept too, with the values
+    this upload wrote, as the earlier values are not stored anywhere; they are
+    counted and reported rather than deleted along with the earlier upload's
+    data. Returns ({model name: rows deleted}, {model name: rows kept}).
+    """
+    chunk_size = ingestion_batch_size()
+    deleted = {}
+    kept = {}
+
+    for model, dependents in [
+        (SLAData, []),
+        (BatchJob, [(SLAData, 'batch_job_id'), (SLAAtRiskRun, 'batch_job_id')]),
+        (VolumetricData, []),
+        (BatchSchedule, []),
+    ]:
+        database = router.db_for_write(model)
+        rows = model.objects.filter(file_upload_id=file_upload.id)
+        if any(field.name == 'inserted_by_upload' for field in model._meta.get_fields()):
+            count = rows.exclude(inserted_by_upload_id=file_upload.id).count()
+            if count:
+                kept[model.__name__] = count
+            rows = rows.filter(inserted_by_upload_id=file_upload.id)
+
+        while True:
+            ids = list(rows.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with write_phase():
+                for dependent, field in dependents:
+                    count = dependent.objects.filter(**{f'{field}__in': ids})._raw_delete(database)
+                    deleted[dependent.__name__] = deleted.get(dependent.__name__, 0) + count
+                count = model.objects.filter(pk__in=ids)._raw_delete(database)
+                deleted[model.__name__] = deleted.get(model.__name__, 0) + count
+
+    summary = ', '.join(f"{count} {name}" for name, count in deleted.items()) or 'no rows'
+    if kept:
+        summary += (
+            '; kept ' + ', '.join(f"{count} {name}" for name, count in kept.items())
+            + ' rows it updated that an earlier upload inserted, with the values this upload wrote'
+        )
+    with write_phase():
+        FileUpload.objects.filter(pk=file_upload.pk).update(
+            status='ROLLED_BACK',
+            stage='rolled_back',
+            processed=False,
+            processing_log=f"{file_upload.processing_log}\nRolled back on {timezone.now():%Y-%m-%d %H:%M}: deleted {summary}".lstrip()
+        )
+    logger.info(f"Rolled back upload {file_upload.id}: deleted {summary}")
+    return deleted, kept
+
+
+def _upload_product(file_upload):
+    return file_upload.product or file_upload.customer.product
+
+
+def _run_file_processor(file_upload, progress):
+    """Dispatch an upload to the ExcelProcessor method for its file type"""
+    file_path = file_upload.file_path
+    customer_id = file_upload.customer_id
+    product = _upload_product(file_upload)
+
+    if file_upload.file_type == 'BATCH_PERFORMANCE':
+        return ExcelProcessor.process_batch_performance_file(file_path, customer_id, product, progress=progress, file_upload_id=file_upload.id)
+    if file_upload.file_type == 'VOLUMETRICS':
+        return ExcelProcessor.process_volumetrics_file(file_path, customer_id, product, progress=progress, file_upload_id=file_upload.id)
+    if file_upload.file_type == 'SLA_TRACKING':
+        return ExcelProcessor.process_sla_tracking_file(file_path, customer_id, product, progress=progress, file_upload_id=file_upload.id)
+    if file_upload.file_type == 'BATCH_SCHEDULE':
+        # Detect if this is EMB format by checking for JOBNAME column
+        df_sample = ExcelProcessor.read_excel_file(file_path, nrows=0)  # Read just the headers
+        if df_sample is not None and 'JOBNAME' in df_sample.columns:
+            # Tidal format; replaces the customer's schedule with the full set of columns
+            return ExcelProcessor.process_enhanced_batch_schedule_file(file_path, customer_id, product, progress=progress, file_upload_id=file_upload.id)
+        # Legacy format
+        return ExcelProcessor.process_batch_schedule_file(file_path, customer_id, product, progress=progress, file_upload_id=file_upload.id)
+
+    return False, f"Unsupported file type: {file_upload.file_type}"
+
+
+def _process_upload_task(task):
+    if task.file_upload is None:
+        return False, "Task has no file upload"
+    return process_file_upload(task.file_upload)
+
+
+def _process_upload_batch_task(task):
+    # Imported here: upload_pool imports this module from its worker processes
+    from .upload_pool import process_uploads_in_pool
+
+    results = process_uploads_in_pool(
+        task.payload.get('file_upload_ids', []),
+        processes=task.payload.get('processes')
+    )
+    failed = [file_upload_id for file_upload_id, (success, _) in results.items() if not success]
+    message = f"Processed {len(results)} uploads, {len(failed)} failed"
+    if failed:
+        message += f" (file uploads {', '.join(str(file_upload_id) for file_upload_id in sorted(failed))})"
+    return not failed, message
+
+
+def _recompute_sla_task(task):
+    # Requests recorded from now on get a task of their own, as this one is no longer pending
+    requested_before = timezone.now()
+    requests = list(
+        SLARecomputeRequest.objects.filter(requested_at__lte=requested_before)
+        .values_list('id', 'customer_id', 'product', 'job_name')
+    )
+    if not requests:
+        return True, "No SLA recomputation requested"
+
+    result = SLAAnalyzer.recompute_sla_for_jobs([request[1:] for request in requests])
+
+    # A key requested again meanwhile has a newer requested_at and is kept for the next pass
+    chunk_size = ingestion_batch_size()
+    request_ids = [request[0] for request in requests]
+    for start in range(0, len(request_ids), chunk_size):
+        SLARecomputeRequest.objects.filter(
+            pk__in=request_ids[start:start + chunk_size],
+            requested_at__lte=requested_before
+        ).delete()
+
+    logger.info(result['message'])
+    return True, result['message']
+
+
+TASK_HANDLERS = {
+    'PROCESS_UPLOAD': _process_upload_task,
+    'PROCESS_UPLOAD_BATCH': _process_upload_batch_task,
+    'RECOMPUTE_SLA': _recompute_sla_task,
+}
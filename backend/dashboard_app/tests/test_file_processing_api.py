@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+import pandas as pd
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from dashboard_app.models import BatchSchedule, Customer, FileUpload
+
+
+class FileProcessingAPITests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Acme', code='ACME', product='FACETS')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_tidal_schedule_goes_to_the_enhanced_loader(self):
+        path = os.path.join(self.directory.name, 'tidal.xlsx')
+        pd.DataFrame([
+            {'JOBNAME': 'NIGHTLY_LOAD', 'ID': '101', 'CATEGORY': 'TID', 'ENABLED OR DISABLED?': 'ENABLED',
+             'PARENT GROUP': 'NIGHTLY', 'CALENDAR': 'DAILY'},
+            {'JOBNAME': 'NIGHTLY', 'ID': '100', 'CATEGORY': 'GROUP', 'ENABLED OR DISABLED?': 'DISABLED',
+             'PARENT GROUP': '', 'CALENDAR': 'DAILY'},
+        ]).to_excel(path, index=False)
+
+        response = APIClient().post(reverse('process-file'), {
+            'file_path': path, 'customer_id': self.customer.id, 'file_type': 'BATCH_SCHEDULE'
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['success'], response.data['message'])
+        schedules = dict(BatchSchedule.objects.values_list('job_name', 'job_id'))
+        self.assertEqual(schedules, {'NIGHTLY_LOAD': '101', 'NIGHTLY': '100'})
+        file_upload = FileUpload.objects.get(pk=response.data['file_upload_id'])
+        self.assertEqual(file_upload.status, 'COMPLETED')
+        self.assertTrue(file_upload.processed)
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import pandas as pd
+
+from django.test import TransactionTestCase
+
+from dashboard_app.models import BatchJob, Customer, FileUpload, SLAAtRiskRun, SLAData, SLADefinition
+from dashboard_app.tasks import rollback_file_upload
+from dashboard_app.utils import ExcelProcessor, SLAAnalyzer
+
+
+class RollbackFileUploadTests(TransactionTestCase):
+    """Rollback runs its deletes in committed write phases, so foreign keys are checked as in production"""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Acme', code='ACME', product='FACETS')
+        self.now = datetime(2026, 10, 17, 10, 0, tzinfo=dt_timezone.utc)
+
+    def make_upload(self, name):
+        return FileUpload.objects.create(
+            customer=self.customer, product='FACETS', file_type='BATCH_PERFORMANCE',
+            file_name=name, file_path=f'/tmp/{name}', status='COMPLETED', processed=True
+        )
+
+    def make_job(self, file_upload, jobrun_id, status, start_time, end_time=None, job_name='NIGHTLY_LOAD'):
+        return BatchJob.objects.create(
+            customer=self.customer, file_upload=file_upload, inserted_by_upload=file_upload,
+            product='FACETS', job_name=job_name,
+            jobrun_id=jobrun_id, status=status, start_time=start_time, end_time=end_time,
+            month=start_time.strftime('%Y-%m'), year=start_time.year
+        )
+
+    def test_rollback_deletes_at_risk_rows_of_its_batch_jobs(self):
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='NIGHTLY_LOAD', sla_target_time=time(9, 0))
+        upload = self.make_upload('running.xlsx')
+        self.make_job(upload, '1', 'LONG_RUNNING', self.now - timedelta(hours=2))
+        SLAAnalyzer.evaluate_sla_risk(now=self.now)
+        self.assertEqual(SLAAtRiskRun.objects.count(), 1)
+
+        deleted, kept = rollback_file_upload(upload)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, 'ROLLED_BACK')
+        self.assertEqual(deleted['SLAAtRiskRun'], 1)
+        self.assertEqual(kept, {})
+        self.assertFalse(BatchJob.objects.exists())
+        self.assertFalse(SLAAtRiskRun.objects.exists())
+        self.assertFalse(SLAData.objects.exists())
+
+    def load_runs(self, file_upload, runs):
+        """Process a batch performance workbook of (jobrun id, start, end, status) runs for the upload"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, file_upload.file_name)
+            pd.DataFrame([
+                {'Job Name': 'NIGHTLY_LOAD', 'JobRun ID': jobrun_id, 'Start Time': start, 'End Time': end,
+                 'Job Status': status, 'Exit Code': 0, 'Duration': ''}
+                for jobrun_id, start, end, status in runs
+            ]).to_excel(path, index=False)
+            success, message = ExcelProcessor.process_batch_performance_file(
+                path, self.customer.id, 'FACETS', file_upload_id=file_upload.id, analyze_sla=False
+            )
+        self.assertTrue(success, message)
+
+    def test_rollback_keeps_rows_an_earlier_upload_inserted(self):
+        first = self.make_upload('first.xlsx')
+        second = self.make_upload('second.xlsx')
+        self.load_runs(first, [
+            ('1', '2026-10-15 01:00:00', '2026-10-15 02:00:00', 'SUCCESS'),
+            ('2', '2026-10-16 01:00:00', None, 'RUNNING'),
+        ])
+        self.load_runs(second, [
+            ('2', '2026-10-16 01:00:00', '2026-10-16 03:00:00', 'SUCCESS'),
+            ('3', '2026-10-17 01:00:00', '2026-10-17 02:00:00', 'SUCCESS'),
+        ])
+
+        deleted, kept = rollback_file_upload(second)
+
+        self.assertEqual(deleted['BatchJob'], 1)
+        self.assertEqual(kept, {'BatchJob': 1})
+        self.assertEqual(sorted(BatchJob.objects.values_list('jobrun_id', flat=True)), ['1', '2'])
+        updated = BatchJob.objects.get(jobrun_id='2')
+        self.assertEqual(updated.file_upload_id, second.id)
+        self.assertEqual(updated.inserted_by_upload_id, first.id)
+        second.refresh_from_db()
+        self.assertIn('kept 1 BatchJob rows', second.processing_log)
+
+        deleted, kept = rollback_file_upload(first)
+
+        self.assertEqual(deleted['BatchJob'], 1)
+        self.assertEqual(list(BatchJob.objects.values_list('jobrun_id', flat=True)), ['2'])
@@ -0,0 +1,109 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+
+from dashboard_app.models import BatchJob, Customer, SLAData, SLADefinition
+from dashboard_app.utils import SLAAnalyzer
+
+SLA_DATA_FIELDS = [
+    'customer_id', 'product', 'job_name', 'date', 'batch_job_id', 'sla_definition_id', 'sla_target_time',
+    'actual_completion_time', 'sla_target_minutes', 'actual_runtime_minutes', 'completed_next_day',
+    'days_late', 'sla_status', 'variance_minutes', 'variance_percentage', 'business_impact',
+]
+
+
+class SLAAnalysisInDatabaseTests(TestCase):
+    """The SQL analysis must store exactly what the Python analysis stores"""
+
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Acme', code='ACME', product='FACETS')
+        self.jobrun = 0
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='DAYTIME', sla_target_time=time(10, 0))
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='LATE_TARGET', sla_target_time=time(23, 50))
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='EARLY_TARGET', sla_target_time=time(0, 30))
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='INACTIVE', sla_target_time=time(6, 0), is_active=False)
+
+        day = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+        for second in range(60):
+            # Early and late by m minutes s seconds, which includes the .x5 ties 2.25 and 0.75
+            self.make_job('DAYTIME', day.replace(hour=8), day.replace(hour=9, minute=58, second=second))
+            self.make_job('DAYTIME', day.replace(hour=8), day.replace(hour=10, minute=2, second=second))
+        # Overnight: completed the next day, or days later, against late and early targets
+        self.make_job('LATE_TARGET', day.replace(hour=22), day.replace(hour=23, minute=49, second=15))
+        self.make_job('LATE_TARGET', day.replace(hour=22), day.replace(hour=23) + timedelta(minutes=70, seconds=45))
+        self.make_job('EARLY_TARGET', day.replace(hour=0, minute=5), day.replace(hour=0, minute=29, second=45))
+        self.make_job('EARLY_TARGET', day.replace(hour=23), day.replace(hour=0, minute=20) + timedelta(days=3))
+        # No SLA, an inactive SLA, and a completed run with no end time
+        self.make_job('ADHOC', day.replace(hour=1), day.replace(hour=2, minute=7, second=30))
+        self.make_job('INACTIVE', day.replace(hour=1), day.replace(hour=7))
+        self.make_job('DAYTIME', day.replace(hour=8), None)
+        # Not completed, so not analyzed by either path
+        self.make_job('DAYTIME', day.replace(hour=8), None, status='LONG_RUNNING')
+
+    def make_job(self, job_name, start_time, end_time, status='COMPLETED_NORMAL'):
+        self.jobrun += 1
+        BatchJob.objects.create(
+            customer=self.customer, product='FACETS', job_name=job_name, jobrun_id=str(self.jobrun),
+            status=status, start_time=start_time, end_time=end_time,
+            month=start_time.strftime('%Y-%m'), year=start_time.year
+        )
+
+    def analyze(self, in_database):
+        result = SLAAnalyzer.analyze_batch_performance_for_sla(full=True, in_database=in_database)
+        rows = sorted(SLAData.objects.values_list(*SLA_DATA_FIELDS), key=lambda row: row[4])
+        return result, rows
+
+    def test_sql_analysis_matches_python_analysis(self):
+        python_result, python_rows = self.analyze(in_database=False)
+        SLAData.objects.all().delete()
+        sql_result, sql_rows = self.analyze(in_database=True)
+
+        self.assertEqual(len(python_rows), 127)
+        self.assertEqual(sql_result['created_count'], python_result['created_count'])
+        self.assertEqual(sql_rows, python_rows)
+        statuses = {row[12] for row in sql_rows}
+        self.assertEqual(statuses, {'MET', 'MISSED', 'AT_RISK'})
+        impacts = {row[15] for row in sql_rows}
+        # Ties at 2.25, 2.75 and -1.25 minutes round half to even like format()
+        self.assertIn('Job completed 2.2 minutes late', impacts)
+        self.assertIn('Job completed 2.8 minutes late', impacts)
+        self.assertIn('Job completed 1.2 minutes early', impacts)
+
+    def test_sql_analysis_updates_rows_written_by_python(self):
+        _, python_rows = self.analyze(in_database=False)
+        sql_result, sql_rows = self.analyze(in_database=True)
+
+        self.assertEqual(sql_result['created_count'], 0)
+        self.assertEqual(sql_result['updated_count'], len(python_rows))
+        self.assertEqual(sql_rows, python_rows)
+
+    def test_round_tenths_matches_python_format(self):
+        if connection.vendor == 'postgresql':
+            def floor(value):
+                return f"CAST(FLOOR({value}) AS BIGINT)"
+        else:
+            def floor(value):
+                return f"CAST({value} AS INTEGER)"
+
+        # Decimal ties (exact in binary or not), values near them, and minute variances from seconds
+        values = [k / 20 for k in range(-200, 201)]
+        values += [0.05, 0.15, 0.25, 0.35, 0.45, 1.05, 2.675, 1234.55, 999.95, 0.049999999999999996]
+        values += [(10 * 60 + 2 + second / 60.0) - 600 for second in range(60)]
+        values += [(second / 60.0) - 0.75 for second in range(60)]
+
+        rounded = {}
+        # SQLite allows at most 500 terms in a compound SELECT
+        for start in range(0, len(values), 400):
+            chunk = values[start:start + 400]
+            source_sql = ' UNION ALL '.join(
+                f"SELECT {start + index} AS position, CAST(%s AS DOUBLE PRECISION) AS value" for index in range(len(chunk))
+            )
+            rounded_sql, column_name = SLAAnalyzer._round_tenths_sql(source_sql, 'value', floor)
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT s.position, s.{column_name} FROM ({rounded_sql}) s", chunk)
+                rounded.update(cursor.fetchall())
+
+        for index, value in enumerate(values):
+            with self.subTest(value=value):
+                self.assertEqual(rounded[index], int(format(abs(value), '.1f').replace('.', '')))
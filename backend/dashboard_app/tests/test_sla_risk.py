@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from dashboard_app.models import BatchJob, Customer, SLAAtRiskRun, SLADefinition
+from dashboard_app.utils import SLAAnalyzer
+
+
+class EvaluateSLARiskTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Acme', code='ACME', product='FACETS')
+        self.now = datetime(2026, 10, 17, 10, 0, tzinfo=dt_timezone.utc)
+        self.jobrun = 0
+        for job_name, target in [('LOAD', time(11, 0)), ('EXTRACT', time(10, 30)), ('LATE', time(9, 0))]:
+            SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name=job_name, sla_target_time=target)
+            # Ten past runs at 08:00 lasting 70 to 160 minutes
+            for days_ago in range(1, 11):
+                start_time = datetime(2026, 10, 17, 8, 0, tzinfo=dt_timezone.utc) - timedelta(days=days_ago)
+                self.make_job(job_name, 'COMPLETED_NORMAL', start_time, start_time + timedelta(minutes=60 + 10 * days_ago))
+
+    def make_job(self, job_name, status, start_time, end_time=None):
+        self.jobrun += 1
+        return BatchJob.objects.create(
+            customer=self.customer, product='FACETS', job_name=job_name, jobrun_id=str(self.jobrun),
+            status=status, start_time=start_time, end_time=end_time,
+            month=start_time.strftime('%Y-%m'), year=start_time.year
+        )
+
+    def risk_levels(self):
+        return dict(SLAAtRiskRun.objects.values_list('job_name', 'risk_level'))
+
+    def test_projects_in_flight_runs_against_their_deadline(self):
+        # Running an hour: median of the past runs is 115 minutes, so 10:55; the 90th percentile ends after 11:00
+        self.make_job('LOAD', 'LONG_RUNNING', self.now - timedelta(hours=1))
+        # Not started yet, so it cannot end before 10:30
+        self.make_job('EXTRACT', 'PENDING', self.now - timedelta(minutes=30))
+        # Past its 09:00 target and still running
+        self.make_job('LATE', 'LONG_RUNNING', self.now - timedelta(minutes=90))
+        # No SLA to miss
+        self.make_job('ADHOC', 'LONG_RUNNING', self.now - timedelta(hours=3))
+
+        result = SLAAnalyzer.evaluate_sla_risk(now=self.now)
+
+        self.assertEqual(result['in_flight_count'], 4)
+        self.assertEqual(self.risk_levels(), {'LOAD': 'AT_RISK', 'EXTRACT': 'LIKELY_MISS', 'LATE': 'BREACHED'})
+        load = SLAAtRiskRun.objects.get(job_name='LOAD')
+        self.assertEqual(load.projected_completion, datetime(2026, 10, 17, 10, 55, tzinfo=dt_timezone.utc))
+        self.assertEqual(load.history_runs, 10)
+
+    def test_ignores_finished_and_stale_runs(self):
+        # Ingestion marks runs that finished long as LONG_RUNNING; they have an end time
+        start_time = self.now - timedelta(hours=3)
+        self.make_job('LATE', 'LONG_RUNNING', start_time, start_time + timedelta(hours=2))
+        # A PENDING run from an old monthly extract
+        self.make_job('LOAD', 'PENDING', self.now - timedelta(days=20))
+
+        result = SLAAnalyzer.evaluate_sla_risk(now=self.now)
+
+        self.assertEqual(result['in_flight_count'], 0)
+        self.assertFalse(SLAAtRiskRun.objects.exists())
+
+    def test_drops_runs_that_are_no_longer_at_risk(self):
+        batch_job = self.make_job('LATE', 'LONG_RUNNING', self.now - timedelta(minutes=90))
+        SLAAnalyzer.evaluate_sla_risk(now=self.now)
+        self.assertEqual(self.risk_levels(), {'LATE': 'BREACHED'})
+
+        BatchJob.objects.filter(pk=batch_job.pk).update(status='COMPLETED_NORMAL', end_time=self.now)
+        SLAAnalyzer.evaluate_sla_risk(now=self.now)
+
+        self.assertFalse(SLAAtRiskRun.objects.exists())
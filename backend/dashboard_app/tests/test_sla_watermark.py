@@ -0,0 +1,74 @@
+import os
+import tempfile
+from datetime import date, datetime, time, timezone as dt_timezone
+
+import pandas as pd
+from django.test import TestCase
+
+from dashboard_app.models import BatchJob, Customer, SLAAnalysisWatermark, SLAData, SLADefinition
+from dashboard_app.utils import ExcelProcessor, SLAAnalyzer
+
+
+class IngestSLAWatermarkTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Acme', code='ACME', product='FACETS')
+        SLADefinition.objects.create(customer=self.customer, product='FACETS', job_name='NIGHTLY_LOAD', sla_target_time=time(6, 0))
+
+    def load_runs(self, runs):
+        """Ingest a batch performance workbook of (jobrun id, start, end) runs, analyzing SLA"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'runs.xlsx')
+            pd.DataFrame([
+                {'Job Name': 'NIGHTLY_LOAD', 'JobRun ID': jobrun_id, 'Start Time': start, 'End Time': end,
+                 'Job Status': 'SUCCESS', 'Exit Code': 0, 'Duration': ''}
+                for jobrun_id, start, end in runs
+            ]).to_excel(path, index=False)
+            success, message = ExcelProcessor.process_batch_performance_file(path, self.customer.id, 'FACETS')
+        self.assertTrue(success, message)
+
+    def analyzed_through(self):
+        return SLAAnalysisWatermark.objects.get(customer=self.customer, product='FACETS').analyzed_through
+
+    def test_ingest_covering_every_change_advances_the_watermark(self):
+        self.load_runs([('1', '2026-10-15 01:00:00', '2026-10-15 05:00:00')])
+        self.assertEqual(self.analyzed_through(), BatchJob.objects.get().updated_at)
+
+        self.load_runs([('2', '2026-10-16 01:00:00', '2026-10-16 07:00:00')])
+        self.assertEqual(self.analyzed_through(), BatchJob.objects.get(jobrun_id='2').updated_at)
+        self.assertEqual(SLAAnalyzer.analyze_batch_performance_for_sla()['analyzed_count'], 0)
+
+    def test_ingest_leaves_the_watermark_behind_unanalyzed_runs(self):
+        self.load_runs([('1', '2026-10-15 01:00:00', '2026-10-15 05:00:00')])
+        analyzed_through = self.analyzed_through()
+        start_time = datetime(2026, 10, 16, 1, 0, tzinfo=dt_timezone.utc)
+        unanalyzed = BatchJob.objects.create(
+            customer=self.customer, product='FACETS', job_name='NIGHTLY_LOAD', jobrun_id='manual',
+            status='COMPLETED_NORMAL', start_time=start_time, end_time=start_time.replace(hour=4),
+            month='2026-10', year=2026
+        )
+
+        self.load_runs([('2', '2026-10-17 01:00:00', '2026-10-17 07:00:00')])
+
+        self.assertEqual(self.analyzed_through(), analyzed_through)
+        SLAAnalyzer.analyze_batch_performance_for_sla()
+        self.assertTrue(SLAData.objects.filter(batch_job=unanalyzed).exists())
+        self.assertEqual(self.analyzed_through(), BatchJob.objects.latest('updated_at').updated_at)
+
+    def test_date_range_run_leaves_the_watermark_alone(self):
+        self.load_runs([('1', '2026-10-15 01:00:00', '2026-10-15 05:00:00')])
+        analyzed_through = self.analyzed_through()
+        for jobrun_id, day in [('manual-1', 15), ('manual-2', 16)]:
+            start_time = datetime(2026, 10, day, 2, 0, tzinfo=dt_timezone.utc)
+            BatchJob.objects.create(
+                customer=self.customer, product='FACETS', job_name='NIGHTLY_LOAD', jobrun_id=jobrun_id,
+                status='COMPLETED_NORMAL', start_time=start_time, end_time=start_time.replace(hour=4),
+                month='2026-10', year=2026
+            )
+
+        result = SLAAnalyzer.analyze_batch_performance_for_sla(date_from=date(2026, 10, 16), date_to=date(2026, 10, 16))
+
+        self.assertEqual(result['analyzed_count'], 1)
+        self.assertEqual(self.analyzed_through(), analyzed_through)
+        # The run outside the range is still picked up by the next incremental analysis
+        SLAAnalyzer.analyze_batch_performance_for_sla()
+        self.assertTrue(SLAData.objects.filter(batch_job__jobrun_id='manual-1').exists())
@@ -0,0 +1,67 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from dashboard_app.models import ProcessingTask
+from dashboard_app.tasks import TASK_HANDLERS, claim_next_task, requeue_stale_tasks, run_task
+
+
+class RequeueStaleTasksTests(TestCase):
+    def make_running(self, started_minutes_ago, heartbeat_minutes_ago):
+        now = timezone.now()
+        return ProcessingTask.objects.create(
+            task_type='RECOMPUTE_SLA', status='RUNNING', worker='host:1',
+            started_at=now - timedelta(minutes=started_minutes_ago),
+            heartbeat_at=None if heartbeat_minutes_ago is None else now - timedelta(minutes=heartbeat_minutes_ago)
+        )
+
+    def test_only_tasks_without_a_recent_heartbeat_are_requeued(self):
+        long_running = self.make_running(started_minutes_ago=180, heartbeat_minutes_ago=1)
+        dead = self.make_running(started_minutes_ago=30, heartbeat_minutes_ago=20)
+        claimed_before_heartbeats = self.make_running(started_minutes_ago=30, heartbeat_minutes_ago=None)
+
+        self.assertEqual(requeue_stale_tasks(10), 2)
+
+        statuses = dict(ProcessingTask.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[long_running.id], 'RUNNING')
+        self.assertEqual(statuses[dead.id], 'PENDING')
+        self.assertEqual(statuses[claimed_before_heartbeats.id], 'PENDING')
+
+    def test_outcome_of_a_requeued_task_is_not_recorded(self):
+        ProcessingTask.objects.create(task_type='RECOMPUTE_SLA')
+        task = claim_next_task('host:1')
+
+        def requeued_meanwhile(task):
+            ProcessingTask.objects.filter(pk=task.pk).update(status='PENDING', worker='')
+            return True, ''
+
+        with mock.patch.dict(TASK_HANDLERS, {'RECOMPUTE_SLA': requeued_meanwhile}):
+            run_task(task)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'PENDING')
+        self.assertIsNone(task.finished_at)
+
+
+class TaskHeartbeatTests(TransactionTestCase):
+    @override_settings(TASK_HEARTBEAT_INTERVAL=0.05)
+    def test_running_task_records_heartbeats(self):
+        ProcessingTask.objects.create(task_type='RECOMPUTE_SLA')
+        task = claim_next_task('host:1')
+        claimed_at = task.heartbeat_at
+        heartbeats = []
+
+        def slow_task(task):
+            time.sleep(0.5)
+            heartbeats.append(ProcessingTask.objects.get(pk=task.pk).heartbeat_at)
+            return True, ''
+
+        with mock.patch.dict(TASK_HANDLERS, {'RECOMPUTE_SLA': slow_task}):
+            self.assertTrue(run_task(task))
+
+        self.assertGreater(heartbeats[0], claimed_at)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'COMPLETED')
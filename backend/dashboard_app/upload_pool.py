@@ -0,0 +1,93 @@
+"""
+Process pool that ingests several uploads at once (bulk upload).
+
+Workers are separate processes, so reading and preparing workbooks uses every
+core. Django code is only imported inside functions: with the spawn and
+forkserver start methods the worker initializer has to set Django up before
+any model module can be imported.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+
+def process_uploads_in_pool(file_upload_ids, processes=None):
+    """
+    Process FileUploads concurrently and return {file_upload_id: (success, message)}.
+
+    processes defaults to BULK_UPLOAD_PROCESSES, or the number of CPUs. On SQLite,
+    which allows one writer at a time, the workers share a lock taken around each
+    ingestion write (see utils.write_phase), so they queue for the database
+    instead of failing with "database is locked" while reading and preparing
+    their files in parallel.
+    """
+    from django.conf import settings
+    from django.db import connection, connections
+    from .models import FileUpload
+    from .tasks import process_file_upload
+
+    file_upload_ids = list(file_upload_ids)
+    processes = processes or getattr(settings, 'BULK_UPLOAD_PROCESSES', 0) or os.cpu_count() or 1
+    processes = min(processes, len(file_upload_ids))
+
+    if processes <= 1:
+        return {
+            file_upload_id: process_file_upload(FileUpload.objects.get(pk=file_upload_id))
+            for file_upload_id in file_upload_ids
+        }
+
+    context = multiprocessing.get_context()
+    write_lock = context.RLock() if connection.vendor == 'sqlite' else None
+
+    # Workers open their own connections; a forked child must not reuse the parent's
+    connections.close_all()
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE'), write_lock)
+    ) as pool:
+        futures = {
+            pool.submit(_process_upload, file_upload_id): file_upload_id
+            for file_upload_id in file_upload_ids
+        }
+        for future in as_completed(futures):
+            file_upload_id = futures[future]
+            try:
+                results[file_upload_id] = future.result()
+            except Exception as e:
+                # The worker died (e.g. killed for memory) before recording the outcome
+                logger.error(f"Worker failed processing upload {file_upload_id}: {str(e)}")
+                message = f"Processing error: {str(e)}"
+                FileUpload.objects.filter(pk=file_upload_id).update(
+                    processed=False, processing_log=message, status='FAILED', stage='done'
+                )
+                results[file_upload_id] = (False, message)
+
+    return results
+
+
+def _init_worker(settings_module, write_lock):
+    if settings_module:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+    from .utils import set_write_lock
+    set_write_lock(write_lock)
+
+
+def _process_upload(file_upload_id):
+    from .models import FileUpload
+    from .tasks import process_file_upload
+
+    file_upload = FileUpload.objects.select_related('customer').get(pk=file_upload_id)
+    return process_file_upload(file_upload)
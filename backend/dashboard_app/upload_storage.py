@@ -0,0 +1,135 @@
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+
+from .models import FileUpload
+
+
+def content_addressed_path(content_hash, extension=''):
+    """Location of a stored upload, fanned out by hash prefix to keep directories small"""
+    return os.path.join(
+        settings.MEDIA_ROOT, 'uploads', 'objects',
+        content_hash[:2], content_hash[2:4],
+        f"{content_hash}{extension.lower()}"
+    )
+
+
+def store_upload(chunks, extension=''):
+    """
+    Write an upload to content-addressed storage while hashing it.
+
+    chunks is an iterable of bytes (e.g. UploadedFile.chunks()). The SHA-256 is
+    computed as the chunks are written to a temporary file, which is then moved
+    to uploads/objects/<hash>; if identical bytes are already stored the
+    temporary copy is discarded and the existing file is shared.
+
+    Returns (file_path, content_hash, size_in_bytes).
+    """
+    temp_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', 'tmp')
+    os.makedirs(temp_dir, exist_ok=True)
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temp_path, 'wb') as destination:
+            for chunk in chunks:
+                digest.update(chunk)
+                destination.write(chunk)
+                size += len(chunk)
+
+        content_hash = digest.hexdigest()
+        file_path = store_file(temp_path, content_hash, extension)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return file_path, content_hash, size
+
+
+def store_file(temp_path, content_hash, extension=''):
+    """Move an already hashed temporary file into content-addressed storage and return its path"""
+    file_path = content_addressed_path(content_hash, extension)
+    if os.path.exists(file_path):
+        os.remove(temp_path)
+    else:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.replace(temp_path, file_path)
+    return file_path
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    """SHA-256 and size of a file on disk, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def chunked_upload_path(chunked_upload_id):
+    """Temporary file that the chunks of a resumable upload are written into"""
+    return os.path.join(settings.MEDIA_ROOT, 'uploads', 'tmp', f"{chunked_upload_id}.chunked")
+
+
+def write_chunk(path, offset, stream, length, read_size=1024 * 1024):
+    """
+    Write length bytes read from stream at offset in path, creating the file if needed.
+
+    Returns (bytes_written, sha256 of the chunk). Memory use is bounded by
+    read_size, whatever the chunk size.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    digest = hashlib.sha256()
+    written = 0
+    # Created without truncating, as chunks of the same upload may arrive concurrently
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as destination:
+        destination.seek(offset)
+        while written < length:
+            data = stream.read(min(read_size, length - written))
+            if not data:
+                break
+            digest.update(data)
+            destination.write(data)
+            written += len(data)
+    return written, digest.hexdigest()
+
+
+def register_upload(customer, product, file_type, file_name, chunks, user=None, force=False):
+    """
+    Save an uploaded file to content-addressed storage and create its FileUpload.
+
+    Returns (file_upload, duplicate). When identical bytes were already uploaded
+    for the customer, product and file type (and force is off), nothing is
+    created and the earlier FileUpload is returned with duplicate=True.
+    """
+    file_extension = os.path.splitext(file_name)[1]
+    file_path, content_hash, file_size = store_upload(chunks, file_extension)
+    return register_stored_upload(
+        customer, product, file_type, file_name, file_path, content_hash, file_size, user=user, force=force
+    )
+
+
+def register_stored_upload(customer, product, file_type, file_name, file_path, content_hash, file_size, user=None, force=False):
+    """Create the FileUpload for a file already in content-addressed storage; see register_upload"""
+    previous_upload = None if force else FileUpload.find_previous_upload(customer, product, file_type, content_hash)
+    if previous_upload:
+        return previous_upload, True
+
+    file_upload = FileUpload.objects.create(
+        customer=customer,
+        product=product,
+        file_type=file_type,
+        file_name=file_name,
+        file_path=file_path,
+        file_size=file_size,
+        content_hash=content_hash,
+        processed=False,
+        uploaded_by=user if user is not None and user.is_authenticated else None
+    )
+    return file_upload, False
@@ -28,6 +28,12 @@ urlpatterns = [
     
     # File upload and processing APIs
     path('upload-file/', views.FileUploadAPIView.as_view(), name='upload-file'),
+    path('upload-file/bulk/', views.BulkFileUploadAPIView.as_view(), name='upload-file-bulk'),
+    path('upload-file/validate/', views.FileValidationAPIView.as_view(), name='upload-file-validate'),
+    path('upload-file/chunked/', views.ChunkedUploadAPIView.as_view(), name='upload-file-chunked'),
+    path('upload-file/chunked/<uuid:upload_id>/', views.ChunkedUploadDetailAPIView.as_view(), name='upload-file-chunked-detail'),
+    path('upload-file/chunked/<uuid:upload_id>/chunks/<int:index>/', views.ChunkedUploadChunkAPIView.as_view(), name='upload-file-chunked-chunk'),
+    path('upload-file/chunked/<uuid:upload_id>/complete/', views.ChunkedUploadCompleteAPIView.as_view(), name='upload-file-chunked-complete'),
     path('process-file/', views.FileProcessingAPIView.as_view(), name='process-file'),
     
     # Smart Predictor APIs
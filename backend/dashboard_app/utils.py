@@ -1,519 +1,1111 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date as date_type
 import os
 import logging
+import time
+import uuid
 from django.conf import settings
 from django.utils import timezone
-from django.db import models
-from .models import Customer, BatchJob, VolumetricData, SLAData, BatchSchedule, FileUpload
+from django.db import connection, models, transaction
+from .models import Customer, BatchJob, BatchJobStaging, VolumetricData, SLAData, BatchSchedule, FileUpload, ColumnMapping
 import re
+import hashlib
+import json
+from contextlib import contextmanager
+from .excel_readers import estimate_row_count, get_reader
 
 logger = logging.getLogger(__name__)
 
 
+class MemoryHighWaterMark:
+    """Track the peak resident memory of the current process across sample points"""
+
+    def __init__(self):
+        self.peak_bytes = 0
+        self.sample()
+
+    def sample(self):
+        """Record the current resident set size if it is a new high"""
+        self.peak_bytes = max(self.peak_bytes, MemoryHighWaterMark._resident_bytes())
+        return self.peak_bytes
+
+    @property
+    def peak_mb(self):
+        return self.peak_bytes / (1024 * 1024)
+
+    def describe(self):
+        """Short summary suitable for FileUpload.processing_log"""
+        if not self.peak_bytes:
+            return ''
+        return f"Peak memory: {self.peak_mb:.1f} MB"
+
+    @staticmethod
+    def _resident_bytes():
+        # Current RSS on Linux; elsewhere fall back to the lifetime peak reported by getrusage
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+        try:
+            import resource
+            import sys
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return max_rss if sys.platform == 'darwin' else max_rss * 1024
+        except ImportError:
+            return 0
+
+
+# Lock shared by bulk-upload pool workers on SQLite; see set_write_lock()
+_write_lock = None
+
+
+def set_write_lock(lock):
+    """
+    Serialise ingestion writes across processes with a multiprocessing lock.
+
+    SQLite allows one writer at a time, so processes ingesting uploads in
+    parallel take this lock around every write (see write_phase) and queue for
+    it instead of failing with "database is locked": a transaction that holds
+    the lock never races another writer for SQLite's own lock. The lock must
+    be re-entrant since write phases can nest. Pass None to disable.
+    """
+    global _write_lock
+    _write_lock = lock
+
+
+@contextmanager
+def write_phase():
+    """Transaction for one batch of ingestion writes, holding the write lock if one is set"""
+    if _write_lock is None:
+        with transaction.atomic():
+            yield
+    else:
+        with _write_lock, transaction.atomic():
+            yield
+
+
+def ingestion_batch_size():
+    """Rows per ingestion write (INGESTION_BATCH_SIZE), the same default for every loader"""
+    return getattr(settings, 'INGESTION_BATCH_SIZE', 2000)
+
+
+class UploadProgress:
+    """
+    Publish ingestion progress to a FileUpload row so clients can poll it.
+
+    Processors call advance() once per chunk; each call is a single UPDATE on the
+    FileUpload row, so the cost is independent of the chunk size.
+    """
+
+    def __init__(self, file_upload_id):
+        self.file_upload_id = file_upload_id
+        self.rows_read = 0
+        self.rows_written = 0
+
+    def set_stage(self, stage, **fields):
+        with write_phase():
+            FileUpload.objects.filter(pk=self.file_upload_id).update(stage=stage, **fields)
+
+    def advance(self, rows_read=0, rows_written=0):
+        self.rows_read += rows_read
+        self.rows_written += rows_written
+        with write_phase():
+            FileUpload.objects.filter(pk=self.file_upload_id).update(
+                rows_read=self.rows_read,
+                rows_written=self.rows_written
+            )
+
+
 class ExcelProcessor:
     """Utility class for processing Excel files and extracting data"""
 
+    # Expected columns: Job_Name, Start_Time, End_Time, jobrun_id, Status
+    BATCH_PERFORMANCE_REQUIRED_COLUMNS = ['Job_Name', 'Start_Time', 'End_Time', 'jobrun_id', 'Status']
+    BATCH_PERFORMANCE_OPTIONAL_COLUMNS = ['Exit_Code', 'Machine_Name', 'Duration']
+
+    # Alternative column names for all batch performance columns
+    BATCH_PERFORMANCE_ALT_NAMES = {
+        'Job_Name': ['Job Name', 'JobName', 'job_name', 'job name'],
+        'Start_Time': ['Start Time', 'StartTime', 'start_time', 'start time'],
+        'End_Time': ['End Time', 'EndTime', 'end_time', 'end time'],
+        'jobrun_id': ['JobRun ID', 'Job Run ID', 'jobrun id', 'JobRunID', 'job_run_id'],
+        'Status': ['Job Status', 'status', 'job_status', 'JobStatus'],
+        'Exit_Code': ['Exit Code', 'exit_code', 'ExitCode', 'exit code'],
+        'Machine_Name': ['Machine Name', 'machine_name', 'MachineName', 'machine name', 'Host', 'hostname'],
+        'Duration': ['Duration', 'duration', 'Runtime', 'runtime', 'Elapsed Time', 'elapsed_time']
+    }
+    BATCH_PERFORMANCE_COLUMN_SPEC = [
+        BATCH_PERFORMANCE_REQUIRED_COLUMNS, BATCH_PERFORMANCE_OPTIONAL_COLUMNS, BATCH_PERFORMANCE_ALT_NAMES
+    ]
+
+    # Expected columns: Job Name, Date, Total Volume, Total Runtime
+    VOLUMETRICS_REQUIRED_COLUMNS = ['Job Name', 'Date', 'Total Volume', 'Total Runtime']
+    # Optional volumetrics columns and the type each value is converted to
+    VOLUMETRICS_OPTIONAL_COLUMNS = {
+        'Peak Volume': int,
+        'Average Volume': float,
+        'Peak Runtime': float,
+        'Average Runtime': float,
+        'Min Performance': float,
+        'Max Performance': float,
+    }
+    VOLUMETRICS_COLUMN_SPEC = [VOLUMETRICS_REQUIRED_COLUMNS, list(VOLUMETRICS_OPTIONAL_COLUMNS)]
+    # VolumetricData fields written by ingestion besides the (customer, job_name, date) key
+    VOLUMETRICS_VALUE_FIELDS = [
+        'total_volume', 'total_runtime_minutes', 'records_processed_per_minute',
+        'peak_volume', 'average_volume', 'peak_runtime', 'average_runtime',
+        'min_performance', 'max_performance', 'processing_efficiency',
+    ]
+
+    # Enhanced status mapping with comprehensive patterns
+    STATUS_MAPPING = {
+        # Completed Normally variations
+        'completed normally': 'COMPLETED_NORMAL',
+        'completed normal': 'COMPLETED_NORMAL',
+        'complete normally': 'COMPLETED_NORMAL',
+        'complete normal': 'COMPLETED_NORMAL',
+        'completed_normal': 'COMPLETED_NORMAL',
+        'normal': 'COMPLETED_NORMAL',
+        'success': 'COMPLETED_NORMAL',
+        'successful': 'COMPLETED_NORMAL',
+
+        # Completed Normally* variations
+        'completed normally*': 'COMPLETED_NORMAL_STAR',
+        'completed normal*': 'COMPLETED_NORMAL_STAR',
+        'complete normally*': 'COMPLETED_NORMAL_STAR',
+        'complete normal*': 'COMPLETED_NORMAL_STAR',
+        'completed_normal_star': 'COMPLETED_NORMAL_STAR',
+        'completed_normal*': 'COMPLETED_NORMAL_STAR',
+        'normal*': 'COMPLETED_NORMAL_STAR',
+
+        # Completed Abnormally variations
+        'completed abnormally': 'COMPLETED_ABNORMAL',
+        'completed abnormal': 'COMPLETED_ABNORMAL',
+        'complete abnormally': 'COMPLETED_ABNORMAL',
+        'complete abnormal': 'COMPLETED_ABNORMAL',
+        'completed_abnormal': 'COMPLETED_ABNORMAL',
+        'abnormal': 'COMPLETED_ABNORMAL',
+        'warning': 'COMPLETED_ABNORMAL',
+        'completed with warnings': 'COMPLETED_ABNORMAL',
+        'completed with issues': 'COMPLETED_ABNORMAL',
+
+        # Failed variations
+        'failed': 'FAILED',
+        'failure': 'FAILED',
+        'error': 'FAILED',
+        'aborted': 'FAILED',
+        'terminated': 'FAILED',
+
+        # Long Running variations
+        'long running': 'LONG_RUNNING',
+        'long-running': 'LONG_RUNNING',
+        'long_running': 'LONG_RUNNING',
+        'running': 'LONG_RUNNING',
+        'in progress': 'LONG_RUNNING',
+        'timeout': 'LONG_RUNNING',
+
+        # Pending variations
+        'pending': 'PENDING',
+        'waiting': 'PENDING',
+        'queued': 'PENDING',
+        'scheduled': 'PENDING'
+    }
+
     @staticmethod
-    def read_excel_file(file_path, sheet_name=None):
-        """Read Excel file and return DataFrame"""
+    def read_excel_file(file_path, sheet_name=None, nrows=None, engine=None):
+        """
+        Read Excel file and return DataFrame.
+
+        The reader engine is picked by excel_readers.get_reader() from the file
+        content, so a workbook uploaded with a .csv name is still parsed as Excel.
+        Pass nrows to read only the header and the first nrows data rows; a
+        streaming engine is then preferred, so the rest of the sheet is never parsed.
+        """
         try:
-            if sheet_name:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
-            else:
-                df = pd.read_excel(file_path)
-            return df
+            reader = get_reader(file_path, engine=engine, streaming=nrows is not None)
+            return reader.read(file_path, sheet_name=sheet_name, nrows=nrows)
         except Exception as e:
             logger.error(f"Error reading Excel file {file_path}: {str(e)}")
             return None
 
     @staticmethod
-    def process_batch_performance_file(file_path, customer_id, product='FACETS'):
-        """Process batch performance Excel file and create BatchJob records"""
+    def read_excel_chunks(file_path, chunk_size=None, sheet_name=None, engine=None):
+        """
+        Yield the rows of an Excel file as DataFrames of at most chunk_size rows.
+
+        Files above EXCEL_STREAMING_THRESHOLD_MB are streamed through a row iterator
+        (openpyxl read-only), so only one chunk is held in memory at a time no matter
+        how large the workbook is; smaller files use the fastest installed engine.
+        The index of each chunk continues across chunks, so row numbers in log
+        messages refer to the whole sheet. A sheet with only a header yields one
+        empty DataFrame.
+        """
+        chunk_size = chunk_size or getattr(settings, 'EXCEL_STREAM_CHUNK_ROWS', 10000)
+
+        try:
+            reader = get_reader(file_path, engine=engine)
+            chunks = reader.iter_chunks(file_path, chunk_size, sheet_name=sheet_name)
+            yield next(chunks)
+        except StopIteration:
+            return
+        except Exception as e:
+            logger.error(f"Error reading Excel file {file_path}: {str(e)}")
+            return
+
+        yield from chunks
+
+    @staticmethod
+    def resolve_column_positions(columns, customer, file_type, spec, matcher):
+        """
+        Resolve expected columns to positions in a header row, cached by header signature.
+
+        matcher(columns) does the (fuzzy) name matching and returns ({expected: column},
+        [missing required columns]). Its result is stored as positions in ColumnMapping,
+        keyed by a hash of the header row and spec (the expected columns and their
+        alternative names), so repeat uploads of the same template skip matching and a
+        change to spec invalidates old entries. Returns ({expected: position}, missing).
+        """
+        columns = list(columns)
+        header = [str(column) for column in columns]
+        signature = hashlib.sha256(
+            json.dumps([header, spec], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+        cached = ColumnMapping.objects.filter(
+            customer=customer, file_type=file_type, header_signature=signature
+        ).first()
+        if cached:
+            with write_phase():
+                ColumnMapping.objects.filter(pk=cached.pk).update(
+                    hit_count=models.F('hit_count') + 1,
+                    last_used_at=timezone.now()
+                )
+            return cached.positions, cached.missing_columns
+
+        column_mapping, missing_columns = matcher(columns)
+        positions = {expected: columns.index(column) for expected, column in column_mapping.items()}
+        with write_phase():
+            ColumnMapping.objects.get_or_create(
+                customer=customer,
+                file_type=file_type,
+                header_signature=signature,
+                defaults={'header': header, 'positions': positions, 'missing_columns': missing_columns}
+            )
+        return positions, missing_columns
+
+    @staticmethod
+    def process_batch_performance_file(file_path, customer_id, product='FACETS', progress=None, file_upload_id=None, analyze_sla=True):
+        """
+        Process batch performance Excel file and create BatchJob records.
+
+        The workbook is streamed in fixed-size row chunks (see read_excel_chunks).
+        Within each chunk timestamps, durations, statuses and exit codes are
+        derived a column at a time and the rows are bulk loaded into
+        BatchJobStaging. Once the whole file has been read, the staged rows are
+        upserted into BatchJob on the run natural key (customer, product,
+        jobrun_id, start_time) in a single transaction (see _publish_batch_jobs),
+        so dashboards only ever see complete files and a failure midway leaves
+        BatchJob untouched. Unless analyze_sla is off, SLAData for the runs that
+        were inserted or updated is computed in the same transaction (see
+        SLAAnalyzer.analyze_published_batch_jobs); a failure there is reported in
+        the message without failing the upload. Rows that cannot be ingested are
+        logged individually and counted in the returned message. An optional
+        UploadProgress is advanced after every chunk.
+        """
+        load_id = uuid.uuid4().hex
         try:
-            df = ExcelProcessor.read_excel_file(file_path)
-            if df is None:
+            customer = Customer.objects.get(id=customer_id)
+            memory = MemoryHighWaterMark()
+            column_mapping = None
+            rejected_count = 0
+
+            # Staged rows of loads that died without cleaning up after themselves
+            with write_phase():
+                BatchJobStaging.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).delete()
+
+            for df in ExcelProcessor.read_excel_chunks(file_path):
+                if column_mapping is None:
+                    positions, missing_columns = ExcelProcessor.resolve_column_positions(
+                        df.columns, customer, 'BATCH_PERFORMANCE',
+                        ExcelProcessor.BATCH_PERFORMANCE_COLUMN_SPEC,
+                        ExcelProcessor._map_batch_performance_columns
+                    )
+                    if missing_columns:
+                        return False, f"Missing required column: {missing_columns[0]}. Available columns: {list(df.columns)}"
+                    column_mapping = {expected: df.columns[position] for expected, position in positions.items()}
+
+                frame, rejects = ExcelProcessor._prepare_batch_job_frame(df, column_mapping)
+                for index, reason in rejects:
+                    logger.error(f"Error processing row {index}: {reason}")
+
+                with write_phase():
+                    ExcelProcessor._stage_batch_jobs(frame, {
+                        'load_id': load_id, 'file_upload': file_upload_id,
+                        'customer': customer.id, 'product': product,
+                    })
+                rejected_count += len(rejects)
+                memory.sample()
+                if progress:
+                    progress.advance(rows_read=len(df))
+
+            if column_mapping is None:
                 return False, "Failed to read Excel file"
 
-            customer = Customer.objects.get(id=customer_id)
-            created_count = 0
+            if progress:
+                progress.set_stage('publishing')
+            sla_message = None
+            with write_phase():
+                counts, batch_job_ids = ExcelProcessor._publish_batch_jobs(load_id)
+                if analyze_sla:
+                    try:
+                        # Savepoint, so that a failed analysis keeps the published runs
+                        with transaction.atomic():
+                            sla_result = SLAAnalyzer.analyze_published_batch_jobs(customer_id, product, batch_job_ids)
+                        sla_message = f"SLA Analysis: {sla_result['message']}"
+                    except Exception as sla_error:
+                        logger.error(f"Error analyzing SLA for batch performance file: {str(sla_error)}")
+                        sla_message = f"SLA Analysis Warning: {str(sla_error)}"
+            if progress:
+                progress.advance(rows_written=counts['inserted'] + counts['updated'])
+
+            processed_count = counts['inserted'] + counts['updated'] + counts['unchanged']
+            message = (
+                f"Successfully processed {processed_count} batch job records: "
+                f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+            if counts['duplicate']:
+                message += f" ({counts['duplicate']} duplicate runs in file)"
+            if rejected_count:
+                message += f" ({rejected_count} rows rejected)"
+            if memory.describe():
+                message += f" | {memory.describe()}"
+            if sla_message:
+                message += f" | {sla_message}"
+            return True, message
 
-            # Expected columns: Job_Name, Start_Time, End_Time, jobrun_id, Status
-            required_columns = ['Job_Name', 'Start_Time', 'End_Time', 'jobrun_id', 'Status']
-            optional_columns = ['Exit_Code', 'Machine_Name', 'Duration']
-            # Check for required columns (allow some flexibility in naming)
-            column_mapping = {}
-            all_columns = required_columns + optional_columns
-            
-            # Define alternative column names for all columns
-            alt_names = {
-                'Job_Name': ['Job Name', 'JobName', 'job_name', 'job name'],
-                'Start_Time': ['Start Time', 'StartTime', 'start_time', 'start time'],
-                'End_Time': ['End Time', 'EndTime', 'end_time', 'end time'],
-                'jobrun_id': ['JobRun ID', 'Job Run ID', 'jobrun id', 'JobRunID', 'job_run_id'],
-                'Status': ['Job Status', 'status', 'job_status', 'JobStatus'],
-                'Exit_Code': ['Exit Code', 'exit_code', 'ExitCode', 'exit code'],
-                'Machine_Name': ['Machine Name', 'machine_name', 'MachineName', 'machine name', 'Host', 'hostname'],
-                'Duration': ['Duration', 'duration', 'Runtime', 'runtime', 'Elapsed Time', 'elapsed_time']
-            }
-            
-            # Process required columns first
-            for req_col in required_columns:
-                found = False
-                for df_col in df.columns:
-                    if df_col.lower().replace('_', ' ').replace(' ', '_') == req_col.lower():
-                        column_mapping[req_col] = df_col
-                        found = True
-                        break
-                if not found:
-                    # Try alternative column names
-                    for alt_name in alt_names.get(req_col, []):
-                        if alt_name in df.columns:
-                            column_mapping[req_col] = alt_name
-                            found = True
-                            break
-                
-                if not found:
-                    return False, f"Missing required column: {req_col}. Available columns: {list(df.columns)}"
-            
-            # Map optional columns (don't fail if missing)
-            for opt_col in optional_columns:
-                found = False
-                for df_col in df.columns:
-                    if df_col.lower().replace('_', ' ').replace(' ', '_') == opt_col.lower():
-                        column_mapping[opt_col] = df_col
-                        found = True
+        except Exception as e:
+            logger.error(f"Error processing batch performance file: {str(e)}")
+            return False, str(e)
+
+        finally:
+            # Published rows are already gone; this clears a load that failed
+            with write_phase():
+                BatchJobStaging.objects.filter(load_id=load_id).delete()
+
+    @staticmethod
+    def _map_batch_performance_columns(columns):
+        """Resolve batch performance columns against the expected names and their alternatives"""
+        columns = list(columns)
+        column_mapping = {}
+        missing_columns = []
+        required_columns = ExcelProcessor.BATCH_PERFORMANCE_REQUIRED_COLUMNS
+
+        for expected in required_columns + ExcelProcessor.BATCH_PERFORMANCE_OPTIONAL_COLUMNS:
+            found = None
+            for df_col in columns:
+                if str(df_col).lower().replace('_', ' ').replace(' ', '_') == expected.lower():
+                    found = df_col
+                    break
+            if found is None:
+                # Try alternative column names
+                for alt_name in ExcelProcessor.BATCH_PERFORMANCE_ALT_NAMES.get(expected, []):
+                    if alt_name in columns:
+                        found = alt_name
                         break
-                if not found:
-                    # Try alternative column names
-                    for alt_name in alt_names.get(opt_col, []):
-                        if alt_name in df.columns:
-                            column_mapping[opt_col] = alt_name
-                            found = True
-                            break
 
-            for index, row in df.iterrows():
-                try:
-                    # Parse start time
-                    start_time = pd.to_datetime(row[column_mapping['Start_Time']])
-                    end_time = pd.to_datetime(row[column_mapping['End_Time']]) if pd.notna(row[column_mapping['End_Time']]) else None
-                    
-                    # Calculate duration from timestamps (always prefer this over Excel Duration column)
-                    duration_minutes = None
-                    if end_time and start_time:
-                        # Check if timestamps are in wrong order and swap if necessary
-                        if end_time < start_time:
-                            logger.warning(f"End time ({end_time}) is before start time ({start_time}) for job {row[column_mapping['Job_Name']]} - swapping timestamps")
-                            start_time, end_time = end_time, start_time
-                        
-                        duration_minutes = (end_time - start_time).total_seconds() / 60
-                        
-                        # Validate duration is reasonable (between 0 and 24 hours)
-                        if duration_minutes < 0:
-                            logger.error(f"Negative duration detected for job {row[column_mapping['Job_Name']]}: {duration_minutes:.2f} minutes")
-                            duration_minutes = None
-                        elif duration_minutes > 1440:  # More than 24 hours
-                            logger.warning(f"Very long duration detected for job {row[column_mapping['Job_Name']]}: {duration_minutes:.2f} minutes")
-                        
-                        if duration_minutes is not None:
-                            logger.info(f"Duration calculated for {row[column_mapping['Job_Name']]}: {duration_minutes:.2f} minutes")
-                    else:
-                        # Fallback: try to parse Excel Duration column if timestamps are missing
-                        if 'Duration' in column_mapping and pd.notna(row[column_mapping['Duration']]):
-                            try:
-                                excel_duration = str(row[column_mapping['Duration']]).strip()
-                                if ':' in excel_duration:
-                                    # Parse HH:MM:SS format
-                                    parts = excel_duration.split(':')
-                                    if len(parts) >= 3:
-                                        hours = int(parts[0])
-                                        minutes = int(parts[1])
-                                        seconds = int(parts[2])
-                                        duration_minutes = hours * 60 + minutes + seconds / 60
-                                        logger.info(f"Duration from Excel column for {row[column_mapping['Job_Name']]}: {duration_minutes:.2f} minutes")
-                                    else:
-                                        logger.warning(f"Invalid duration format in Excel: {excel_duration}")
-                                else:
-                                    # Try to convert as float (assume minutes)
-                                    duration_minutes = float(excel_duration)
-                                    logger.info(f"Duration from Excel (as minutes) for {row[column_mapping['Job_Name']]}: {duration_minutes:.2f} minutes")
-                            except (ValueError, TypeError) as e:
-                                logger.warning(f"Could not parse Excel duration for {row[column_mapping['Job_Name']]}: {e}")
-                        
-                        if duration_minutes is None:
-                            logger.warning(f"No duration available for job {row[column_mapping['Job_Name']]}")
+            if found is not None:
+                column_mapping[expected] = found
+            elif expected in required_columns:
+                missing_columns.append(expected)
 
-                    # Determine if long running (more than 4 hours)
-                    is_long_running = duration_minutes > 240 if duration_minutes else False
+        return column_mapping, missing_columns
 
-                    # Get optional fields
-                    exit_code = None
-                    machine_name = ''
-                    
-                    # Try to get Exit_Code if it exists
-                    if 'Exit_Code' in column_mapping and pd.notna(row[column_mapping['Exit_Code']]):
-                        try:
-                            exit_code = int(row[column_mapping['Exit_Code']])
-                        except (ValueError, TypeError):
-                            exit_code = None
-                    
-                    # Try to get Machine_Name if it exists
-                    if 'Machine_Name' in column_mapping and pd.notna(row[column_mapping['Machine_Name']]):
-                        machine_name = str(row[column_mapping['Machine_Name']])[:200]  # Limit to 200 chars
+    @staticmethod
+    def _prepare_batch_job_frame(df, column_mapping):
+        """
+        Derive BatchJob field values for a whole DataFrame at once.
 
-                    # Map status from the required Status column
-                    status_text = str(row[column_mapping['Status']]).strip()
-                    
-                    # Enhanced status mapping with comprehensive patterns
-                    status_mapping = {
-                        # Completed Normally variations
-                        'completed normally': 'COMPLETED_NORMAL',
-                        'completed normal': 'COMPLETED_NORMAL',
-                        'complete normally': 'COMPLETED_NORMAL',
-                        'complete normal': 'COMPLETED_NORMAL',
-                        'completed_normal': 'COMPLETED_NORMAL',
-                        'normal': 'COMPLETED_NORMAL',
-                        'success': 'COMPLETED_NORMAL',
-                        'successful': 'COMPLETED_NORMAL',
-                        
-                        # Completed Normally* variations
-                        'completed normally*': 'COMPLETED_NORMAL_STAR',
-                        'completed normal*': 'COMPLETED_NORMAL_STAR',
-                        'complete normally*': 'COMPLETED_NORMAL_STAR',
-                        'complete normal*': 'COMPLETED_NORMAL_STAR',
-                        'completed_normal_star': 'COMPLETED_NORMAL_STAR',
-                        'completed_normal*': 'COMPLETED_NORMAL_STAR',
-                        'normal*': 'COMPLETED_NORMAL_STAR',
-                        
-                        # Completed Abnormally variations
-                        'completed abnormally': 'COMPLETED_ABNORMAL',
-                        'completed abnormal': 'COMPLETED_ABNORMAL',
-                        'complete abnormally': 'COMPLETED_ABNORMAL',
-                        'complete abnormal': 'COMPLETED_ABNORMAL',
-                        'completed_abnormal': 'COMPLETED_ABNORMAL',
-                        'abnormal': 'COMPLETED_ABNORMAL',
-                        'warning': 'COMPLETED_ABNORMAL',
-                        'completed with warnings': 'COMPLETED_ABNORMAL',
-                        'completed with issues': 'COMPLETED_ABNORMAL',
-                        
-                        # Failed variations
-                        'failed': 'FAILED',
-                        'failure': 'FAILED',
-                        'error': 'FAILED',
-                        'aborted': 'FAILED',
-                        'terminated': 'FAILED',
-                        
-                        # Long Running variations
-                        'long running': 'LONG_RUNNING',
-                        'long-running': 'LONG_RUNNING',
-                        'long_running': 'LONG_RUNNING',
-                        'running': 'LONG_RUNNING',
-                        'in progress': 'LONG_RUNNING',
-                        'timeout': 'LONG_RUNNING',
-                        
-                        # Pending variations
-                        'pending': 'PENDING',
-                        'waiting': 'PENDING',
-                        'queued': 'PENDING',
-                        'scheduled': 'PENDING'
-                    }
-                    
-                    # Clean and normalize the status text for better matching
-                    normalized_status = status_text.lower().strip()
-                    # Remove extra spaces and special characters except asterisk
-                    normalized_status = re.sub(r'\s+', ' ', normalized_status)
-                    normalized_status = re.sub(r'[^\w\s*]', '', normalized_status)
-                    
-                    status = status_mapping.get(normalized_status)
-                    
-                    # If still not found, try partial matching for key terms
-                    if not status:
-                        if 'normal' in normalized_status and '*' in normalized_status:
-                            status = 'COMPLETED_NORMAL_STAR'
-                        elif 'normal' in normalized_status:
-                            status = 'COMPLETED_NORMAL'
-                        elif 'abnormal' in normalized_status:
-                            status = 'COMPLETED_ABNORMAL'
-                        elif 'fail' in normalized_status or 'error' in normalized_status:
-                            status = 'FAILED'
-                        elif 'running' in normalized_status or 'progress' in normalized_status:
-                            status = 'LONG_RUNNING'
-                        elif 'pending' in normalized_status or 'wait' in normalized_status:
-                            status = 'PENDING'
-                    
-                    # Final fallback logic
-                    if not status:
-                        if end_time is None:
-                            status = 'PENDING'
-                        elif is_long_running:
-                            status = 'LONG_RUNNING'
-                        else:
-                            status = 'COMPLETED_NORMAL'
-                        logger.warning(f"Unknown status '{status_text}' (normalized: '{normalized_status}') for row {index}, using fallback: {status}")
-                    else:
-                        logger.info(f"Mapped status '{status_text}' to '{status}' for row {index}")
-
-                    # Auto-assign exit code if missing from Excel file
-                    if exit_code is None:
-                        # Assign realistic exit codes based on job status
-                        if status in ['COMPLETED_NORMAL', 'COMPLETED_NORMAL_STAR']:
-                            exit_code = 0  # Success
-                        elif status == 'COMPLETED_ABNORMAL':
-                            exit_code = 1  # Warning/abnormal completion
-                        elif status == 'FAILED':
-                            exit_code = 1  # Error
-                        elif status == 'LONG_RUNNING':
-                            exit_code = 0  # Assume success for long running jobs
-                        else:
-                            exit_code = 0  # Default to success for unknown statuses
-                        
-                        logger.info(f"Auto-assigned exit_code {exit_code} for job {row[column_mapping['Job_Name']]} based on status '{status}'")
+        Returns a DataFrame with one column per BatchJob field (only rows that can be
+        ingested) and a list of (row index, reason) tuples for rejected rows.
+        """
+        job_names = df[column_mapping['Job_Name']]
+        start_time = ExcelProcessor._parse_datetime_column(df[column_mapping['Start_Time']])
+        end_raw = df[column_mapping['End_Time']]
+        end_time = ExcelProcessor._parse_datetime_column(end_raw)
+
+        reject_mask = start_time.isna()
+        reject_reasons = pd.Series('Invalid or missing start time', index=df.index).where(reject_mask)
+        bad_end = end_time.isna() & end_raw.notna() & ~reject_mask
+        reject_reasons = reject_reasons.mask(bad_end, 'Invalid end time')
+        reject_mask = reject_mask | bad_end
+
+        # Swap timestamps that are in the wrong order
+        swapped = end_time < start_time
+        if swapped.any():
+            logger.warning(f"End time is before start time for {int(swapped.sum())} rows - swapping timestamps")
+            start_time, end_time = start_time.mask(swapped, end_time), end_time.mask(swapped, start_time)
+
+        # Duration from timestamps (always preferred over the Excel Duration column)
+        duration_minutes = (end_time - start_time).dt.total_seconds() / 60
+        very_long = duration_minutes > 1440
+        if very_long.any():
+            logger.warning(f"Very long duration (over 24 hours) detected for {int(very_long.sum())} rows")
+
+        # Fallback: parse the Excel Duration column where timestamps are incomplete
+        if 'Duration' in column_mapping:
+            duration_raw = df[column_mapping['Duration']]
+            needs_fallback = duration_minutes.isna() & duration_raw.notna()
+            if needs_fallback.any():
+                duration_minutes = duration_minutes.mask(
+                    needs_fallback,
+                    duration_raw[needs_fallback].map(ExcelProcessor._parse_duration_minutes)
+                ).astype(float)
+
+        # Determine if long running (more than 4 hours)
+        is_long_running = (duration_minutes > 240).fillna(False)
+
+        status = ExcelProcessor._map_status_column(df[column_mapping['Status']])
+        unknown_status = status.isna()
+        if unknown_status.any():
+            fallback_status = np.select(
+                [end_time.isna(), is_long_running],
+                ['PENDING', 'LONG_RUNNING'],
+                default='COMPLETED_NORMAL'
+            )
+            status = status.mask(unknown_status, pd.Series(fallback_status, index=df.index))
+
+        # Exit codes from the file, auto-assigned from status where missing
+        if 'Exit_Code' in column_mapping:
+            exit_code = np.trunc(pd.to_numeric(df[column_mapping['Exit_Code']], errors='coerce'))
+        else:
+            exit_code = pd.Series(np.nan, index=df.index)
+        status_exit_code = status.isin(['COMPLETED_ABNORMAL', 'FAILED']).astype(int)
+        exit_code = exit_code.fillna(status_exit_code).astype(int)
 
-                    batch_job = BatchJob.objects.create(
-                        customer=customer,
-                        job_name=str(row[column_mapping['Job_Name']]),
-                        jobrun_id=str(row[column_mapping['jobrun_id']]),
-                        job_id='',  # Keep empty for backward compatibility
-                        status=status,
-                        product=product,  # Explicitly set the product from upload parameter
-                        start_time=start_time,
-                        end_time=end_time,
-                        duration_minutes=duration_minutes,
-                        exit_code=exit_code,
-                        error_message=str(row.get('Error Message', '')),
-                        month=start_time.strftime('%Y-%m'),
-                        year=start_time.year,
-                        is_long_running=is_long_running
-                    )
-                    created_count += 1
-                    
-                    # Debug logging for verification
-                    logger.debug(f"Created BatchJob {batch_job.id}: {batch_job.job_name} - Status: {status} (from '{status_text}') - Product: {batch_job.product}")
+        if 'Error Message' in df.columns:
+            error_message = df['Error Message'].fillna('').astype(object).map(str)
+        else:
+            error_message = ''
+
+        frame = pd.DataFrame({
+            'job_name': job_names.astype(object).map(str),
+            'jobrun_id': df[column_mapping['jobrun_id']].astype(object).map(str),
+            'status': status,
+            'start_time': start_time,
+            'end_time': end_time,
+            'duration_minutes': duration_minutes,
+            'exit_code': exit_code,
+            'error_message': error_message,
+            'is_long_running': is_long_running.astype(bool),
+        }, index=df.index)
+
+        frame = frame[~reject_mask]
+        frame['start_time'] = ExcelProcessor._make_aware_column(frame['start_time'])
+        frame['end_time'] = ExcelProcessor._make_aware_column(frame['end_time'])
+        frame['month'] = frame['start_time'].dt.strftime('%Y-%m')
+        frame['year'] = frame['start_time'].dt.year
+
+        rejects = list(reject_reasons[reject_mask].items())
+        return frame, rejects
+
+    # BatchJob fields written by ingestion besides the natural key
+    BATCH_JOB_VALUE_FIELDS = [
+        'job_name', 'status', 'end_time', 'duration_minutes', 'exit_code',
+        'error_message', 'month', 'year', 'is_long_running',
+    ]
 
-                except Exception as e:
-                    logger.error(f"Error processing row {index}: {str(e)}")
+    @staticmethod
+    def _stage_batch_jobs(frame, scope):
+        """
+        Insert a prepared frame into BatchJobStaging with one executemany.
+
+        scope holds the column values shared by every row (load, upload,
+        customer and product). The rows skip model construction and per-value
+        field preparation, which cost more than the insert itself: datetimes
+        are the only values the database needs adapted.
+        """
+        quote = connection.ops.quote_name
+        fields = list(scope) + list(frame.columns) + ['created_at']
+        columns = [quote(BatchJobStaging._meta.get_field(field).column) for field in fields]
+
+        adapt = connection.ops.adapt_datetimefield_value
+        values = ExcelProcessor._frame_to_python(frame)
+        column_values = [
+            [None if value is pd.NaT else adapt(value) for value in frame[field].dt.to_pydatetime()]
+            if field in ('start_time', 'end_time') else values[field].tolist()
+            for field in frame.columns
+        ]
+        shared = tuple(scope.values())
+        created_at = adapt(timezone.now())
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {quote(BatchJobStaging._meta.db_table)} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))})",
+                [shared + row + (created_at,) for row in zip(*column_values)]
+            )
+
+    @staticmethod
+    def _publish_batch_jobs(load_id):
+        """
+        Upsert one load's staged rows into BatchJob with set-based statements.
+
+        Must run inside a transaction. A run key staged more than once keeps its
+        last row, and staged rows identical to the stored run are dropped so
+        they keep their file_upload; the rest are written by a single
+        INSERT ... SELECT ... ON CONFLICT DO UPDATE on the natural key, which
+        SQLite and PostgreSQL both support. Returns (counts, batch_job_ids): a
+        dict with inserted, updated, unchanged and duplicate counts, as
+        _bulk_upsert returns, and the ids of the runs that were written.
+        """
+        quote = connection.ops.quote_name
+        staging = quote(BatchJobStaging._meta.db_table)
+        batch_job = quote(BatchJob._meta.db_table)
+
+        def column(model, field_name):
+            return quote(model._meta.get_field(field_name).column)
+
+        key_fields = BatchJob.NATURAL_KEY
+        key_match = ' AND '.join(
+            f"{batch_job}.{column(BatchJob, field)} = {staging}.{column(BatchJobStaging, field)}"
+            for field in key_fields
+        )
+        values_match = ' AND '.join(
+            f"({batch_job}.{column(BatchJob, field)} = {staging}.{column(BatchJobStaging, field)}"
+            f" OR ({batch_job}.{column(BatchJob, field)} IS NULL AND {staging}.{column(BatchJobStaging, field)} IS NULL))"
+            for field in ExcelProcessor.BATCH_JOB_VALUE_FIELDS
+        )
+        load = f"{staging}.{column(BatchJobStaging, 'load_id')} = %s"
+        copied_fields = key_fields + ExcelProcessor.BATCH_JOB_VALUE_FIELDS + ['file_upload']
+
+        with connection.cursor() as cursor:
+            # Keep the last row of each run key (the key's other fields are the same for the whole load)
+            cursor.execute(
+                f"DELETE FROM {staging} WHERE {load} AND {staging}.{column(BatchJobStaging, 'id')} NOT IN ("
+                f"SELECT MAX({staging}.{column(BatchJobStaging, 'id')}) FROM {staging} WHERE {load} "
+                f"GROUP BY {staging}.{column(BatchJobStaging, 'jobrun_id')}, {staging}.{column(BatchJobStaging, 'start_time')})",
+                [load_id, load_id]
+            )
+            duplicate = cursor.rowcount
+
+            cursor.execute(
+                f"DELETE FROM {staging} WHERE {load} AND EXISTS ("
+                f"SELECT 1 FROM {batch_job} WHERE {key_match} AND {values_match})",
+                [load_id]
+            )
+            unchanged = cursor.rowcount
+
+            cursor.execute(
+                f"SELECT COUNT(*), COUNT({batch_job}.{column(BatchJob, 'id')}) FROM {staging} "
+                f"LEFT JOIN {batch_job} ON {key_match} WHERE {load}",
+                [load_id]
+            )
+            staged, updated = cursor.fetchone()
+
+            # A new run also records its upload as the one that inserted it; updates leave that alone
+            insert_columns = [column(BatchJob, field) for field in copied_fields + ['inserted_by_upload', 'job_id', 'created_at', 'updated_at']]
+            select_columns = [f"{staging}.{column(BatchJobStaging, field)}" for field in copied_fields + ['file_upload']] + ['%s', '%s', '%s']
+            update_columns = [column(BatchJob, field) for field in ExcelProcessor.BATCH_JOB_VALUE_FIELDS + ['file_upload', 'updated_at']]
+            now = connection.ops.adapt_datetimefield_value(timezone.now())
+            cursor.execute(
+                f"INSERT INTO {batch_job} ({', '.join(insert_columns)}) "
+                f"SELECT {', '.join(select_columns)} FROM {staging} WHERE {load} "
+                f"ON CONFLICT ({', '.join(column(BatchJob, field) for field in key_fields)}) DO UPDATE SET "
+                + ', '.join(f"{name} = EXCLUDED.{name}" for name in update_columns),
+                ['', now, now, load_id]
+            )
+
+            cursor.execute(
+                f"SELECT {batch_job}.{column(BatchJob, 'id')} FROM {staging} "
+                f"INNER JOIN {batch_job} ON {key_match} WHERE {load}",
+                [load_id]
+            )
+            batch_job_ids = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(f"DELETE FROM {staging} WHERE {load}", [load_id])
+
+        counts = {'inserted': staged - updated, 'updated': updated, 'unchanged': unchanged, 'duplicate': duplicate}
+        return counts, batch_job_ids
+
+    @staticmethod
+    def _bulk_upsert(model, frame, scope, key_fields, value_fields, lineage=None, insert_lineage=None):
+        """
+        Upsert a prepared frame on a unique key, one transaction per chunk.
+
+        scope holds the key fields shared by every row (e.g. customer) and key_fields
+        the frame columns completing the unique key. Each chunk is compared with the
+        rows already stored for the same keys: new and changed rows are written with
+        a single INSERT ... ON CONFLICT DO UPDATE, and rows identical to the stored
+        copy are not written at all, so re-ingesting a file is close to a read-only
+        pass. A key repeated within the frame keeps its last row. lineage holds
+        fields stamped on every written row (the FileUpload that wrote it); they
+        are not compared, so an unchanged row keeps the upload that last changed
+        it. insert_lineage fields are only written when a row is inserted (the
+        upload that inserted it). Returns a dict with inserted, updated,
+        unchanged and duplicate counts.
+        """
+        batch_size = ingestion_batch_size()
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+        comparable = ExcelProcessor._comparable_values
+        lineage = lineage or {}
+        insert_lineage = insert_lineage or {}
+
+        # A key may appear only once per INSERT ... ON CONFLICT; the last row in the file wins
+        deduplicated_frame = frame.drop_duplicates(subset=key_fields, keep='last')
+        counts['duplicate'] = len(frame) - len(deduplicated_frame)
+
+        for chunk_start in range(0, len(deduplicated_frame), batch_size):
+            chunk = deduplicated_frame.iloc[chunk_start:chunk_start + batch_size]
+            records = ExcelProcessor._frame_to_python(chunk).to_dict('records')
+
+            # Narrow the lookup by each key column: a range for dates, IN for everything else
+            lookup = {}
+            for field in key_fields:
+                values = {record[field] for record in records}
+                if isinstance(next(iter(values)), date_type):
+                    lookup[f'{field}__gte'] = min(values)
+                    lookup[f'{field}__lte'] = max(values)
+                else:
+                    lookup[f'{field}__in'] = values
+
+            existing = {}
+            key_width = len(key_fields)
+            for stored in model.objects.filter(**scope, **lookup).values_list(*key_fields, *value_fields):
+                existing[comparable(stored[:key_width])] = comparable(stored[key_width:])
+
+            objects = []
+            for record in records:
+                stored_values = existing.get(comparable(record[field] for field in key_fields))
+                if stored_values is None:
+                    counts['inserted'] += 1
+                elif stored_values == comparable(record[field] for field in value_fields):
+                    counts['unchanged'] += 1
                     continue
+                else:
+                    counts['updated'] += 1
+                objects.append(model(**scope, **lineage, **insert_lineage, **record))
+
+            if objects:
+                with write_phase():
+                    model.objects.bulk_create(
+                        objects,
+                        batch_size=batch_size,
+                        update_conflicts=True,
+                        unique_fields=list(scope) + key_fields,
+                        update_fields=value_fields + list(lineage)
+                    )
 
-            return True, f"Successfully processed {created_count} batch job records"
+        return counts
 
-        except Exception as e:
-            logger.error(f"Error processing batch performance file: {str(e)}")
-            return False, str(e)
+    @staticmethod
+    def _comparable_values(values):
+        # Compare datetimes as instants so pandas and database timezones match
+        return tuple(value.timestamp() if isinstance(value, datetime) else value for value in values)
 
     @staticmethod
-    def process_volumetrics_file(file_path, customer_id, product='FACETS'):
-        """Process volumetrics Excel file and create VolumetricData records"""
-        try:
-            df = ExcelProcessor.read_excel_file(file_path)
-            if df is None:
-                return False, "Failed to read Excel file"
+    def _frame_to_python(frame):
+        """Convert a DataFrame to Python scalars with None for missing values, ready for model construction"""
+        frame = frame.astype(object)
+        return frame.where(frame.notna(), None)
 
-            customer = Customer.objects.get(id=customer_id)
-            created_count = 0
+    @staticmethod
+    def _parse_datetime_column(series):
+        """Parse a whole column to datetimes; unparseable values become NaT"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        parsed = pd.to_datetime(series, errors='coerce')
+        # Values in a different format than the inferred one get a second, per-element pass
+        unparsed = parsed.isna() & series.notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(series[unparsed], errors='coerce', format='mixed')
+        return parsed
 
-            # Clean column names to remove any whitespace/formatting issues
-            df.columns = df.columns.str.strip()
-            
-            # Expected columns: Job Name, Date, Total Volume, Total Runtime
-            required_columns = ['Job Name', 'Date', 'Total Volume', 'Total Runtime']
-            
-            # Check if all required columns exist (case-insensitive and flexible)
-            missing_cols = []
-            column_mapping = {}
-            
-            for req_col in required_columns:
-                # Try exact match first
-                if req_col in df.columns:
-                    column_mapping[req_col] = req_col
-                else:
-                    # Try case-insensitive match
-                    found = False
-                    for col in df.columns:
-                        if col.lower().strip() == req_col.lower().strip():
-                            column_mapping[req_col] = col
-                            found = True
-                            break
-                    
-                    if not found:
-                        missing_cols.append(req_col)
-            
-            if missing_cols:
-                available_cols = list(df.columns)
-                return False, f"Missing required columns: {missing_cols}. Available columns: {available_cols}"
+    @staticmethod
+    def _make_aware_column(series):
+        """Attach the default time zone to a naive datetime column, as Django would per value on save"""
+        if not settings.USE_TZ or series.dt.tz is not None:
+            return series
+        return series.dt.tz_localize(
+            timezone.get_default_timezone(),
+            ambiguous=np.ones(len(series), dtype=bool),
+            nonexistent='shift_forward'
+        )
 
-            for index, row in df.iterrows():
-                try:
-                    # Use mapped column names
-                    date = pd.to_datetime(row[column_mapping['Date']]).date()
-                    total_volume = int(row[column_mapping['Total Volume']])
-                    total_runtime_minutes = float(row[column_mapping['Total Runtime']])
-                    
-                    # Calculate records processed per minute
-                    records_per_minute = total_volume / total_runtime_minutes if total_runtime_minutes > 0 else 0
+    @staticmethod
+    def _parse_duration_minutes(value):
+        """Parse an Excel Duration cell (HH:MM:SS or minutes) to minutes, or None"""
+        excel_duration = str(value).strip()
+        try:
+            if ':' in excel_duration:
+                parts = excel_duration.split(':')
+                if len(parts) >= 3:
+                    return int(parts[0]) * 60 + int(parts[1]) + int(parts[2]) / 60
+                logger.warning(f"Invalid duration format in Excel: {excel_duration}")
+                return None
+            return float(excel_duration)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse Excel duration '{excel_duration}': {e}")
+            return None
 
-                    # Optional fields - try both exact and flexible matching
-                    def get_optional_field(field_name, data_type=float, default=None):
-                        """Helper to get optional fields with flexible column matching"""
-                        value = default
-                        
-                        # Try exact match first
-                        if field_name in df.columns and pd.notna(row.get(field_name)):
-                            try:
-                                value = data_type(row[field_name]) if row[field_name] != 0 or data_type == int else None
-                            except (ValueError, TypeError):
-                                value = default
-                        
-                        # Try case-insensitive match
-                        if value is None or value == default:
-                            for col in df.columns:
-                                if col.lower().strip() == field_name.lower().strip() and pd.notna(row.get(col)):
-                                    try:
-                                        value = data_type(row[col]) if row[col] != 0 or data_type == int else None
-                                        break
-                                    except (ValueError, TypeError):
-                                        continue
-                        
-                        return value
+    @staticmethod
+    def normalize_status(status_text):
+        """Map a raw status string to a BatchJob status code, or None if it is not recognized"""
+        # Clean and normalize the status text for better matching
+        normalized_status = str(status_text).strip().lower().strip()
+        # Remove extra spaces and special characters except asterisk
+        normalized_status = re.sub(r'\s+', ' ', normalized_status)
+        normalized_status = re.sub(r'[^\w\s*]', '', normalized_status)
+
+        status = ExcelProcessor.STATUS_MAPPING.get(normalized_status)
+
+        # If still not found, try partial matching for key terms
+        if not status:
+            if 'normal' in normalized_status and '*' in normalized_status:
+                status = 'COMPLETED_NORMAL_STAR'
+            elif 'normal' in normalized_status:
+                status = 'COMPLETED_NORMAL'
+            elif 'abnormal' in normalized_status:
+                status = 'COMPLETED_ABNORMAL'
+            elif 'fail' in normalized_status or 'error' in normalized_status:
+                status = 'FAILED'
+            elif 'running' in normalized_status or 'progress' in normalized_status:
+                status = 'LONG_RUNNING'
+            elif 'pending' in normalized_status or 'wait' in normalized_status:
+                status = 'PENDING'
+
+        return status
 
-                    peak_volume = get_optional_field('Peak Volume', int)
-                    average_volume = get_optional_field('Average Volume', float)
-                    peak_runtime = get_optional_field('Peak Runtime', float)
-                    average_runtime = get_optional_field('Average Runtime', float)
-                    min_performance = get_optional_field('Min Performance', float)
-                    max_performance = get_optional_field('Max Performance', float)
+    @staticmethod
+    def _map_status_column(series):
+        """Normalize a status column, evaluating each distinct value only once"""
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        mapped = []
+        for value in uniques:
+            status = ExcelProcessor.normalize_status(value)
+            if not status:
+                count = int((codes == len(mapped)).sum())
+                logger.warning(f"Unknown status '{value}' in {count} rows, using fallback based on timing")
+            mapped.append(status)
+        return pd.Series(np.array(mapped, dtype=object)[codes], index=series.index)
 
-                    # Calculate processing efficiency (percentage)
-                    processing_efficiency = None
-                    if max_performance and records_per_minute:
-                        processing_efficiency = (records_per_minute / max_performance) * 100
+    @staticmethod
+    def process_volumetrics_file(file_path, customer_id, product='FACETS', progress=None, file_upload_id=None):
+        """
+        Process volumetrics Excel file and create or update VolumetricData records.
 
-                    volumetric_data = VolumetricData.objects.create(
-                        customer=customer,
-                        job_name=str(row[column_mapping['Job Name']]),
-                        date=date,
-                        total_volume=total_volume,
-                        total_runtime_minutes=total_runtime_minutes,
-                        records_processed_per_minute=records_per_minute,
-                        peak_volume=peak_volume,
-                        average_volume=average_volume,
-                        peak_runtime=peak_runtime,
-                        average_runtime=average_runtime,
-                        min_performance=min_performance,
-                        max_performance=max_performance,
-                        processing_efficiency=processing_efficiency
+        Each streamed chunk is converted a column at a time and upserted on
+        (customer, job_name, date), so re-uploading a month updates the stored rows
+        instead of failing on the unique constraint row by row.
+        """
+        try:
+            customer = Customer.objects.get(id=customer_id)
+            memory = MemoryHighWaterMark()
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'duplicate': 0}
+            rejected_count = 0
+            chunk_count = 0
+            positions = None
+
+            for df in ExcelProcessor.read_excel_chunks(file_path):
+                chunk_count += 1
+
+                if positions is None:
+                    # Clean column names to remove any whitespace/formatting issues
+                    columns = [str(column).strip() for column in df.columns]
+                    positions, missing_cols = ExcelProcessor.resolve_column_positions(
+                        columns, customer, 'VOLUMETRICS',
+                        ExcelProcessor.VOLUMETRICS_COLUMN_SPEC,
+                        ExcelProcessor._map_volumetrics_columns
+                    )
+                    if missing_cols:
+                        return False, f"Missing required columns: {missing_cols}. Available columns: {columns}"
+
+                frame, rejects = ExcelProcessor._prepare_volumetrics_frame(df, positions)
+                for index, reason in rejects:
+                    logger.error(f"Error processing volumetrics row {index}: {reason}")
+
+                chunk_counts = ExcelProcessor._bulk_upsert(
+                    VolumetricData, frame,
+                    scope={'customer': customer},
+                    key_fields=['job_name', 'date'],
+                    value_fields=ExcelProcessor.VOLUMETRICS_VALUE_FIELDS,
+                    lineage={'file_upload_id': file_upload_id},
+                    insert_lineage={'inserted_by_upload_id': file_upload_id}
+                )
+                for key, value in chunk_counts.items():
+                    counts[key] += value
+                rejected_count += len(rejects)
+                memory.sample()
+                if progress:
+                    progress.advance(
+                        rows_read=len(df),
+                        rows_written=chunk_counts['inserted'] + chunk_counts['updated']
                     )
-                    created_count += 1
 
-                except Exception as e:
-                    logger.error(f"Error processing volumetrics row {index}: {str(e)}")
-                    continue
+            if not chunk_count:
+                return False, "Failed to read Excel file"
 
-            return True, f"Successfully processed {created_count} volumetric records"
+            processed_count = counts['inserted'] + counts['updated'] + counts['unchanged']
+            message = (
+                f"Successfully processed {processed_count} volumetric records: "
+                f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+            )
+            if counts['duplicate']:
+                message += f" ({counts['duplicate']} duplicate job/date rows in file)"
+            if rejected_count:
+                message += f" ({rejected_count} rows rejected)"
+            if memory.describe():
+                message += f" | {memory.describe()}"
+            return True, message
 
         except Exception as e:
             logger.error(f"Error processing volumetrics file: {str(e)}")
             return False, str(e)
 
     @staticmethod
-    def process_sla_tracking_file(file_path, customer_id, product='FACETS'):
+    def _prepare_volumetrics_frame(df, positions):
+        """
+        Derive VolumetricData field values for a whole DataFrame at once.
+
+        positions maps expected column names to header positions (see
+        resolve_column_positions). Returns a DataFrame with one column per
+        VolumetricData field (only rows that can be ingested) and a list of
+        (row index, reason) tuples for rejected rows.
+        """
+        def column(name):
+            return df.iloc[:, positions[name]]
+
+        dates = ExcelProcessor._parse_datetime_column(column('Date'))
+        total_volume = pd.to_numeric(column('Total Volume'), errors='coerce')
+        total_runtime = pd.to_numeric(column('Total Runtime'), errors='coerce')
+
+        reject_reasons = pd.Series(None, index=df.index, dtype=object)
+        reject_reasons = reject_reasons.mask(total_runtime.isna(), 'Invalid or missing total runtime')
+        reject_reasons = reject_reasons.mask(total_volume.isna(), 'Invalid or missing total volume')
+        reject_reasons = reject_reasons.mask(dates.isna(), 'Invalid or missing date')
+        reject_mask = reject_reasons.notna()
+
+        total_volume = np.trunc(total_volume)
+        # Records processed per minute; zero when there is no runtime
+        records_per_minute = (total_volume / total_runtime).where(total_runtime > 0, 0.0)
+
+        frame = pd.DataFrame({
+            'job_name': column('Job Name').astype(object).map(str),
+            'total_volume': total_volume,
+            'total_runtime_minutes': total_runtime.astype(float),
+            'records_processed_per_minute': records_per_minute,
+        }, index=df.index)
+
+        for field_name, data_type in ExcelProcessor.VOLUMETRICS_OPTIONAL_COLUMNS.items():
+            field = field_name.lower().replace(' ', '_')
+            if field_name in positions:
+                frame[field] = ExcelProcessor._optional_column(column(field_name), data_type)
+            else:
+                frame[field] = np.nan
+
+        # Processing efficiency as a percentage of the maximum performance
+        max_performance = frame['max_performance']
+        frame['processing_efficiency'] = (records_per_minute / max_performance * 100).where(
+            max_performance.notna() & (max_performance != 0) & (records_per_minute != 0)
+        )
+
+        frame = frame[~reject_mask]
+        frame.insert(1, 'date', dates[~reject_mask].dt.date)
+        frame['total_volume'] = frame['total_volume'].astype('Int64')
+        frame['peak_volume'] = frame['peak_volume'].astype('Int64')
+
+        rejects = list(reject_reasons[reject_mask].items())
+        return frame, rejects
+
+    @staticmethod
+    def _map_volumetrics_columns(columns):
+        """Resolve volumetrics columns by exact name first, then case-insensitively"""
+        column_mapping = {}
+        missing_columns = []
+        required_columns = ExcelProcessor.VOLUMETRICS_REQUIRED_COLUMNS
+
+        for expected in required_columns + list(ExcelProcessor.VOLUMETRICS_OPTIONAL_COLUMNS):
+            if expected in columns:
+                column_mapping[expected] = expected
+                continue
+            for col in columns:
+                if str(col).lower().strip() == expected.lower():
+                    column_mapping[expected] = col
+                    break
+            else:
+                if expected in required_columns:
+                    missing_columns.append(expected)
+
+        return column_mapping, missing_columns
+
+    @staticmethod
+    def _optional_column(series, data_type):
+        """
+        Convert an optional column; missing or unparsable values become NaN.
+
+        int columns are truncated. For float columns numeric zeros are treated as
+        missing, while a literal "0" text cell is kept, as the per-row parser did.
+        """
+        numeric = pd.to_numeric(series, errors='coerce')
+        if data_type == int:
+            return np.trunc(numeric)
+        zero = numeric == 0
+        if series.dtype == object and zero.any():
+            zero &= ~series.map(lambda value: isinstance(value, str))
+        return numeric.mask(zero).astype(float)
+
+    @staticmethod
+    def process_sla_tracking_file(file_path, customer_id, product='FACETS', progress=None, file_upload_id=None):
         """Process SLA tracking Excel file and create SLAData records"""
         try:
-            df = ExcelProcessor.read_excel_file(file_path)
-            if df is None:
-                return False, "Failed to read Excel file"
-
             customer = Customer.objects.get(id=customer_id)
+            memory = MemoryHighWaterMark()
             created_count = 0
+            rejected_count = 0
+            chunk_count = 0
+            batch_size = ingestion_batch_size()
+
+            for df in ExcelProcessor.read_excel_chunks(file_path):
+                chunk_count += 1
 
-            # Expected columns: Job Name, Date, SLA Target, Actual Runtime, Business Impact
-            required_columns = ['Job Name', 'Date', 'SLA Target', 'Actual Runtime']
+                # Expected columns: Job Name, Date, SLA Target, Actual Runtime, Business Impact
+                required_columns = ['Job Name', 'Date', 'SLA Target', 'Actual Runtime']
             
-            if not all(col in df.columns for col in required_columns):
-                missing_cols = [col for col in required_columns if col not in df.columns]
-                return False, f"Missing required columns: {missing_cols}"
+                if not all(col in df.columns for col in required_columns):
+                    missing_cols = [col for col in required_columns if col not in df.columns]
+                    return False, f"Missing required columns: {missing_cols}"
+
+                frame, rejects = ExcelProcessor._prepare_sla_tracking_frame(df)
+                for index, reason in rejects:
+                    logger.error(f"Error processing SLA row {index}: {reason}")
+
+                sla_rows = [
+                    SLAData(customer=customer, product=product, file_upload_id=file_upload_id, **record)
+                    for record in ExcelProcessor._frame_to_python(frame).to_dict('records')
+                ]
+                with write_phase():
+                    SLAData.objects.bulk_create(sla_rows, batch_size=batch_size)
+                created_count += len(sla_rows)
+                rejected_count += len(rejects)
+
+                memory.sample()
+                if progress:
+                    progress.advance(rows_read=len(df), rows_written=len(sla_rows))
+
+            if not chunk_count:
+                return False, "Failed to read Excel file"
 
-            for index, row in df.iterrows():
-                try:
-                    date = pd.to_datetime(row['Date']).date()
-                    
-                    # Parse SLA Target time (could be "11:50 PM MT" format or minutes)
-                    sla_target_minutes = ExcelProcessor.parse_time_to_minutes(row['SLA Target'])
-                    
-                    # Parse Actual Runtime (could be "11:50 PM MT" format or minutes)  
-                    actual_runtime_minutes = ExcelProcessor.parse_time_to_minutes(row['Actual Runtime'])
-                    
-                    business_impact = str(row.get('Business Impact', ''))
+            message = f"Successfully processed {created_count} SLA records"
+            if rejected_count:
+                message += f" ({rejected_count} rows rejected)"
+            if memory.describe():
+                message += f" | {memory.describe()}"
+            return True, message
 
-                    # Calculate SLA status and variance
-                    sla_met = actual_runtime_minutes <= sla_target_minutes
-                    variance_minutes = actual_runtime_minutes - sla_target_minutes
-                    sla_status = 'MET' if sla_met else 'MISSED'
-                    
-                    # Calculate variance percentage
-                    variance_percentage = (variance_minutes / sla_target_minutes) * 100 if sla_target_minutes > 0 else 0
+        except Exception as e:
+            logger.error(f"Error processing SLA tracking file: {str(e)}")
+            return False, str(e)
 
-                    sla_data = SLAData.objects.create(
-                        customer=customer,
-                        product=product,
-                        job_name=str(row['Job Name']),
-                        date=date,
-                        sla_target_minutes=sla_target_minutes,
-                        actual_runtime_minutes=actual_runtime_minutes,
-                        business_impact=business_impact,
-                        sla_status=sla_status,
-                        variance_minutes=variance_minutes,
-                        variance_percentage=variance_percentage
-                    )
-                    created_count += 1
+    @staticmethod
+    def _prepare_sla_tracking_frame(df):
+        """
+        Derive SLAData field values for an SLA tracking DataFrame at once.
 
-                except Exception as e:
-                    logger.error(f"Error processing SLA row {index}: {str(e)}")
-                    continue
+        Returns a DataFrame with one column per SLAData field (only rows that can
+        be ingested) and a list of (row index, reason) tuples for rejected rows.
+        """
+        dates = ExcelProcessor._parse_datetime_column(df['Date'])
 
-            return True, f"Successfully processed {created_count} SLA records"
+        # SLA Target and Actual Runtime could be "11:50 PM MT" format or minutes
+        sla_target_minutes = ExcelProcessor.parse_time_column(df['SLA Target'])
+        actual_runtime_minutes = ExcelProcessor.parse_time_column(df['Actual Runtime'])
 
-        except Exception as e:
-            logger.error(f"Error processing SLA tracking file: {str(e)}")
-            return False, str(e)
+        business_impact = (
+            df['Business Impact'].astype(object).map(str)
+            if 'Business Impact' in df.columns else pd.Series('', index=df.index)
+        )
+
+        # Calculate SLA status and variance
+        variance_minutes = actual_runtime_minutes - sla_target_minutes
+        sla_met = actual_runtime_minutes <= sla_target_minutes
+        # SLAData.save() counts rows without an SLA definition as met whenever both
+        # times are set; bulk_create bypasses save(), so apply the same rule here
+        sla_met |= (sla_target_minutes != 0) & (actual_runtime_minutes != 0)
+        sla_status = pd.Series(np.where(sla_met, 'MET', 'MISSED'), index=df.index)
+
+        # Calculate variance percentage
+        variance_percentage = (variance_minutes / sla_target_minutes * 100).where(sla_target_minutes > 0, 0.0)
+
+        frame = pd.DataFrame({
+            'job_name': df['Job Name'].astype(object).map(str),
+            'date': dates.dt.date,
+            'sla_target_minutes': sla_target_minutes,
+            'actual_runtime_minutes': actual_runtime_minutes,
+            'business_impact': business_impact,
+            'sla_status': sla_status,
+            'variance_minutes': variance_minutes,
+            'variance_percentage': variance_percentage,
+        }, index=df.index)
+
+        invalid_date = dates.isna()
+        rejects = [(index, 'Invalid or missing date') for index in df.index[invalid_date]]
+        return frame[~invalid_date], rejects
+
+    # Expected columns: Schedule Name, Job Name, Schedule Pattern, Next Run Time, Status, Priority
+    SCHEDULE_REQUIRED_COLUMNS = ['Schedule Name', 'Job Name', 'Schedule Pattern', 'Next Run Time']
+    SCHEDULE_STATUS_MAPPING = {
+        'active': 'ACTIVE',
+        'inactive': 'INACTIVE',
+        'suspended': 'SUSPENDED',
+        'maintenance': 'MAINTENANCE'
+    }
 
     @staticmethod
-    def process_batch_schedule_file(file_path, customer_id, product='FACETS'):
-        """Process batch schedule Excel file and create BatchSchedule records"""
+    def process_batch_schedule_file(file_path, customer_id, product='FACETS', progress=None, file_upload_id=None):
+        """
+        Process batch schedule Excel file and create BatchSchedule records.
+
+        Rows are validated one at a time, so a bad row is logged and skipped,
+        and the rest are written with one bulk_create in a single write phase.
+        Job types are classified against the stored parent groups in memory, as
+        save(), which bulk_create bypasses, would against the database.
+        """
         try:
             df = ExcelProcessor.read_excel_file(file_path)
             if df is None:
                 return False, "Failed to read Excel file"
 
             customer = Customer.objects.get(id=customer_id)
-            created_count = 0
 
-            # Expected columns: Schedule Name, Job Name, Schedule Pattern, Next Run Time, Status, Priority
-            required_columns = ['Schedule Name', 'Job Name', 'Schedule Pattern', 'Next Run Time']
+            required_columns = ExcelProcessor.SCHEDULE_REQUIRED_COLUMNS
             
             if not all(col in df.columns for col in required_columns):
                 missing_cols = [col for col in required_columns if col not in df.columns]
                 return False, f"Missing required columns: {missing_cols}"
 
+            is_parent_group = ExcelProcessor._parent_group_lookup(
+                BatchSchedule.objects.exclude(parent_group='').values_list('parent_group', flat=True).distinct()
+            )
+            # The file is the same for every row, so stat it once
+            file_name = os.path.basename(file_path)
+            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
+            status_mapping = ExcelProcessor.SCHEDULE_STATUS_MAPPING
+
+            schedules = []
             for index, row in df.iterrows():
                 try:
                     next_run_time = pd.to_datetime(row['Next Run Time'])
+                    if pd.isna(next_run_time):
+                        raise ValueError("Missing next run time")
                     last_run_time = pd.to_datetime(row.get('Last Run Time', None)) if pd.notna(row.get('Last Run Time', None)) else None
                     
-                    status_mapping = {
-                        'active': 'ACTIVE',
-                        'inactive': 'INACTIVE',
-                        'suspended': 'SUSPENDED',
-                        'maintenance': 'MAINTENANCE'
-                    }
-                    
                     status = status_mapping.get(str(row.get('Status', 'active')).lower(), 'ACTIVE')
                     priority = int(row.get('Priority', 1))
-                    
-                    file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
 
-                    batch_schedule = BatchSchedule.objects.create(
+                    schedule = BatchSchedule(
                         customer=customer,
+                        file_upload_id=file_upload_id,
                         schedule_name=str(row['Schedule Name']),
                         job_name=str(row['Job Name']),
                         schedule_pattern=str(row['Schedule Pattern']),
@@ -523,120 +1115,85 @@ class ExcelProcessor:
                         priority=priority,
                         dependencies=str(row.get('Dependencies', '')),
                         file_path=file_path,
-                        file_name=os.path.basename(file_path),
+                        file_name=file_name,
                         file_size=file_size
                     )
-                    created_count += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing schedule row {index}: {str(e)}")
-                    continue
-
-            return True, f"Successfully processed {created_count} schedule records"
-
-        except Exception as e:
-            logger.error(f"Error processing batch schedule file: {str(e)}")
-            return False, str(e)
-
-    @staticmethod
-    def process_emb_batch_schedule_file(file_path, customer_id, product='FACETS'):
-        """Process Tidal Excel file format and create BatchSchedule records"""
-        try:
-            df = ExcelProcessor.read_excel_file(file_path)
-            if df is None:
-                return False, "Failed to read Excel file"
-
-            customer = Customer.objects.get(id=customer_id)
-            created_count = 0
-
-            # Expected columns for Tidal format
-            required_columns = ['JOBNAME']
-            
-            if not all(col in df.columns for col in required_columns):
-                missing_cols = [col for col in required_columns if col not in df.columns]
-                return False, f"Missing required columns: {missing_cols}. Available columns: {list(df.columns)}"
-
-            for index, row in df.iterrows():
-                try:
-                    # Skip empty rows
-                    if pd.isna(row.get('JOBNAME')) or str(row.get('JOBNAME')).strip() == '':
-                        continue
-                        
-                    # Parse enabled/disabled status
-                    enabled_disabled = str(row.get('ENABLED OR DISABLED?', '')).strip().upper()
-                    status = 'ENABLED' if enabled_disabled == 'ENABLED' else 'DISABLED'
-                    
-                    # Parse category
-                    category = str(row.get('CATEGORY', 'TID')).strip().upper()
-                    if category not in ['TID', 'FOLDER', 'CONDITION', 'RESOURCE']:
-                        category = 'TID'
-                    
-                    # Parse last modified date
-                    last_modified_on = None
-                    if pd.notna(row.get('LAST MODIFIED ON')):
-                        try:
-                            last_modified_on = pd.to_datetime(row['LAST MODIFIED ON'])
-                        except:
-                            pass
-                    
-                    # Parse dependencies - clean up long text
-                    dependencies_text = str(row.get('DEP UPON JOB/VARIABLE/FILE', '')).strip()
-                    if len(dependencies_text) > 1000:  # Truncate if too long
-                        dependencies_text = dependencies_text[:1000] + '...'
-                    
-                    file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
-
-                    batch_schedule = BatchSchedule.objects.create(
-                        customer=customer,
-                        # Core job information
-                        job_name=str(row.get('JOBNAME', '')).strip(),
-                        job_id=str(row.get('ID', '')).strip(),
-                        category=category,
-                        
-                        # Status and enablement  
-                        status=status,
-                        enabled_status=enabled_disabled,
-                        
-                        # Hierarchy and organization
-                        parent_group=str(row.get('PARENT GROUP', '')).strip()[:500],  # Limit length
-                        
-                        # Calendar and timing
-                        calendar=str(row.get('CALENDAR', '')).strip(),
-                        calendar_offset=str(row.get('CALENDAR OFFSET', '')).strip(),
-                        time_zone=str(row.get('Time Zone', 'DEFAULT (E.S.T.)')).strip(),
-                        start_time=str(row.get('Start time', '')).strip(),
-                        until_time=str(row.get('Until time', '')).strip(),
-                        
-                        # Dependencies and execution
-                        dependencies=dependencies_text,
-                        agent_or_agent_list=str(row.get('RUNS ON AGENT OR AGENT LIST?', '')).strip(),
-                        
-                        # Metadata
-                        class_name=str(row.get('CLASS', '')).strip(),
-                        owner=str(row.get('OWNER', '')).strip(),
-                        last_modified_on=last_modified_on,
-                        
-                        # Legacy fields for compatibility
-                        schedule_name=str(row.get('JOBNAME', '')).strip(),
-                        schedule_pattern=str(row.get('CALENDAR', '')).strip(),
-                        
-                        # File tracking
-                        file_path=file_path,
-                        file_name=os.path.basename(file_path),
-                        file_size=file_size
+                    schedule.job_type = schedule._determine_job_type(
+                        is_parent_group=is_parent_group(schedule.job_name)
                     )
-                    created_count += 1
+                    schedules.append(schedule)
 
                 except Exception as e:
-                    logger.error(f"Error processing EMB schedule row {index}: {str(e)}")
+                    logger.error(f"Error processing schedule row {index}: {str(e)}")
                     continue
 
-            return True, f"Successfully processed {created_count} EMB schedule records"
+            with write_phase():
+                BatchSchedule.objects.bulk_create(schedules, batch_size=ingestion_batch_size())
+            created_count = len(schedules)
+
+            if progress:
+                progress.advance(rows_read=len(df), rows_written=created_count)
+            return True, f"Successfully processed {created_count} schedule records"
 
         except Exception as e:
-            logger.error(f"Error processing EMB batch schedule file: {str(e)}")
+            logger.error(f"Error processing batch schedule file: {str(e)}")
             return False, str(e)
 
+    @staticmethod
+    def _parent_group_lookup(parent_groups):
+        """
+        Build a function telling whether a job name appears in any of parent_groups.
+
+        Mirrors the parent_group__icontains check in BatchSchedule._determine_job_type,
+        but the distinct parent groups are collected once and searched in memory.
+        """
+        known_groups = {group.upper() for group in parent_groups if isinstance(group, str) and group}
+        # One separator-joined string searched with a substring test per job
+        haystack = '\x00'.join(known_groups)
+        return lambda job_name: bool(haystack) and job_name.upper() in haystack
+
+    # Tidal export columns and the BatchSchedule fields they are stored in
+    ENHANCED_SCHEDULE_COLUMNS = {
+        'JOBNAME': 'job_name',
+        'ID': 'job_id',
+        'CATEGORY': 'category',
+        'ENABLED OR DISABLED?': 'enabled_status',
+        'PARENT GROUP': 'parent_group',
+        'COMMAND': 'command',
+        'Parameters': 'parameters',
+        'CALENDAR': 'calendar',
+        'CALENDAR OFFSET': 'calendar_offset',
+        'DEP UPON JOB/VARIABLE/FILE': 'dependencies',
+        'RUNS ON AGENT OR AGENT LIST?': 'agent_or_agent_list',
+        'LAST MODIFIED ON': 'last_modified_on',
+        'CLASS': 'class_name',
+        'OWNER': 'owner',
+        'Time Zone': 'time_zone',
+        'Start time': 'start_time',
+        'Until time': 'until_time',
+        'REPEATS': 'repeats',
+        'RUN NEW/RERUN SAME OCCURRENCE?': 'run_new_rerun_same',
+        'MAX NUMBER OF RUNS': 'max_number_of_runs',
+        'Agent / Agent List': 'agent_agent_list',
+        'RUNTIME USER': 'runtime_user',
+        'FOR TRACKING, USE:': 'for_tracking_use',
+        'Exit code range:': 'exit_code_range',
+        'SCAN OUTPUT: NORMAL': 'scan_output_normal',
+        'Exclude Completed Abnormally?': 'exclude_completed_abnormally',
+        'REQUIRED VIRTUAL RESOURCE': 'required_virtual_resource',
+        'AMOUNT REQUIRED': 'amount_required',
+        'If job is currently running:': 'if_job_currently_running',
+        'If not enough time b4 outage': 'if_not_enough_time_b4_outage',
+        'Save Output Option': 'save_output_option',
+        'Allow unscheduled?': 'allow_unscheduled',
+        'Allow operator rerun?': 'allow_operator_rerun',
+        'Require operator release?': 'require_operator_release',
+        'Disable Carryover?': 'disable_carryover',
+        'HISTORY RETENTION (DAYS)': 'history_retention_days',
+        'run book': 'run_book',
+        'Notes': 'notes'
+    }
+
     @staticmethod
     def process_enhanced_batch_schedule(file_path, customer):
         """Process batch schedule Excel file with comprehensive fields (DHH_B27_TMS_Demo format)"""
@@ -649,52 +1206,15 @@ class ExcelProcessor:
         
         try:
             # Read Excel file
-            df = pd.read_excel(file_path, sheet_name=0)
-            
+            df = ExcelProcessor.read_excel_file(file_path, sheet_name=0)
+            if df is None:
+                results['errors'].append("Failed to read Excel file")
+                return results
+
             # Clean column names
             df.columns = df.columns.str.strip()
             
-            # Expected columns mapping
-            column_mapping = {
-                'JOBNAME': 'job_name',
-                'ID': 'job_id',
-                'CATEGORY': 'category',
-                'ENABLED OR DISABLED?': 'enabled_status',
-                'PARENT GROUP': 'parent_group',
-                'COMMAND': 'command',
-                'Parameters': 'parameters',
-                'CALENDAR': 'calendar',
-                'CALENDAR OFFSET': 'calendar_offset',
-                'DEP UPON JOB/VARIABLE/FILE': 'dependencies',
-                'RUNS ON AGENT OR AGENT LIST?': 'agent_or_agent_list',
-                'LAST MODIFIED ON': 'last_modified_on',
-                'CLASS': 'class_name',
-                'OWNER': 'owner',
-                'Time Zone': 'time_zone',
-                'Start time': 'start_time',
-                'Until time': 'until_time',
-                'REPEATS': 'repeats',
-                'RUN NEW/RERUN SAME OCCURRENCE?': 'run_new_rerun_same',
-                'MAX NUMBER OF RUNS': 'max_number_of_runs',
-                'Agent / Agent List': 'agent_agent_list',
-                'RUNTIME USER': 'runtime_user',
-                'FOR TRACKING, USE:': 'for_tracking_use',
-                'Exit code range:': 'exit_code_range',
-                'SCAN OUTPUT: NORMAL': 'scan_output_normal',
-                'Exclude Completed Abnormally?': 'exclude_completed_abnormally',
-                'REQUIRED VIRTUAL RESOURCE': 'required_virtual_resource',
-                'AMOUNT REQUIRED': 'amount_required',
-                'If job is currently running:': 'if_job_currently_running',
-                'If not enough time b4 outage': 'if_not_enough_time_b4_outage',
-                'Save Output Option': 'save_output_option',
-                'Allow unscheduled?': 'allow_unscheduled',
-                'Allow operator rerun?': 'allow_operator_rerun',
-                'Require operator release?': 'require_operator_release',
-                'Disable Carryover?': 'disable_carryover',
-                'HISTORY RETENTION (DAYS)': 'history_retention_days',
-                'run book': 'run_book',
-                'Notes': 'notes'
-            }
+            column_mapping = ExcelProcessor.ENHANCED_SCHEDULE_COLUMNS
             
             # Check for required columns
             required_columns = ['JOBNAME']
@@ -703,83 +1223,57 @@ class ExcelProcessor:
                 results['errors'].append(f"Missing required columns: {missing_columns}")
                 return results
             
-            processed_count = 0
-            for index, row in df.iterrows():
-                try:
-                    # Skip empty rows
-                    if pd.isna(row.get('JOBNAME')) or str(row.get('JOBNAME')).strip() == '':
-                        continue
-                    
-                    # Create record dictionary
-                    record_data = {'customer': customer.id}
-                    
-                    # Map columns
-                    for excel_col, model_field in column_mapping.items():
-                        if excel_col in df.columns:
-                            value = row.get(excel_col)
-                            
-                            # Handle special data types
-                            if model_field in ['max_number_of_runs', 'amount_required', 'history_retention_days']:
-                                if pd.notna(value) and value != '':
-                                    try:
-                                        record_data[model_field] = int(float(value))
-                                    except (ValueError, TypeError):
-                                        record_data[model_field] = None
-                                else:
-                                    record_data[model_field] = None
-                            elif model_field == 'last_modified_on':
-                                if pd.notna(value) and value != '':
-                                    try:
-                                        if isinstance(value, str):
-                                            # Try to parse datetime string
-                                            record_data[model_field] = pd.to_datetime(value).to_pydatetime()
-                                        else:
-                                            record_data[model_field] = value
-                                    except:
-                                        record_data[model_field] = None
-                                else:
-                                    record_data[model_field] = None
-                            else:
-                                # String fields
-                                if pd.notna(value) and value != '':
-                                    record_data[model_field] = str(value).strip()
-                                else:
-                                    record_data[model_field] = ''
-                    
-                    # Set default values for required fields and categorize properly
-                    if not record_data.get('category'):
-                        record_data['category'] = 'TID'
-                    
-                    # Enhance category detection based on Excel patterns
-                    excel_category = str(row.get('CATEGORY', '')).upper().strip()
-                    if excel_category:
-                        if excel_category in ['FOLDER', 'GROUP', 'JOB GROUP']:
-                            record_data['category'] = 'GROUP'
-                        elif excel_category in ['CONDITION', 'DEPENDENCY']:
-                            record_data['category'] = 'CONDITION'
-                        elif excel_category in ['RESOURCE', 'AGENT']:
-                            record_data['category'] = 'RESOURCE'
-                        elif excel_category in ['VARIABLE', 'CALENDAR', 'CONNECTION']:
-                            record_data['category'] = excel_category
-                        else:
-                            record_data['category'] = 'TID'
-                    
-                    if not record_data.get('enabled_status'):
-                        record_data['enabled_status'] = 'ENABLED'
-                    if not record_data.get('time_zone'):
-                        record_data['time_zone'] = 'DEFAULT (E.S.T.)'
-                    if not record_data.get('repeats'):
-                        record_data['repeats'] = 'DO NOT REPEAT'
-                    if not record_data.get('for_tracking_use'):
-                        record_data['for_tracking_use'] = 'Exit code'
-                    
-                    results['records'].append(record_data)
-                    processed_count += 1
-                    
-                except Exception as e:
-                    results['errors'].append(f"Row {index + 2}: {str(e)}")
+            # Skip empty rows
+            df = df[df['JOBNAME'].notna() & (df['JOBNAME'].astype(str).str.strip() != '')]
+
+            # Map columns, converting a whole column at a time
+            frame = pd.DataFrame(index=df.index)
+            for excel_col, model_field in column_mapping.items():
+                if excel_col not in df.columns:
                     continue
-            
+                values = df[excel_col]
+
+                # Handle special data types
+                if model_field in ['max_number_of_runs', 'amount_required', 'history_retention_days']:
+                    frame[model_field] = np.trunc(pd.to_numeric(values, errors='coerce')).astype('Int64')
+                elif model_field == 'last_modified_on':
+                    frame[model_field] = ExcelProcessor._make_aware_column(
+                        ExcelProcessor._parse_datetime_column(values.where(values != ''))
+                    )
+                else:
+                    # String fields
+                    present = values.notna() & (values != '')
+                    frame[model_field] = values.astype(object).map(str).str.strip().where(present, '')
+
+            # Enhance category detection based on Excel patterns
+            excel_category = (
+                df['CATEGORY'].astype(object).map(str).str.upper().str.strip()
+                if 'CATEGORY' in df.columns else pd.Series('', index=df.index)
+            )
+            category_mapping = {
+                'FOLDER': 'GROUP', 'GROUP': 'GROUP', 'JOB GROUP': 'GROUP',
+                'CONDITION': 'CONDITION', 'DEPENDENCY': 'CONDITION',
+                'RESOURCE': 'RESOURCE', 'AGENT': 'RESOURCE',
+                'VARIABLE': 'VARIABLE', 'CALENDAR': 'CALENDAR', 'CONNECTION': 'CONNECTION',
+            }
+            frame['category'] = excel_category.map(category_mapping).fillna('TID')
+
+            # Set default values for required fields
+            for model_field, default in [
+                ('enabled_status', 'ENABLED'),
+                ('time_zone', 'DEFAULT (E.S.T.)'),
+                ('repeats', 'DO NOT REPEAT'),
+                ('for_tracking_use', 'Exit code'),
+            ]:
+                if model_field in frame.columns:
+                    frame[model_field] = frame[model_field].where(frame[model_field] != '', default)
+                else:
+                    frame[model_field] = default
+
+            frame.insert(0, 'customer', customer.id)
+            results['records'] = ExcelProcessor._frame_to_python(frame).to_dict('records')
+            processed_count = len(results['records'])
+
             results['records_processed'] = processed_count
             results['success'] = processed_count > 0
             
@@ -791,6 +1285,66 @@ class ExcelProcessor:
         
         return results
 
+    @staticmethod
+    def process_enhanced_batch_schedule_file(file_path, customer_id, product='FACETS', progress=None, file_upload_id=None):
+        """
+        Parse a Tidal export with process_enhanced_batch_schedule and replace the
+        customer's schedule with it.
+
+        The previous schedule is deleted and the new one bulk inserted in a single
+        transaction, so readers see either the old or the new schedule, never a
+        mix, and a failed load leaves the old one in place.
+        """
+        try:
+            customer = Customer.objects.get(id=customer_id)
+            results = ExcelProcessor.process_enhanced_batch_schedule(file_path, customer)
+            if not results['success']:
+                return False, '; '.join(results['errors'])
+
+            records = results['records']
+            is_parent_group = ExcelProcessor._parent_group_lookup(
+                record.get('parent_group') for record in records
+            )
+            file_name = os.path.basename(file_path)
+            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
+
+            schedules = []
+            for record in records:
+                fields = {field: value for field, value in record.items() if field != 'customer'}
+                schedule = BatchSchedule(
+                    customer=customer,
+                    file_upload_id=file_upload_id,
+                    file_path=file_path,
+                    file_name=file_name,
+                    file_size=file_size,
+                    **fields
+                )
+                # Derived fields normally filled in by save(), which bulk_create bypasses
+                schedule.status = 'ENABLED' if schedule.enabled_status.upper() == 'ENABLED' else 'DISABLED'
+                schedule.schedule_name = schedule.job_name
+                schedule.schedule_pattern = schedule.calendar[:100]
+                schedule.job_type = schedule._determine_job_type(
+                    is_parent_group=is_parent_group(schedule.job_name)
+                )
+                schedules.append(schedule)
+
+            with write_phase():
+                replaced_count, _ = BatchSchedule.objects.filter(customer=customer).delete()
+                BatchSchedule.objects.bulk_create(
+                    schedules, batch_size=ingestion_batch_size()
+                )
+
+            if progress:
+                progress.advance(rows_read=results['records_processed'], rows_written=len(schedules))
+            return True, (
+                f"Successfully processed {len(schedules)} schedule records "
+                f"(replaced {replaced_count} existing records)"
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing enhanced batch schedule file: {str(e)}")
+            return False, str(e)
+
     @staticmethod
     def parse_time_to_minutes(time_value):
         """
@@ -800,64 +1354,267 @@ class ExcelProcessor:
         - "23:50" (24-hour format)
         - "11:50:30 PM" (with seconds)
         - Numerical minutes (float/int)
+        Single-value form of parse_time_column; unparseable values give 0.0.
         """
-        import re
-        from datetime import datetime, time
-        
-        if pd.isna(time_value) or time_value == '':
-            return 0.0
-            
-        # If it's already a number (minutes), return as float
-        try:
-            return float(time_value)
-        except (ValueError, TypeError):
-            pass
-        
-        time_str = str(time_value).strip().upper()
-        
-        # Remove timezone suffixes like "MT", "EST", "PST", etc.
-        time_str = re.sub(r'\s+(MT|EST|PST|CST|EDT|PDT|CDT|UTC|GMT)$', '', time_str)
-        
-        try:
-            # Handle "11:50 PM" format
-            if 'AM' in time_str or 'PM' in time_str:
-                # Parse 12-hour format
-                time_obj = datetime.strptime(time_str, '%I:%M %p').time()
-                return time_obj.hour * 60 + time_obj.minute + time_obj.second / 60.0
-            
-            # Handle "11:50:30 PM" format (with seconds)
-            elif ':' in time_str and len(time_str.split(':')) == 3:
-                if 'AM' in time_str or 'PM' in time_str:
-                    time_obj = datetime.strptime(time_str, '%I:%M:%S %p').time()
-                else:
-                    time_obj = datetime.strptime(time_str, '%H:%M:%S').time()
-                return time_obj.hour * 60 + time_obj.minute + time_obj.second / 60.0
-            
-            # Handle "23:50" format (24-hour)
-            elif ':' in time_str:
-                time_obj = datetime.strptime(time_str, '%H:%M').time()
-                return time_obj.hour * 60 + time_obj.minute
-            
-            else:
-                # Try to parse as float (minutes)
-                return float(time_str)
-                
-        except ValueError as e:
-            logger.error(f"Could not parse time value '{time_value}': {str(e)}")
-            return 0.0
+        return float(ExcelProcessor.parse_time_column(pd.Series([time_value], dtype=object)).iloc[0])
+
+    # Time zone suffixes like "MT", "EST", "PST" that are dropped before parsing a time of day
+    TIME_ZONE_SUFFIX_PATTERN = r'\s+(?:MT|EST|PST|CST|EDT|PDT|CDT|UTC|GMT)$'
+    # "11:50 PM", "11:50:30 PM", "23:50" and "23:50:30"
+    CLOCK_TIME_PATTERN = r'^(?P<hour>\d{1,2}):(?P<minute>\d{1,2})(?::(?P<second>\d{1,2}))?(?:\s*(?P<meridiem>AM|PM))?$'
+
+    @staticmethod
+    def parse_time_column(series):
+        """
+        Convert a column of SLA times to minutes (from midnight, or raw minutes).
+
+        Numbers and numeric strings are taken as minutes. Other values are
+        classified against CLOCK_TIME_PATTERN after dropping a time zone suffix,
+        and converted with array arithmetic. Missing and unparseable values
+        become 0.0, as in parse_time_to_minutes.
+        """
+        if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_object_dtype(series)):
+            series = series.astype(object)
+
+        # If it's already a number (minutes), use it as is
+        minutes = pd.to_numeric(series, errors='coerce').astype(float)
+
+        text_values = series[minutes.isna() & series.notna()]
+        text = text_values.astype(str).str.strip().str.upper() if len(text_values) else text_values
+        text = text[text != '']
+        if len(text):
+            text = text.str.replace(ExcelProcessor.TIME_ZONE_SUFFIX_PATTERN, '', regex=True)
+            parts = text.str.extract(ExcelProcessor.CLOCK_TIME_PATTERN)
+            hour = pd.to_numeric(parts['hour'])
+            minute = pd.to_numeric(parts['minute'])
+            second = pd.to_numeric(parts['second']).fillna(0)
+            twelve_hour = parts['meridiem'].notna()
+
+            valid = (
+                parts['hour'].notna() & (minute <= 59) & (second <= 59)
+                & hour.between(1, 12).where(twelve_hour, hour <= 23)
+            )
+            hour = hour.where(~twelve_hour, hour % 12 + (parts['meridiem'] == 'PM') * 12)
+            parsed = (hour * 60 + minute + second / 60).where(valid)
+
+            # Values like "90 MT": minutes with a time zone suffix
+            parsed = parsed.fillna(pd.to_numeric(text, errors='coerce'))
+
+            for value in text_values[parsed.index[parsed.isna()]].unique():
+                logger.error(f"Could not parse time value '{value}'")
+            minutes.loc[parsed.index] = parsed
+
+        return minutes.fillna(0.0)
+
+
+    @staticmethod
+    def validate_file(file_path, file_type, nrows=100):
+        """
+        Preview how a file would be ingested without writing anything.
+
+        Only the header and the first nrows data rows are read (through a
+        streaming reader, so the cost does not grow with the file). They go
+        through the same column matching and frame preparation as the real
+        processor for file_type. The returned report lists the mapped and
+        missing columns, how status values map, and the rows that would be
+        rejected. Reject counts are projected to the whole file from its
+        estimated row count.
+        """
+        started = time.monotonic()
+        df = ExcelProcessor.read_excel_file(file_path, nrows=nrows)
+        if df is None:
+            return {'valid': False, 'file_type': file_type, 'error': 'Failed to read Excel file'}
+
+        previewers = {
+            'BATCH_PERFORMANCE': ExcelProcessor._preview_batch_performance,
+            'VOLUMETRICS': ExcelProcessor._preview_volumetrics,
+            'SLA_TRACKING': ExcelProcessor._preview_sla_tracking,
+            'BATCH_SCHEDULE': ExcelProcessor._preview_batch_schedule,
+        }
+        if file_type not in previewers:
+            return {'valid': False, 'file_type': file_type, 'error': f'Unsupported file type: {file_type}'}
+
+        preview = previewers[file_type](df)
+        rejects = preview.pop('rejects')
+        mapped_columns = preview['mapped_columns']
+        rows_sampled = len(df)
+        # A sample shorter than nrows is the whole sheet
+        rows_total = rows_sampled if rows_sampled < nrows else estimate_row_count(file_path)
+
+        reject_reasons = {}
+        for _, reason in rejects:
+            reject_reasons[reason] = reject_reasons.get(reason, 0) + 1
+        projected_rejects = None
+        if rows_total is not None and rows_sampled:
+            projected_rejects = round(len(rejects) / rows_sampled * rows_total)
+
+        return {
+            'valid': not preview['missing_columns'] and rows_sampled > len(rejects),
+            'file_type': file_type,
+            'columns': [str(column) for column in df.columns],
+            'unmapped_columns': [
+                str(column) for column in df.columns if str(column) not in set(mapped_columns.values())
+            ],
+            **preview,
+            'rows_sampled': rows_sampled,
+            'rows_total_estimate': rows_total,
+            'rejected_rows': len(rejects),
+            'reject_reasons': reject_reasons,
+            'reject_samples': [{'row': int(index), 'reason': reason} for index, reason in rejects[:20]],
+            'projected_rejects': projected_rejects,
+            'elapsed_ms': round((time.monotonic() - started) * 1000),
+        }
+
+    @staticmethod
+    def _preview_batch_performance(df):
+        column_mapping, missing_columns = ExcelProcessor._map_batch_performance_columns(df.columns)
+        preview = {
+            'mapped_columns': {expected: str(column) for expected, column in column_mapping.items()},
+            'missing_columns': missing_columns,
+        }
+        if missing_columns:
+            return {**preview, 'status_mapping': [], 'status_counts': {}, 'rejects': []}
+
+        frame, rejects = ExcelProcessor._prepare_batch_job_frame(df, column_mapping)
+        raw_status = df[column_mapping['Status']]
+        # How each distinct status text normalizes; None means the timing-based fallback applies
+        status_mapping = [
+            {'value': None if pd.isna(value) else str(value), 'status': ExcelProcessor.normalize_status(value), 'rows': int(count)}
+            for value, count in raw_status.value_counts(dropna=False).items()
+        ]
+        return {
+            **preview,
+            'status_mapping': status_mapping,
+            'status_counts': {status: int(count) for status, count in frame['status'].value_counts().items()},
+            'rejects': rejects,
+        }
+
+    @staticmethod
+    def _preview_volumetrics(df):
+        columns = [str(column).strip() for column in df.columns]
+        column_mapping, missing_columns = ExcelProcessor._map_volumetrics_columns(columns)
+        preview = {
+            'mapped_columns': {expected: str(df.columns[columns.index(column)]) for expected, column in column_mapping.items()},
+            'missing_columns': missing_columns,
+            'status_mapping': [],
+            'status_counts': {},
+        }
+        if missing_columns:
+            return {**preview, 'rejects': []}
+
+        positions = {expected: columns.index(column) for expected, column in column_mapping.items()}
+        _, rejects = ExcelProcessor._prepare_volumetrics_frame(df, positions)
+        return {**preview, 'rejects': rejects}
+
+    @staticmethod
+    def _preview_sla_tracking(df):
+        required_columns = ['Job Name', 'Date', 'SLA Target', 'Actual Runtime']
+        preview = {
+            'mapped_columns': {column: column for column in required_columns + ['Business Impact'] if column in df.columns},
+            'missing_columns': [column for column in required_columns if column not in df.columns],
+            'status_mapping': [],
+        }
+        if preview['missing_columns']:
+            return {**preview, 'status_counts': {}, 'rejects': []}
+
+        frame, rejects = ExcelProcessor._prepare_sla_tracking_frame(df)
+        return {
+            **preview,
+            'status_counts': {status: int(count) for status, count in frame['sla_status'].value_counts().items()},
+            'rejects': rejects,
+        }
+
+    @staticmethod
+    def _preview_batch_schedule(df):
+        if 'JOBNAME' in df.columns:
+            # Tidal export, routed to process_enhanced_batch_schedule_file
+            columns = {str(column).strip(): str(column) for column in df.columns}
+            job_names = df['JOBNAME']
+            empty = job_names.isna() | (job_names.astype(str).str.strip() == '')
+            enabled = df[columns['ENABLED OR DISABLED?']] if 'ENABLED OR DISABLED?' in columns else pd.Series('', index=df.index)
+            enabled = enabled[~empty].fillna('').astype(str).str.strip().str.upper()
+            status = pd.Series(np.where(enabled.isin(['', 'ENABLED']), 'ENABLED', 'DISABLED'), index=enabled.index)
+            return {
+                'format': 'TIDAL',
+                'mapped_columns': {
+                    expected: columns[expected] for expected in ExcelProcessor.ENHANCED_SCHEDULE_COLUMNS if expected in columns
+                },
+                'missing_columns': [],
+                'status_mapping': [],
+                'status_counts': {value: int(count) for value, count in status.value_counts().items()},
+                'rejects': [(index, 'Missing JOBNAME') for index in df.index[empty]],
+            }
+
+        required_columns = ExcelProcessor.SCHEDULE_REQUIRED_COLUMNS
+        optional_columns = ['Status', 'Priority', 'Last Run Time', 'Dependencies']
+        preview = {
+            'format': 'LEGACY',
+            'mapped_columns': {column: column for column in required_columns + optional_columns if column in df.columns},
+            'missing_columns': [column for column in required_columns if column not in df.columns],
+            'status_mapping': [],
+        }
+        if preview['missing_columns']:
+            return {**preview, 'status_counts': {}, 'rejects': []}
+
+        def parses(convert, value):
+            try:
+                return pd.notna(convert(value))
+            except (TypeError, ValueError, OverflowError):
+                return False
+
+        # Same per-row conversions as process_batch_schedule_file
+        reject_reasons = pd.Series(None, index=df.index, dtype=object)
+        if 'Priority' in df.columns:
+            bad_priority = ~df['Priority'].map(lambda value: parses(int, value)).astype(bool)
+            reject_reasons = reject_reasons.mask(bad_priority, 'Invalid priority')
+        bad_next_run = ~df['Next Run Time'].map(lambda value: parses(pd.to_datetime, value)).astype(bool)
+        reject_reasons = reject_reasons.mask(bad_next_run, 'Invalid or missing next run time')
+        reject_mask = reject_reasons.notna()
+
+        raw_status = df['Status'] if 'Status' in df.columns else pd.Series('active', index=df.index)
+        status = raw_status.astype(object).map(str).str.lower().map(ExcelProcessor.SCHEDULE_STATUS_MAPPING).fillna('ACTIVE')
+        return {
+            **preview,
+            'status_counts': {value: int(count) for value, count in status[~reject_mask].value_counts().items()},
+            'rejects': list(reject_reasons[reject_mask].items()),
+        }
 
 
 class SLAAnalyzer:
     """Utility class for analyzing batch performance against SLA definitions"""
-    
+
+    # Run statuses that are checked against their SLA
+    COMPLETED_STATUSES = ['COMPLETED_NORMAL', 'COMPLETED_ABNORMAL', 'COMPLETED_NORMAL_STAR', 'COMPLETED', 'COMPLETED_WITH_WARNINGS']
+
+    # Batch job statuses of runs that have not completed yet
+    IN_FLIGHT_STATUSES = ['PENDING', 'LONG_RUNNING']
+
+    # SLAData fields computed by the analysis
+    RESULT_FIELDS = [
+        'sla_definition', 'sla_target_time', 'actual_completion_time', 'sla_target_minutes',
+        'actual_runtime_minutes', 'completed_next_day', 'days_late', 'sla_status',
+        'variance_minutes', 'variance_percentage', 'business_impact',
+    ]
+
     @staticmethod
-    def analyze_batch_performance_for_sla(customer_id=None, product=None, date_from=None, date_to=None):
+    def analyze_batch_performance_for_sla(customer_id=None, product=None, date_from=None, date_to=None, full=False, in_database=None):
         """
         Analyze batch performance data against SLA definitions and create/update SLA data
+
+        Incremental by default: for each customer and product, only batch jobs
+        inserted or changed since its SLAAnalysisWatermark are analyzed, and the
+        watermark then moves up to the newest job seen when the run started.
+        full=True analyzes every matching job again, e.g. after SLA definitions
+        changed. A run limited to a date range leaves the watermarks alone, since
+        changes outside the range are not analyzed.
+
+        Jobs are analyzed in Python and written INGESTION_BATCH_SIZE at a time
+        by _save_sla_results, or, with in_database (default
+        SLA_ANALYSIS_IN_DATABASE), by one SQL statement that computes the same
+        results inside SQLite or PostgreSQL (see _analyze_in_database).
         """
-        from .models import BatchJob, SLADefinition, SLAData
-        from datetime import datetime, time, timedelta
-        
+        from .models import BatchJob, SLAAnalysisWatermark
+
         # Get batch jobs to analyze
         batch_jobs = BatchJob.objects.all()
         
@@ -865,29 +1622,144 @@ class SLAAnalyzer:
             batch_jobs = batch_jobs.filter(customer_id=customer_id)
         if product:
             batch_jobs = batch_jobs.filter(product=product)
+
+        # Newest change per customer and product, read up front so that jobs changed during the run are analyzed again next time
+        latest_changes = {
+            (row['customer_id'], row['product']): row['latest']
+            for row in batch_jobs.order_by().values('customer_id', 'product').annotate(latest=models.Max('updated_at'))
+        }
+        if not full:
+            watermarks = SLAAnalysisWatermark.objects.all()
+            if customer_id:
+                watermarks = watermarks.filter(customer_id=customer_id)
+            if product:
+                watermarks = watermarks.filter(product=product)
+            analyzed_through = {
+                (watermark.customer_id, watermark.product): watermark.analyzed_through
+                for watermark in watermarks
+            }
+
+            changed = models.Q(pk__in=[])
+            for (pair_customer_id, pair_product), latest in latest_changes.items():
+                pair = models.Q(customer_id=pair_customer_id, product=pair_product)
+                if (pair_customer_id, pair_product) in analyzed_through:
+                    if latest <= analyzed_through[(pair_customer_id, pair_product)]:
+                        continue
+                    pair &= models.Q(updated_at__gt=analyzed_through[(pair_customer_id, pair_product)])
+                changed |= pair
+            batch_jobs = batch_jobs.filter(changed)
+
         if date_from:
             batch_jobs = batch_jobs.filter(start_time__date__gte=date_from)
         if date_to:
             batch_jobs = batch_jobs.filter(start_time__date__lte=date_to)
         
-        # Only analyze completed jobs
-        batch_jobs = batch_jobs.filter(status__in=['COMPLETED_NORMAL', 'COMPLETED_ABNORMAL', 'COMPLETED_NORMAL_STAR', 'COMPLETED', 'COMPLETED_WITH_WARNINGS'])
+        # Only analyze completed jobs, loading just the fields the analysis reads
+        batch_jobs = batch_jobs.filter(status__in=SLAAnalyzer.COMPLETED_STATUSES).only(
+            'id', 'customer_id', 'product', 'job_name', 'start_time', 'end_time'
+        )
+
+        created_count, updated_count = SLAAnalyzer._analyze(batch_jobs, customer_id, product, in_database)
+        analyzed_count = created_count + updated_count
+
+        if not (date_from or date_to):
+            with write_phase():
+                for (pair_customer_id, pair_product), latest in latest_changes.items():
+                    SLAAnalysisWatermark.objects.update_or_create(
+                        customer_id=pair_customer_id,
+                        product=pair_product,
+                        defaults={'analyzed_through': latest}
+                    )
+        
+        return {
+            'analyzed_count': analyzed_count,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'full': full,
+            'message': f"Analyzed {analyzed_count} batch jobs: {created_count} created, {updated_count} updated"
+        }
+
+    @staticmethod
+    def recompute_sla_for_jobs(job_keys, in_database=None):
+        """
+        Analyze again every completed run of the given (customer id, product, job name) keys.
+
+        Used after SLA definitions changed, so only the jobs they apply to are
+        rescanned; watermarks are left alone, as the runs themselves did not
+        change. Returns the same summary as analyze_batch_performance_for_sla.
+        """
+        from .models import BatchJob
+
+        job_names = {}
+        for customer_id, product, job_name in job_keys:
+            job_names.setdefault((customer_id, product), set()).add(job_name)
+
+        created_count = updated_count = 0
+        names_per_query = ingestion_batch_size()
+        for (customer_id, product), names in job_names.items():
+            names = sorted(names)
+            for start in range(0, len(names), names_per_query):
+                batch_jobs = BatchJob.objects.filter(
+                    customer_id=customer_id,
+                    product=product,
+                    job_name__in=names[start:start + names_per_query],
+                    status__in=SLAAnalyzer.COMPLETED_STATUSES
+                ).only('id', 'customer_id', 'product', 'job_name', 'start_time', 'end_time')
+                created, updated = SLAAnalyzer._analyze(batch_jobs, customer_id, product, in_database)
+                created_count += created
+                updated_count += updated
+
+        analyzed_count = created_count + updated_count
+        return {
+            'analyzed_count': analyzed_count,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'message': (
+                f"Recomputed SLA for {len(job_keys)} jobs: analyzed {analyzed_count} runs, "
+                f"{created_count} created, {updated_count} updated"
+            )
+        }
+
+    @staticmethod
+    def _analyze(batch_jobs, customer_id, product, in_database):
+        """Analyze batch_jobs in the database or in Python (in_database None: SLA_ANALYSIS_IN_DATABASE); returns (created, updated)"""
+        if in_database is None:
+            in_database = getattr(settings, 'SLA_ANALYSIS_IN_DATABASE', False)
+        if in_database and connection.vendor not in ('sqlite', 'postgresql'):
+            logger.warning(f"SLA analysis in the database is not supported on {connection.vendor}, analyzing in Python")
+            in_database = False
+
+        if in_database:
+            with write_phase():
+                return SLAAnalyzer._analyze_in_database(batch_jobs)
+        return SLAAnalyzer._analyze_in_python(batch_jobs, customer_id, product)
+
+    @staticmethod
+    def _analyze_in_python(batch_jobs, customer_id=None, product=None):
+        """Analyze batch_jobs job by job against the scope's active SLA definitions; returns (created, updated)"""
+        from .models import SLADefinition
+
+        # Active SLA definitions of the whole scope, read once rather than per job
+        sla_definitions = SLADefinition.objects.filter(is_active=True)
+        if customer_id:
+            sla_definitions = sla_definitions.filter(customer_id=customer_id)
+        if product:
+            sla_definitions = sla_definitions.filter(product=product)
+        definitions = {
+            (definition.customer_id, definition.product, definition.job_name): definition
+            for definition in sla_definitions
+        }
         
-        analyzed_count = 0
+        batch_size = ingestion_batch_size()
         created_count = 0
         updated_count = 0
+        pending = []
         
-        for batch_job in batch_jobs:
+        for batch_job in SLAAnalyzer._iterate_in_pages(batch_jobs, batch_size):
             try:
                 # Find matching SLA definition
-                try:
-                    sla_definition = SLADefinition.objects.get(
-                        customer=batch_job.customer,
-                        product=batch_job.product,
-                        job_name=batch_job.job_name,
-                        is_active=True
-                    )
-                except SLADefinition.DoesNotExist:
+                sla_definition = definitions.get((batch_job.customer_id, batch_job.product, batch_job.job_name))
+                if sla_definition is None:
                     # No SLA defined for this job - treat as met by default
                     actual_completion_time = batch_job.end_time.time() if batch_job.end_time else None
                     actual_runtime_minutes = 0
@@ -906,63 +1778,600 @@ class SLAAnalyzer:
                         if completed_next_day:
                             actual_runtime_minutes += (days_late * 24 * 60)
                     
-                    sla_data, created = SLAData.objects.update_or_create(
-                        customer=batch_job.customer,
-                        product=batch_job.product,
-                        job_name=batch_job.job_name,
-                        date=batch_job.start_time.date(),
-                        batch_job=batch_job,
-                        defaults={
-                            'sla_definition': None,
-                            'sla_target_time': None,
-                            'actual_completion_time': actual_completion_time,
-                            'sla_target_minutes': 0,
-                            'actual_runtime_minutes': actual_runtime_minutes,
-                            'completed_next_day': completed_next_day,
-                            'days_late': days_late,
-                            'sla_status': 'MET',  # Jobs without SLA definition are considered met by default
-                            'variance_minutes': 0,  # No variance since no target
-                            'variance_percentage': 0,  # No variance since no target
-                            'business_impact': 'No SLA defined - considered compliant by default'
-                        }
-                    )
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                    analyzed_count += 1
-                    continue
-                
-                # Calculate SLA compliance
-                sla_result = SLAAnalyzer._calculate_sla_compliance(batch_job, sla_definition)
-                
-                # Create or update SLA data record
-                sla_data, created = SLAData.objects.update_or_create(
-                    customer=batch_job.customer,
+                    sla_result = {
+                        'sla_definition': None,
+                        'sla_target_time': None,
+                        'actual_completion_time': actual_completion_time,
+                        'sla_target_minutes': 0,
+                        'actual_runtime_minutes': actual_runtime_minutes,
+                        'completed_next_day': completed_next_day,
+                        'days_late': days_late,
+                        'sla_status': 'MET',  # Jobs without SLA definition are considered met by default
+                        'variance_minutes': 0,  # No variance since no target
+                        'variance_percentage': 0,  # No variance since no target
+                        'business_impact': 'No SLA defined - considered compliant by default'
+                    }
+                else:
+                    # Calculate SLA compliance
+                    sla_result = SLAAnalyzer._calculate_sla_compliance(batch_job, sla_definition)
+
+                pending.append(SLAData(
+                    customer_id=batch_job.customer_id,
                     product=batch_job.product,
                     job_name=batch_job.job_name,
                     date=batch_job.start_time.date(),
-                    batch_job=batch_job,
-                    defaults=sla_result
-                )
-                
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-                analyzed_count += 1
+                    batch_job_id=batch_job.id,
+                    **sla_result
+                ))
                 
             except Exception as e:
                 logger.error(f"Error analyzing SLA for batch job {batch_job.id}: {str(e)}")
                 continue
-        
+
+            if len(pending) >= batch_size:
+                created, updated = SLAAnalyzer._save_sla_results(pending)
+                created_count += created
+                updated_count += updated
+                pending = []
+
+        created, updated = SLAAnalyzer._save_sla_results(pending)
+        created_count += created
+        updated_count += updated
+        return created_count, updated_count
+
+    @staticmethod
+    def _analyze_in_database(batch_jobs):
+        """
+        Analyze batch_jobs with set-based SQL on SQLite or PostgreSQL; returns (created, updated).
+
+        The jobs are joined to their active SLA definitions, every SLAData value
+        is derived in SQL and the rows are written by a single INSERT ... SELECT
+        ... ON CONFLICT DO UPDATE on the unique key, so no job passes through
+        Python. The expressions repeat _calculate_sla_compliance with the same
+        floating point operations in the same order, so the stored values are
+        identical to the Python analysis. Minutes in the business impact are
+        rounded to one decimal exactly as Python's format() does, half to even
+        on the binary value (see _round_tenths_sql); the databases' own number
+        formatting rounds such values differently.
+
+        Dates and times are those of the UTC values, as the ORM returns them.
+        Must run inside a transaction, so that the counts match what is written.
+        """
+        quote = connection.ops.quote_name
+
+        def column(model, field_name, alias):
+            return f"{alias}.{quote(model._meta.get_field(field_name).column)}"
+
+        if connection.vendor == 'postgresql':
+            def utc(value):
+                return f"({value} AT TIME ZONE 'UTC')"
+
+            def date_of(value):
+                return f"CAST({value} AS DATE)"
+
+            def time_of(value):
+                return f"CAST({value} AS TIME)"
+
+            def days_between(start, end):
+                return f"({date_of(end)} - {date_of(start)})"
+
+            def minutes_of(value):
+                # Float division, as 60.0 alone would make the sum NUMERIC
+                return (
+                    f"(CAST(EXTRACT(HOUR FROM {value}) AS INTEGER) * 60 + CAST(EXTRACT(MINUTE FROM {value}) AS INTEGER)"
+                    f" + CAST(FLOOR(EXTRACT(SECOND FROM {value})) AS INTEGER) / CAST(60 AS DOUBLE PRECISION))"
+                )
+
+            def floor(value):
+                return f"CAST(FLOOR({value}) AS BIGINT)"
+        else:
+            # SQLite stores datetimes as UTC 'YYYY-MM-DD HH:MM:SS[.ffffff]' text and times as 'HH:MM:SS[.ffffff]'
+            def utc(value):
+                return value
+
+            def date_of(value):
+                return f"substr({value}, 1, 10)"
+
+            def time_of(value):
+                return f"substr({value}, 12)"
+
+            def days_between(start, end):
+                return f"CAST(julianday({date_of(end)}) - julianday({date_of(start)}) AS INTEGER)"
+
+            def minutes_of(value):
+                return (
+                    f"(CAST(substr({value}, 1, 2) AS INTEGER) * 60 + CAST(substr({value}, 4, 2) AS INTEGER)"
+                    f" + CAST(substr({value}, 7, 2) AS INTEGER) / 60.0)"
+                )
+
+            def floor(value):
+                # Only used on values >= 0, where truncation is the floor
+                return f"CAST({value} AS INTEGER)"
+
+        from .models import SLADefinition
+
+        start_time = utc(column(BatchJob, 'start_time', 'b'))
+        end_time = utc(column(BatchJob, 'end_time', 'b'))
+        scope_sql, scope_params = batch_jobs.order_by().values('id').query.sql_with_params()
+
+        jobs_sql = (
+            f"SELECT {column(BatchJob, 'id', 'b')} AS batch_job_id, {column(BatchJob, 'customer', 'b')} AS customer_id, "
+            f"{column(BatchJob, 'product', 'b')} AS product, {column(BatchJob, 'job_name', 'b')} AS job_name, "
+            f"{date_of(start_time)} AS run_date, "
+            f"{column(SLADefinition, 'id', 'd')} AS definition_id, {column(SLADefinition, 'sla_target_time', 'd')} AS target_time, "
+            f"{time_of(end_time)} AS completion_time, "
+            f"{minutes_of(time_of(end_time))} AS completion_minutes, "
+            f"CASE WHEN {column(SLADefinition, 'id', 'd')} IS NULL THEN 0.0 "
+            f"ELSE {minutes_of(column(SLADefinition, 'sla_target_time', 'd'))} END AS target_minutes, "
+            f"CASE WHEN {column(BatchJob, 'end_time', 'b')} IS NULL THEN 0 ELSE {days_between(start_time, end_time)} END AS days_late "
+            f"FROM {quote(BatchJob._meta.db_table)} b "
+            f"LEFT JOIN {quote(SLADefinition._meta.db_table)} d ON ("
+            f"{column(SLADefinition, 'customer', 'd')} = {column(BatchJob, 'customer', 'b')} "
+            f"AND {column(SLADefinition, 'product', 'd')} = {column(BatchJob, 'product', 'b')} "
+            f"AND {column(SLADefinition, 'job_name', 'd')} = {column(BatchJob, 'job_name', 'b')} "
+            f"AND {column(SLADefinition, 'is_active', 'd')} = %s) "
+            f"WHERE {column(BatchJob, 'id', 'b')} IN ({scope_sql})"
+        )
+        jobs_params = [True, *scope_params]
+
+        # Completion in minutes from midnight of the start day, then the variance against the target.
+        # Both stages are materialized: inlined, every later reference to one of their columns
+        # would evaluate the whole expression again.
+        materialized = (
+            'MATERIALIZED ' if connection.vendor == 'postgresql' or connection.Database.sqlite_version_info >= (3, 35)
+            else ''
+        )
+        results_cte = (
+            f"WITH sla_jobs AS {materialized}({jobs_sql}), sla_results AS {materialized}("
+            "SELECT r.*, CASE WHEN r.definition_id IS NULL OR r.completion_minutes IS NULL THEN 0.0 "
+            "ELSE r.actual_minutes - r.target_minutes END AS variance_minutes FROM ("
+            "SELECT j.*, CASE WHEN j.completion_minutes IS NULL THEN 0.0 "
+            "WHEN j.days_late > 0 THEN j.completion_minutes + j.days_late * 1440 "
+            "ELSE j.completion_minutes END AS actual_minutes FROM sla_jobs j) r) "
+        )
+        rounded_sql, tenths = SLAAnalyzer._round_tenths_sql('SELECT * FROM sla_results', 'variance_minutes', floor)
+        minutes_text = f"CAST(s.{tenths} / 10 AS TEXT) || '.' || CAST(s.{tenths} %% 10 AS TEXT)"
+
+        sla_data = quote(SLAData._meta.db_table)
+        key_fields = ['customer', 'product', 'job_name', 'date', 'batch_job']
+        fields = key_fields + SLAAnalyzer.RESULT_FIELDS + ['analyzed_at', 'created_at']
+        values = [
+            's.customer_id', 's.product', 's.job_name', 's.run_date', 's.batch_job_id',
+            's.definition_id', 's.target_time', 's.completion_time', 's.target_minutes', 's.actual_minutes',
+            's.days_late > 0', 's.days_late',
+            "CASE WHEN s.definition_id IS NULL THEN 'MET' WHEN s.completion_minutes IS NULL THEN 'AT_RISK' "
+            "WHEN s.days_late > 0 THEN 'MISSED' WHEN s.variance_minutes <= 0 THEN 'MET' ELSE 'MISSED' END",
+            's.variance_minutes',
+            "CASE WHEN s.definition_id IS NOT NULL AND s.completion_minutes IS NOT NULL AND s.target_minutes > 0 "
+            "THEN (s.variance_minutes / s.target_minutes) * 100 ELSE 0.0 END",
+            "CASE WHEN s.definition_id IS NULL THEN 'No SLA defined - considered compliant by default' "
+            "WHEN s.completion_minutes IS NULL THEN 'Job not completed yet' "
+            "WHEN s.days_late > 0 THEN 'Job completed ' || CAST(s.days_late AS TEXT) || ' day(s) late' "
+            f"WHEN s.variance_minutes <= 0 THEN 'Job completed ' || {minutes_text} || ' minutes early' "
+            f"ELSE 'Job completed ' || {minutes_text} || ' minutes late' END",
+            '%s', '%s',
+        ]
+        columns = [quote(SLAData._meta.get_field(field).column) for field in fields]
+        update_columns = [quote(SLAData._meta.get_field(field).column) for field in SLAAnalyzer.RESULT_FIELDS + ['analyzed_at']]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*), COUNT({column(SLAData, 'id', 'x')}) FROM ({jobs_sql}) j "
+                f"LEFT JOIN {sla_data} x ON {column(SLAData, 'customer', 'x')} = j.customer_id "
+                f"AND {column(SLAData, 'product', 'x')} = j.product AND {column(SLAData, 'job_name', 'x')} = j.job_name "
+                f"AND {column(SLAData, 'date', 'x')} = j.run_date AND {column(SLAData, 'batch_job', 'x')} = j.batch_job_id",
+                jobs_params
+            )
+            analyzed, updated = cursor.fetchone()
+
+            # WHERE is required by SQLite to tell ON CONFLICT apart from a join constraint
+            cursor.execute(
+                f"{results_cte}INSERT INTO {sla_data} ({', '.join(columns)}) "
+                f"SELECT {', '.join(values)} FROM ({rounded_sql}) s WHERE 1 = 1 "
+                f"ON CONFLICT ({', '.join(columns[:len(key_fields)])}) DO UPDATE SET "
+                + ', '.join(f"{name} = EXCLUDED.{name}" for name in update_columns),
+                [*jobs_params, now, now]
+            )
+
+        return analyzed - updated, updated
+
+    @staticmethod
+    def _round_tenths_sql(source_sql, column_name, floor):
+        """
+        Wrap source_sql to add the absolute value of column_name, in tenths rounded half to even.
+
+        Returns (sql, name of the added column); '%' is escaped for cursor.execute
+        with parameters. This is format(abs(x), '.1f')
+        without its decimal point: 10 * x is split exactly into a float and its
+        rounding error (TwoSum), so ties are detected on the binary value even
+        where 10 * x itself rounds. floor renders SQL for the floor of a value.
+        """
+        return (
+            "SELECT t.*, t.tenths_whole + CASE "
+            "WHEN ((t.tenths - t.tenths_whole) - 0.5) + t.tenths_error > 0 THEN 1 "
+            "WHEN ((t.tenths - t.tenths_whole) - 0.5) + t.tenths_error < 0 THEN 0 "
+            "WHEN t.tenths_whole %% 2 = 1 THEN 1 ELSE 0 END AS rounded_tenths FROM ("
+            "SELECT m.*, (m.magnitude * 8 - (m.tenths - (m.tenths - m.magnitude * 8))) "
+            "+ (m.magnitude * 2 - (m.tenths - m.magnitude * 8)) AS tenths_error, "
+            f"{floor('m.tenths')} AS tenths_whole FROM ("
+            "SELECT a.*, a.magnitude * 8 + a.magnitude * 2 AS tenths FROM ("
+            f"SELECT v.*, ABS(v.{column_name}) AS magnitude FROM ({source_sql}) v) a) m) t"
+        ), 'rounded_tenths'
+
+    @staticmethod
+    def analyze_published_batch_jobs(customer_id, product, batch_job_ids):
+        """
+        Create or update SLAData for just-ingested batch jobs of one customer and product.
+
+        Called with the ids of the runs an upload inserted or updated, inside the
+        transaction that published them, so the cost follows the size of the
+        upload rather than the customer's history. The active SLA definitions
+        are loaded once, the results are computed a column at a time by
+        _sla_results_frame and written by _save_sla_results_frame. Results and the
+        returned dict are the same as analyze_batch_performance_for_sla gives
+        for these jobs.
+
+        When these runs are the only ones of the customer and product changed
+        since its SLAAnalysisWatermark (or the scope has no other runs and no
+        watermark yet), the pass has covered everything an incremental analysis
+        would read, so the watermark moves up to the newest run; otherwise it is
+        left for analyze_batch_performance_for_sla to catch up.
+        """
+        from .models import SLADefinition, SLAAnalysisWatermark
+
+        batch_size = ingestion_batch_size()
+        definitions = {
+            definition.job_name: definition
+            for definition in SLADefinition.objects.filter(customer_id=customer_id, product=product, is_active=True)
+        }
+
+        created_count = 0
+        updated_count = 0
+        for chunk_start in range(0, len(batch_job_ids), batch_size):
+            chunk_ids = batch_job_ids[chunk_start:chunk_start + batch_size]
+            jobs = pd.DataFrame.from_records(
+                list(
+                    BatchJob.objects.filter(id__in=chunk_ids, status__in=SLAAnalyzer.COMPLETED_STATUSES)
+                    .values_list('id', 'job_name', 'start_time', 'end_time')
+                ),
+                columns=['batch_job_id', 'job_name', 'start_time', 'end_time']
+            )
+            if jobs.empty:
+                continue
+
+            created, updated = SLAAnalyzer._save_sla_results_frame(
+                SLAAnalyzer._sla_results_frame(jobs, definitions),
+                {'customer': customer_id, 'product': product}
+            )
+            created_count += created
+            updated_count += updated
+
+        # Published runs were all stamped after the watermark, so if as many runs changed since it, they are these
+        watermark = SLAAnalysisWatermark.objects.filter(customer_id=customer_id, product=product).first()
+        scope = BatchJob.objects.filter(customer_id=customer_id, product=product).aggregate(
+            latest=models.Max('updated_at'),
+            changed=(
+                models.Count('id', filter=models.Q(updated_at__gt=watermark.analyzed_through)) if watermark
+                else models.Count('id')
+            )
+        )
+        if batch_job_ids and scope['changed'] == len(batch_job_ids):
+            SLAAnalysisWatermark.objects.update_or_create(
+                customer_id=customer_id,
+                product=product,
+                defaults={'analyzed_through': scope['latest']}
+            )
+
+        analyzed_count = created_count + updated_count
         return {
             'analyzed_count': analyzed_count,
             'created_count': created_count,
             'updated_count': updated_count,
             'message': f"Analyzed {analyzed_count} batch jobs: {created_count} created, {updated_count} updated"
         }
-    
+
+    @staticmethod
+    def evaluate_sla_risk(now=None):
+        """
+        Project when in-flight runs will complete and rebuild SLAAtRiskRun with those that may miss their SLA.
+
+        Only PENDING and LONG_RUNNING runs without an end time that started in
+        the last SLA_RISK_MAX_RUN_HOURS are read, through the status index,
+        along with the completed runs of the same jobs from the last
+        SLA_RISK_HISTORY_DAYS days. A running job's completion is projected from
+        the durations of past runs that lasted longer than it has been running
+        so far (a pending one is taken to start now): the median gives the
+        expected completion, the 90th percentile a late one. The deadline is the
+        SLA target time on the run's start date, as in the end-of-day analysis.
+        A run is BREACHED once the deadline has passed, LIKELY_MISS when the
+        expected completion is after it and AT_RISK when the late completion
+        is, or when it has outlasted every past run. Returns a summary.
+        """
+        from collections import Counter
+        from .models import SLADefinition, SLAAtRiskRun
+
+        now = now or timezone.now()
+        # Extracts also carry runs that finished long ago, or never ran, with these statuses
+        in_flight = list(
+            BatchJob.objects.filter(
+                status__in=SLAAnalyzer.IN_FLIGHT_STATUSES,
+                end_time__isnull=True,
+                start_time__gte=now - timedelta(hours=getattr(settings, 'SLA_RISK_MAX_RUN_HOURS', 48))
+            ).order_by().only('id', 'customer_id', 'product', 'job_name', 'status', 'start_time')
+        )
+
+        job_names = {}
+        for batch_job in in_flight:
+            job_names.setdefault((batch_job.customer_id, batch_job.product), set()).add(batch_job.job_name)
+
+        history_start = now - timedelta(days=getattr(settings, 'SLA_RISK_HISTORY_DAYS', 30))
+        definitions = {}
+        durations = {}
+        for (customer_id, product), names in job_names.items():
+            for definition in SLADefinition.objects.filter(
+                customer_id=customer_id, product=product, job_name__in=names, is_active=True
+            ).order_by():
+                definitions[(customer_id, product, definition.job_name)] = definition
+
+            # Jobs without an SLA cannot miss one, so their history is not needed
+            names = [name for name in names if (customer_id, product, name) in definitions]
+            if not names:
+                continue
+            history = BatchJob.objects.filter(
+                customer_id=customer_id,
+                product=product,
+                job_name__in=names,
+                start_time__gte=history_start,
+                status__in=SLAAnalyzer.COMPLETED_STATUSES,
+                end_time__isnull=False
+            ).order_by().values_list('job_name', 'start_time', 'end_time')
+            for job_name, start_time, end_time in history:
+                durations.setdefault((customer_id, product, job_name), []).append((end_time - start_time).total_seconds() / 60)
+
+        at_risk = []
+        for batch_job in in_flight:
+            key = (batch_job.customer_id, batch_job.product, batch_job.job_name)
+            sla_definition = definitions.get(key)
+            if sla_definition is None:
+                continue
+
+            deadline = datetime.combine(batch_job.start_time.date(), sla_definition.sla_target_time, tzinfo=batch_job.start_time.tzinfo)
+            if batch_job.status == 'PENDING':
+                started, elapsed_minutes = max(batch_job.start_time, now), 0
+            else:
+                started, elapsed_minutes = batch_job.start_time, max((now - batch_job.start_time).total_seconds() / 60, 0)
+
+            past_durations = durations.get(key, [])
+            remaining = [duration for duration in past_durations if duration > elapsed_minutes]
+            projected = projected_late = None
+            if remaining:
+                projected = started + timedelta(minutes=float(np.quantile(remaining, 0.5)))
+                projected_late = started + timedelta(minutes=float(np.quantile(remaining, 0.9)))
+
+            if now >= deadline:
+                risk_level = 'BREACHED'
+            elif projected is not None and projected > deadline:
+                risk_level = 'LIKELY_MISS'
+            elif projected_late is not None and projected_late > deadline:
+                risk_level = 'AT_RISK'
+            elif past_durations and not remaining:
+                risk_level = 'AT_RISK'
+            else:
+                continue
+
+            at_risk.append(SLAAtRiskRun(
+                batch_job_id=batch_job.id,
+                customer_id=batch_job.customer_id,
+                product=batch_job.product,
+                job_name=batch_job.job_name,
+                job_status=batch_job.status,
+                sla_definition=sla_definition,
+                start_time=batch_job.start_time,
+                sla_deadline=deadline,
+                projected_completion=projected,
+                projected_completion_late=projected_late,
+                history_runs=len(past_durations),
+                risk_level=risk_level,
+                minutes_to_deadline=(deadline - now).total_seconds() / 60,
+                evaluated_at=now
+            ))
+
+        with write_phase():
+            SLAAtRiskRun.objects.exclude(batch_job_id__in=[run.batch_job_id for run in at_risk]).delete()
+            SLAAtRiskRun.objects.bulk_create(
+                at_risk,
+                update_conflicts=True,
+                unique_fields=['batch_job'],
+                update_fields=[
+                    'customer', 'product', 'job_name', 'job_status', 'sla_definition', 'start_time', 'sla_deadline',
+                    'projected_completion', 'projected_completion_late', 'history_runs', 'risk_level',
+                    'minutes_to_deadline', 'evaluated_at'
+                ]
+            )
+
+        risk_levels = dict(Counter(run.risk_level for run in at_risk))
+        return {
+            'in_flight_count': len(in_flight),
+            'at_risk_count': len(at_risk),
+            'risk_levels': risk_levels,
+            'message': f"Evaluated {len(in_flight)} in-flight runs: {len(at_risk)} at risk of missing their SLA"
+        }
+
+    @staticmethod
+    def _iterate_in_pages(queryset, page_size):
+        """
+        Yield the objects of queryset a page at a time, in primary key order.
+
+        Each page is a separate, fully read query, unlike iterator(), which on
+        SQLite keeps its cursor and read lock open while the caller writes;
+        with several processes analyzing at once, a writer waiting for that
+        read lock fails with "database is locked".
+        """
+        last_pk = None
+        while True:
+            page = queryset.order_by('pk')
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            page = list(page[:page_size])
+            if not page:
+                return
+            yield from page
+            last_pk = page[-1].pk
+
+    @staticmethod
+    def _save_sla_results(sla_rows):
+        """
+        Upsert unsaved SLAData rows on their unique key (customer, product, job_name, date, batch_job).
+
+        One query reads which of the keys are already stored, so that created and
+        updated rows can be counted, then the rows are written with chunked
+        bulk_create(update_conflicts=True). SLAData.save() does not run: the
+        analysis has already set the variance and status it would derive. Every
+        row must refer to a batch job, as NULL batch_job values never conflict.
+        Returns (created, updated).
+        """
+        if not sla_rows:
+            return 0, 0
+
+        with write_phase():
+            existing_keys = set(
+                SLAData.objects.filter(batch_job_id__in={sla_data.batch_job_id for sla_data in sla_rows})
+                .values_list('customer_id', 'product', 'job_name', 'date', 'batch_job_id')
+            )
+            created = sum(
+                (sla_data.customer_id, sla_data.product, sla_data.job_name, sla_data.date, sla_data.batch_job_id) not in existing_keys
+                for sla_data in sla_rows
+            )
+
+            SLAData.objects.bulk_create(
+                sla_rows,
+                batch_size=ingestion_batch_size(),
+                update_conflicts=True,
+                unique_fields=['customer', 'product', 'job_name', 'date', 'batch_job'],
+                update_fields=SLAAnalyzer.RESULT_FIELDS + ['analyzed_at']
+            )
+        return created, len(sla_rows) - created
+
+    @staticmethod
+    def _save_sla_results_frame(results, scope):
+        """
+        Upsert a frame from _sla_results_frame as _save_sla_results upserts SLAData rows.
+
+        scope holds the customer id and product shared by every row. The rows
+        are written by one INSERT ... ON CONFLICT DO UPDATE run with
+        executemany, without model construction and per-value field
+        preparation; dates, times and definitions are the only values that need
+        converting. Returns (created, updated).
+        """
+        if results.empty:
+            return 0, 0
+
+        quote = connection.ops.quote_name
+        key_fields = ['customer', 'product', 'job_name', 'date', 'batch_job']
+        fields = list(scope) + ['batch_job' if name == 'batch_job_id' else name for name in results.columns]
+        columns = [quote(SLAData._meta.get_field(field).column) for field in fields + ['analyzed_at', 'created_at']]
+        update_columns = [quote(SLAData._meta.get_field(field).column) for field in SLAAnalyzer.RESULT_FIELDS + ['analyzed_at']]
+
+        converters = {
+            'date': connection.ops.adapt_datefield_value,
+            'sla_definition': lambda sla_definition: sla_definition.pk,
+            'sla_target_time': connection.ops.adapt_timefield_value,
+            'actual_completion_time': connection.ops.adapt_timefield_value,
+        }
+        values = ExcelProcessor._frame_to_python(results)
+        column_values = [
+            [None if value is None else converters[name](value) for value in values[name].tolist()]
+            if name in converters else values[name].tolist()
+            for name in results.columns
+        ]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = [tuple(scope.values()) + row + (now, now) for row in zip(*column_values)]
+
+        with write_phase():
+            existing_keys = set(
+                SLAData.objects.filter(batch_job_id__in=results['batch_job_id'].tolist())
+                .values_list('job_name', 'date', 'batch_job_id')
+            )
+            created = sum(
+                (job_name, run_date, batch_job_id) not in existing_keys
+                for job_name, run_date, batch_job_id in zip(results['job_name'], results['date'], results['batch_job_id'])
+            )
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {quote(SLAData._meta.db_table)} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(quote(SLAData._meta.get_field(field).column) for field in key_fields)}) DO UPDATE SET "
+                    + ', '.join(f"{name} = EXCLUDED.{name}" for name in update_columns),
+                    rows
+                )
+        return created, len(rows) - created
+
+    @staticmethod
+    def _sla_results_frame(jobs, definitions):
+        """
+        SLAData values for a frame of runs (batch_job_id, job_name, start_time, end_time).
+
+        Vectorised form of the per-job rules in analyze_batch_performance_for_sla
+        and _calculate_sla_compliance: runs without an active definition are MET,
+        unfinished runs with one are AT_RISK, and the rest are MISSED when they
+        finished on a later day or after the target time. definitions maps job
+        name to SLADefinition.
+        """
+        start_time = pd.to_datetime(jobs['start_time'], utc=True)
+        end_time = pd.to_datetime(jobs['end_time'], utc=True)
+        has_end = end_time.notna()
+
+        definition = jobs['job_name'].map(definitions)
+        has_definition = definition.notna()
+        target_time = definition.map(lambda sla_definition: sla_definition.sla_target_time, na_action='ignore')
+        target_minutes = target_time.map(SLAAnalyzer._time_to_minutes, na_action='ignore').fillna(0.0).astype(float)
+
+        # Minutes from midnight of the start day, so a run finishing the next day counts 24 hours more
+        days_late = (end_time.dt.normalize() - start_time.dt.normalize()).dt.days.fillna(0).astype(int)
+        completed_next_day = days_late > 0
+        actual_minutes = (end_time.dt.hour * 60 + end_time.dt.minute + end_time.dt.second / 60.0).fillna(0.0)
+        actual_minutes = actual_minutes + (days_late * 24 * 60).where(completed_next_day, 0)
+
+        scored = has_definition & has_end
+        variance = (actual_minutes - target_minutes).where(scored, 0.0)
+        variance_percentage = ((variance / target_minutes.where(target_minutes > 0)) * 100).where(scored & (target_minutes > 0), 0.0)
+        sla_status = np.select(
+            [~has_definition, ~has_end, completed_next_day, variance <= 0],
+            ['MET', 'AT_RISK', 'MISSED', 'MET'],
+            default='MISSED'
+        )
+
+        business_impact = []
+        for defined, ended, next_day, days, minutes in zip(has_definition, has_end, completed_next_day, days_late, variance):
+            if not defined:
+                business_impact.append('No SLA defined - considered compliant by default')
+            elif not ended:
+                business_impact.append('Job not completed yet')
+            elif next_day:
+                business_impact.append(f"Job completed {days} day(s) late")
+            elif minutes <= 0:
+                business_impact.append(f"Job completed {abs(minutes):.1f} minutes early")
+            else:
+                business_impact.append(f"Job completed {minutes:.1f} minutes late")
+
+        return pd.DataFrame({
+            'batch_job_id': jobs['batch_job_id'],
+            'job_name': jobs['job_name'],
+            'date': start_time.dt.date,
+            'sla_definition': definition,
+            'sla_target_time': target_time,
+            'actual_completion_time': end_time.dt.time.where(has_end, None),
+            'sla_target_minutes': target_minutes,
+            'actual_runtime_minutes': actual_minutes,
+            'completed_next_day': completed_next_day,
+            'days_late': days_late,
+            'sla_status': sla_status,
+            'variance_minutes': variance,
+            'variance_percentage': variance_percentage,
+            'business_impact': business_impact,
+        })
+
     @staticmethod
     def _calculate_sla_compliance(batch_job, sla_definition):
         """Calculate SLA compliance for a specific batch job"""
@@ -9,17 +9,20 @@ from django.db.models import Q, Count, Avg, Sum, Max, Min
 from django.utils import timezone
 from datetime import datetime, timedelta
 import os
+import json
 import mimetypes
+import tempfile
+import zipfile
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.db import transaction
 
-from .models import Customer, BatchJob, VolumetricData, SLAData, BatchSchedule, FileUpload, AccountRequest, SLADefinition, PredictionModel, PredictionResult, HistoricalPattern, PredictionAlert
+from .models import Customer, BatchJob, VolumetricData, SLAData, SLAAtRiskRun, BatchSchedule, FileUpload, ChunkedUpload, AccountRequest, SLADefinition, PredictionModel, PredictionResult, HistoricalPattern, PredictionAlert
 from .serializers import (
     CustomerSerializer, GroupedCustomerSerializer, BatchJobSerializer, BatchJobSummarySerializer,
     VolumetricDataSerializer, VolumetricSummarySerializer,
-    SLADataSerializer, SLASummarySerializer,
+    SLADataSerializer, SLAAtRiskRunSerializer, SLASummarySerializer,
     BatchScheduleSerializer, FileUploadSerializer,
     DashboardOverviewSerializer,
     SLADefinitionSerializer,
@@ -28,6 +31,11 @@ from .serializers import (
     PredictionAnalyticsSerializer
 )
 from .utils import ExcelProcessor, DataAnalyzer
+from .tasks import enqueue_file_upload, enqueue_file_upload_batch, process_file_upload, rollback_file_upload
+from .upload_pool import process_uploads_in_pool
+from .upload_storage import (
+    chunked_upload_path, file_checksum, register_stored_upload, register_upload, store_file, write_chunk
+)
 from .prediction_engine import SmartPredictor, PredictionManager
 
 
@@ -250,20 +258,22 @@ class SLADataViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def analyze(self, request):
-        """Trigger SLA analysis for batch performance data"""
+        """Trigger SLA analysis for batch performance data; only jobs changed since the last run unless 'full' is true"""
         from .utils import SLAAnalyzer
         
         customer_id = request.data.get('customer_id')
         product = request.data.get('product')
         date_from = request.data.get('date_from')
         date_to = request.data.get('date_to')
+        full = str(request.data.get('full', '')).lower() == 'true'
         
         try:
             result = SLAAnalyzer.analyze_batch_performance_for_sla(
                 customer_id=customer_id,
                 product=product,
                 date_from=date_from,
-                date_to=date_to
+                date_to=date_to,
+                full=full
             )
             return Response(result, status=status.HTTP_200_OK)
         except Exception as e:
@@ -272,6 +282,26 @@ class SLADataViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def at_risk(self, request):
+        """In-flight runs projected to miss their SLA, as of the last evaluate_sla_risk pass"""
+        queryset = SLAAtRiskRun.objects.select_related('customer', 'sla_definition')
+        customer_id = request.query_params.get('customer', None)
+        product = request.query_params.get('product', None)
+        risk_level = request.query_params.get('risk_level', None)
+
+        if customer_id:
+            queryset = queryset.filter(customer_id=customer_id)
+        if product:
+            queryset = queryset.filter(product=product)
+        if risk_level:
+            queryset = queryset.filter(risk_level=risk_level)
+
+        return Response({
+            'results': SLAAtRiskRunSerializer(queryset, many=True).data,
+            'total_records': len(queryset)
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def completion_trends(self, request):
         """Get batch completion time trends for charting"""
@@ -493,12 +523,54 @@ class FileUploadViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    @action(detail=True, methods=['post'])
+    def rollback(self, request, pk=None):
+        """Delete the rows this upload inserted (see tasks.rollback_file_upload)"""
+        file_upload = self.get_object()
+        if file_upload.status in ['QUEUED', 'PROCESSING']:
+            return Response(
+                {'error': 'Upload is still being processed; roll it back once it has finished'},
+                status=status.HTTP_409_CONFLICT
+            )
+        if file_upload.status == 'ROLLED_BACK':
+            return Response(
+                {'error': 'Upload has already been rolled back'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            deleted, kept = rollback_file_upload(file_upload)
+        except Exception as e:
+            return Response(
+                {'error': f'Error rolling back upload: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        file_upload.refresh_from_db()
+        return Response({
+            'success': True,
+            'deleted': deleted,
+            'kept': kept,
+            'file_upload': self.get_serializer(file_upload).data
+        })
+
+
+ALLOWED_UPLOAD_EXTENSIONS = ('.xlsx', '.xlsm', '.xlsb', '.xls', '.csv')
+
 
 class FileUploadAPIView(APIView):
     """API view for uploading and processing Excel files"""
     
     def post(self, request):
-        """Upload and process Excel file"""
+        """
+        Upload an Excel file and queue it for processing.
+
+        Returns 202 with the FileUpload id; progress is polled from
+        /api/file-uploads/<id>/. With FILE_PROCESSING_ASYNC off the file is
+        processed inside the request as before. Re-uploading identical bytes for
+        the same customer, product and file type returns the earlier upload
+        without processing the file again, unless force=true is sent.
+        """
         uploaded_file = request.FILES.get('file')
         customer_id = request.data.get('customer_id')
         product = request.data.get('product')
@@ -511,9 +583,15 @@ class FileUploadAPIView(APIView):
             )
         
         # Validate file type
-        if not uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+        if not uploaded_file.name.lower().endswith(ALLOWED_UPLOAD_EXTENSIONS):
             return Response(
-                {'error': 'Only Excel files (.xlsx, .xls) are allowed'},
+                {'error': 'Only Excel or CSV files (.xlsx, .xlsm, .xlsb, .xls, .csv) are allowed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if file_type not in dict(FileUpload.FILE_TYPE_CHOICES):
+            return Response(
+                {'error': 'Invalid file type. Supported types: BATCH_PERFORMANCE, VOLUMETRICS, SLA_TRACKING, BATCH_SCHEDULE'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -534,103 +612,484 @@ class FileUploadAPIView(APIView):
             )
         
         try:
-            # Create uploads directory if it doesn't exist
-            upload_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', customer.code, file_type.lower())
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Generate unique filename
-            import uuid
-            from datetime import datetime
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_extension = os.path.splitext(uploaded_file.name)[1]
-            unique_filename = f"{timestamp}_{uuid.uuid4().hex[:8]}{file_extension}"
-            file_path = os.path.join(upload_dir, unique_filename)
-            
-            # Save uploaded file
-            with open(file_path, 'wb') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
-            
-            # Create file upload record first
-            file_upload = FileUpload.objects.create(
-                customer=customer,
-                file_type=file_type,
-                file_name=uploaded_file.name,
-                file_path=file_path,
-                file_size=uploaded_file.size,
-                processed=False,
-                uploaded_by=request.user if request.user.is_authenticated else None
+            force = str(request.data.get('force', '')).lower() == 'true'
+            file_upload, duplicate = register_upload(
+                customer, product, file_type, uploaded_file.name, uploaded_file.chunks(),
+                user=request.user, force=force
             )
-            
-            # Process file based on type, passing product information
-            try:
-                if file_type == 'BATCH_PERFORMANCE':
-                    success, message = ExcelProcessor.process_batch_performance_file(file_path, customer_id, product)
-                    
-                    # Automatically trigger SLA analysis after successful batch performance upload
-                    if success:
-                        try:
-                            from .utils import SLAAnalyzer
-                            sla_result = SLAAnalyzer.analyze_batch_performance_for_sla(
-                                customer_id=customer_id,
-                                product=product
-                            )
-                            # Append SLA analysis results to the message
-                            message += f" | SLA Analysis: {sla_result['message']}"
-                        except Exception as sla_error:
-                            # Don't fail the upload if SLA analysis fails, just log it
-                            message += f" | SLA Analysis Warning: {str(sla_error)}"
-                            
-                elif file_type == 'VOLUMETRICS':
-                    success, message = ExcelProcessor.process_volumetrics_file(file_path, customer_id, product)
-                elif file_type == 'SLA_TRACKING':
-                    success, message = ExcelProcessor.process_sla_tracking_file(file_path, customer_id, product)
-                elif file_type == 'BATCH_SCHEDULE':
-                    # Detect if this is EMB format by checking for JOBNAME column
-                    try:
-                        import pandas as pd
-                        df_sample = pd.read_excel(file_path, nrows=0)  # Read just the headers
-                        if 'JOBNAME' in df_sample.columns:
-                            # Tidal format
-                            success, message = ExcelProcessor.process_emb_batch_schedule_file(file_path, customer_id, product)
-                        else:
-                            # Legacy format
-                            success, message = ExcelProcessor.process_batch_schedule_file(file_path, customer_id, product)
-                    except Exception as e:
-                        # Fallback to legacy processor
-                        success, message = ExcelProcessor.process_batch_schedule_file(file_path, customer_id, product)
+            return _upload_response(file_upload, duplicate, uploaded_file.name, uploaded_file.size, product)
+
+        except Exception as e:
+            return Response(
+                {'error': f'Error uploading file: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def _upload_response(file_upload, duplicate, file_name, file_size, product):
+    """Response for a registered upload: the earlier result for a duplicate, else queue or process it"""
+    # Identical bytes already uploaded for this customer/product/type: reuse that result
+    if duplicate:
+        previous_upload = file_upload
+        in_progress = previous_upload.status in ['QUEUED', 'PROCESSING']
+        return Response({
+            'success': True,
+            'duplicate': True,
+            'queued': in_progress,
+            'message': (
+                f"Identical file already uploaded as {previous_upload.file_name} "
+                f"on {previous_upload.upload_date:%Y-%m-%d %H:%M}: "
+                f"{'still processing' if in_progress else previous_upload.processing_log}"
+            ),
+            'file_upload_id': previous_upload.id,
+            'status': previous_upload.status,
+            'status_url': f'/api/file-uploads/{previous_upload.id}/',
+            'file_name': file_name,
+            'file_size': file_size,
+            'product': product
+        })
+
+    if getattr(settings, 'FILE_PROCESSING_ASYNC', True):
+        # Hand the file to the background worker and let the client poll for progress
+        enqueue_file_upload(file_upload)
+        return Response({
+            'success': True,
+            'queued': True,
+            'message': 'File uploaded and queued for processing',
+            'file_upload_id': file_upload.id,
+            'status': 'QUEUED',
+            'status_url': f'/api/file-uploads/{file_upload.id}/',
+            'file_name': file_name,
+            'file_size': file_size,
+            'product': product
+        }, status=status.HTTP_202_ACCEPTED)
+
+    success, message = process_file_upload(file_upload)
+    return Response({
+        'success': success,
+        'message': message,
+        'file_upload_id': file_upload.id,
+        'file_name': file_name,
+        'file_size': file_size,
+        'product': product
+    })
+
+
+class BulkFileUploadAPIView(APIView):
+    """API view for uploading many files, or zip archives of them, in one request"""
+
+    def post(self, request):
+        """
+        Upload several files for one customer and product and ingest them in parallel.
+
+        Files are sent as repeated 'files' fields; .zip files among them are
+        expanded. The file type of each file is looked up by name in 'manifest',
+        a JSON object mapping file names to file types (a manifest.json inside an
+        archive is used too), falling back to the optional 'file_type' field.
+
+        Accepted files are ingested by a process pool (see upload_pool). With
+        FILE_PROCESSING_ASYNC on the pool runs in the task worker and the response
+        is 202 with each file's status URL; otherwise the response carries each
+        file's processing result. Duplicates are reported per file, as in
+        FileUploadAPIView.
+        """
+        uploaded_files = request.FILES.getlist('files')
+        customer_id = request.data.get('customer_id')
+        product = request.data.get('product')
+        default_file_type = request.data.get('file_type')
+
+        if not all([uploaded_files, customer_id, product]):
+            return Response(
+                {'error': 'files, customer_id and product are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            customer = Customer.objects.get(id=customer_id)
+        except Customer.DoesNotExist:
+            return Response(
+                {'error': 'Customer not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Validate product
+        valid_products = ['FACETS', 'QNXT', 'CAE', 'TMS', 'EDM', 'CLSP']
+        if product not in valid_products:
+            return Response(
+                {'error': f'Invalid product. Must be one of: {", ".join(valid_products)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            manifest = _parse_upload_manifest(request.data.get('manifest'))
+            entries = []
+            for uploaded_file in uploaded_files:
+                if uploaded_file.name.lower().endswith('.zip'):
+                    archive = zipfile.ZipFile(uploaded_file)
+                    if 'manifest.json' in archive.namelist():
+                        archive_manifest = _parse_upload_manifest(archive.read('manifest.json').decode('utf-8'))
+                        manifest = {**archive_manifest, **manifest}
+                    entries.extend(
+                        (info.filename, _zip_member_chunks(archive, info))
+                        for info in archive.infolist()
+                        if not info.is_dir() and info.filename != 'manifest.json'
+                        and not info.filename.startswith('__MACOSX/')
+                        and not os.path.basename(info.filename).startswith('.')
+                    )
                 else:
-                    return Response(
-                        {'error': 'Invalid file type. Supported types: BATCH_PERFORMANCE, VOLUMETRICS, BATCH_SCHEDULE'},
-                        status=status.HTTP_400_BAD_REQUEST
+                    entries.append((uploaded_file.name, uploaded_file.chunks()))
+        except (ValueError, zipfile.BadZipFile) as e:
+            return Response(
+                {'error': f'Invalid manifest or archive: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_files = getattr(settings, 'BULK_UPLOAD_MAX_FILES', 100)
+        if len(entries) > max_files:
+            return Response(
+                {'error': f'Too many files ({len(entries)}); at most {max_files} can be uploaded at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        force = str(request.data.get('force', '')).lower() == 'true'
+        valid_file_types = dict(FileUpload.FILE_TYPE_CHOICES)
+        results = []
+        new_uploads = []
+        try:
+            for name, chunks in entries:
+                file_name = os.path.basename(name)
+                file_type = manifest.get(name) or manifest.get(file_name) or default_file_type
+                result = {'file_name': file_name, 'file_type': file_type}
+                results.append(result)
+
+                if not file_name.lower().endswith(ALLOWED_UPLOAD_EXTENSIONS):
+                    result.update(success=False, error='Only Excel or CSV files (.xlsx, .xlsm, .xlsb, .xls, .csv) are allowed')
+                    continue
+                if file_type not in valid_file_types:
+                    result.update(success=False, error=f'Missing or invalid file type in manifest: {file_type}')
+                    continue
+
+                file_upload, duplicate = register_upload(
+                    customer, product, file_type, file_name, chunks, user=request.user, force=force
+                )
+                result.update(
+                    file_upload_id=file_upload.id,
+                    duplicate=duplicate,
+                    status=file_upload.status,
+                    status_url=f'/api/file-uploads/{file_upload.id}/'
+                )
+                if duplicate:
+                    in_progress = file_upload.status in ['QUEUED', 'PROCESSING']
+                    result.update(
+                        success=True,
+                        message=f"Identical file already uploaded as {file_upload.file_name}: "
+                                f"{'still processing' if in_progress else file_upload.processing_log}"
                     )
-                
-                # Update file upload record with processing results
-                file_upload.processed = success
-                file_upload.processing_log = message
-                file_upload.save()
-                
+                else:
+                    new_uploads.append(file_upload)
+
+            if new_uploads and getattr(settings, 'FILE_PROCESSING_ASYNC', True):
+                # One task runs the whole batch through the process pool in the worker
+                task = enqueue_file_upload_batch(new_uploads)
+                for result in results:
+                    if result.get('duplicate') is False:
+                        result.update(success=True, status='QUEUED', message='Queued for processing')
                 return Response({
-                    'success': success,
-                    'message': message,
-                    'file_upload_id': file_upload.id,
-                    'file_name': uploaded_file.name,
-                    'file_size': uploaded_file.size,
-                    'product': product
-                })
-                
-            except Exception as processing_error:
-                # Update file upload record with error
-                file_upload.processed = False
-                file_upload.processing_log = f"Processing error: {str(processing_error)}"
-                file_upload.save()
-                
+                    'success': True,
+                    'queued': True,
+                    'task_id': task.id,
+                    'message': f'{len(new_uploads)} files uploaded and queued for processing',
+                    'product': product,
+                    'results': results
+                }, status=status.HTTP_202_ACCEPTED)
+
+            if new_uploads:
+                outcomes = process_uploads_in_pool([file_upload.id for file_upload in new_uploads])
+                for result in results:
+                    if result.get('duplicate') is False:
+                        success, message = outcomes[result['file_upload_id']]
+                        result.update(success=success, message=message, status='COMPLETED' if success else 'FAILED')
+
+            failed = sum(1 for result in results if not result['success'])
+            return Response({
+                'success': failed == 0,
+                'queued': False,
+                'message': f'Processed {len(results)} files, {failed} failed',
+                'product': product,
+                'results': results
+            })
+
+        except Exception as e:
+            return Response(
+                {'error': f'Error uploading files: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def _parse_upload_manifest(manifest):
+    """Manifest of a bulk upload as {file name: file type}; accepts a JSON object or a list of {file, file_type}"""
+    if not manifest:
+        return {}
+    if isinstance(manifest, str):
+        manifest = json.loads(manifest)
+    if isinstance(manifest, list):
+        manifest = {entry['file']: entry['file_type'] for entry in manifest}
+    if not isinstance(manifest, dict):
+        raise ValueError('manifest must map file names to file types')
+    return manifest
+
+
+def _zip_member_chunks(archive, info, chunk_size=1024 * 1024):
+    with archive.open(info) as member:
+        while True:
+            chunk = member.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class ChunkedUploadAPIView(APIView):
+    """Start a resumable upload for files too large for a single request"""
+
+    def post(self, request):
+        """
+        Initiate a chunked upload.
+
+        Takes customer_id, product, file_type, file_name and file_size (bytes),
+        plus an optional SHA-256 'checksum' of the whole file and 'force'. The
+        response gives the upload_id, the chunk_size and the number of chunks;
+        each chunk is then PUT to upload-file/chunked/<upload_id>/chunks/<index>/
+        (indexes start at 0) and the upload finished with a POST to
+        upload-file/chunked/<upload_id>/complete/.
+        """
+        customer_id = request.data.get('customer_id')
+        product = request.data.get('product')
+        file_type = request.data.get('file_type')
+        file_name = request.data.get('file_name')
+        file_size = request.data.get('file_size')
+
+        if not all([customer_id, product, file_type, file_name, file_size]):
+            return Response(
+                {'error': 'customer_id, product, file_type, file_name and file_size are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not file_name.lower().endswith(ALLOWED_UPLOAD_EXTENSIONS):
+            return Response(
+                {'error': 'Only Excel or CSV files (.xlsx, .xlsm, .xlsb, .xls, .csv) are allowed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if file_type not in dict(FileUpload.FILE_TYPE_CHOICES):
+            return Response(
+                {'error': 'Invalid file type. Supported types: BATCH_PERFORMANCE, VOLUMETRICS, SLA_TRACKING, BATCH_SCHEDULE'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            customer = Customer.objects.get(id=customer_id)
+        except Customer.DoesNotExist:
+            return Response(
+                {'error': 'Customer not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Validate product
+        valid_products = ['FACETS', 'QNXT', 'CAE', 'TMS', 'EDM', 'CLSP']
+        if product not in valid_products:
+            return Response(
+                {'error': f'Invalid product. Must be one of: {", ".join(valid_products)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_chunk_size = getattr(settings, 'CHUNKED_UPLOAD_MAX_CHUNK_SIZE', 16 * 1024 * 1024)
+        max_file_size = getattr(settings, 'CHUNKED_UPLOAD_MAX_FILE_SIZE', 2 * 1024 * 1024 * 1024)
+        try:
+            file_size = int(file_size)
+            chunk_size = int(request.data.get('chunk_size') or getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'file_size and chunk_size must be whole numbers of bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 < file_size <= max_file_size:
+            return Response(
+                {'error': f'file_size must be between 1 and {max_file_size} bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 < chunk_size <= max_chunk_size:
+            return Response(
+                {'error': f'chunk_size must be between 1 and {max_chunk_size} bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        checksum = str(request.data.get('checksum') or '').lower()
+        if checksum and not _is_sha256(checksum):
+            return Response(
+                {'error': 'checksum must be a hex SHA-256 digest'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        _expire_chunked_uploads()
+
+        chunked_upload = ChunkedUpload.objects.create(
+            customer=customer,
+            product=product,
+            file_type=file_type,
+            file_name=os.path.basename(file_name),
+            file_size=file_size,
+            chunk_size=chunk_size,
+            checksum=checksum,
+            force=str(request.data.get('force', '')).lower() == 'true',
+            uploaded_by=request.user if request.user.is_authenticated else None
+        )
+        return Response(_chunked_upload_status(chunked_upload), status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadDetailAPIView(APIView):
+    """Progress of a chunked upload, used to resume it; DELETE abandons it"""
+
+    def get(self, request, upload_id):
+        chunked_upload = get_object_or_404(ChunkedUpload, id=upload_id)
+        return Response(_chunked_upload_status(chunked_upload))
+
+    def delete(self, request, upload_id):
+        chunked_upload = get_object_or_404(ChunkedUpload, id=upload_id)
+        if chunked_upload.status == 'ACTIVE':
+            _discard_chunked_upload(chunked_upload, 'ABORTED')
+        return Response(_chunked_upload_status(chunked_upload))
+
+
+class ChunkedUploadChunkAPIView(APIView):
+    """Receive one chunk of a chunked upload"""
+
+    def put(self, request, upload_id, index):
+        """
+        Write chunk index, sent as the raw request body.
+
+        The body is streamed to its offset in the upload's temporary file, so
+        memory use does not depend on the chunk size. An optional
+        X-Chunk-Checksum header carries the chunk's SHA-256; on a mismatch the
+        chunk is rejected and should be sent again. Sending a chunk twice is
+        harmless, so a client that lost a response can simply retry.
+        """
+        chunked_upload = get_object_or_404(ChunkedUpload, id=upload_id)
+        if chunked_upload.status != 'ACTIVE':
+            return Response(
+                {'error': f'Upload is {chunked_upload.status.lower()} and accepts no more chunks'},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not 0 <= index < chunked_upload.total_chunks:
+            return Response(
+                {'error': f'Chunk index must be between 0 and {chunked_upload.total_chunks - 1}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        expected_length = chunked_upload.chunk_length(index)
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length != expected_length:
+            return Response(
+                {'error': f'Chunk {index} must be {expected_length} bytes, got {content_length}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        expected_checksum = request.META.get('HTTP_X_CHUNK_CHECKSUM', '').lower()
+        written, chunk_checksum = write_chunk(
+            chunked_upload_path(chunked_upload.id),
+            index * chunked_upload.chunk_size,
+            request.stream,
+            expected_length
+        )
+
+        error = None
+        if written != expected_length:
+            error = f'Chunk {index} was cut short: received {written} of {expected_length} bytes'
+        elif expected_checksum and expected_checksum != chunk_checksum:
+            error = f'Checksum mismatch for chunk {index}'
+
+        with transaction.atomic():
+            chunked_upload = ChunkedUpload.objects.select_for_update().get(id=upload_id)
+            received = set(chunked_upload.received_chunks)
+            # A failed rewrite may have overwritten a chunk received earlier
+            if error:
+                received.discard(index)
+            else:
+                received.add(index)
+            chunked_upload.received_chunks = sorted(received)
+            chunked_upload.save(update_fields=['received_chunks', 'updated_at'])
+
+        if error:
+            return Response({'error': error, 'index': index}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'index': index,
+            'checksum': chunk_checksum,
+            'received_chunks': len(chunked_upload.received_chunks),
+            'total_chunks': chunked_upload.total_chunks
+        })
+
+
+class ChunkedUploadCompleteAPIView(APIView):
+    """Finish a chunked upload and hand the file off for processing"""
+
+    def post(self, request, upload_id):
+        """
+        Verify the assembled file and process it like a single-request upload.
+
+        Every chunk must have been received. The file's SHA-256 is checked
+        against the checksum sent here or when the upload was initiated; on a
+        mismatch the received chunks are cleared so the client can send the file
+        again under the same upload_id. The response is the same as
+        FileUploadAPIView's, including duplicate detection.
+        """
+        with transaction.atomic():
+            chunked_upload = get_object_or_404(ChunkedUpload.objects.select_for_update(), id=upload_id)
+            if chunked_upload.status == 'COMPLETED' and chunked_upload.file_upload:
+                # Completing twice (e.g. a retried request) returns the upload already created
+                file_upload = chunked_upload.file_upload
+                return _upload_response(file_upload, True, chunked_upload.file_name, chunked_upload.file_size, chunked_upload.product)
+            if chunked_upload.status != 'ACTIVE':
+                return Response(
+                    {'error': f'Upload is {chunked_upload.status.lower()}'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            missing_chunks = chunked_upload.missing_chunks
+            if missing_chunks:
                 return Response({
-                    'success': False,
-                    'message': f'Error processing file: {str(processing_error)}',
-                    'file_upload_id': file_upload.id
-                })
-            
+                    'error': f'{len(missing_chunks)} chunks have not been received',
+                    'missing_chunks': missing_chunks
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            expected_checksum = str(request.data.get('checksum') or chunked_upload.checksum).lower()
+            temp_path = chunked_upload_path(chunked_upload.id)
+            content_hash, file_size = file_checksum(temp_path)
+
+            if file_size != chunked_upload.file_size or (expected_checksum and expected_checksum != content_hash):
+                chunked_upload.received_chunks = []
+                chunked_upload.save(update_fields=['received_chunks', 'updated_at'])
+                return Response({
+                    'error': (
+                        f'Assembled file does not match: expected {chunked_upload.file_size} bytes'
+                        f'{f" with SHA-256 {expected_checksum}" if expected_checksum else ""}, '
+                        f'got {file_size} bytes with SHA-256 {content_hash}. Send the chunks again.'
+                    ),
+                    'missing_chunks': chunked_upload.missing_chunks
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            file_path = store_file(temp_path, content_hash, os.path.splitext(chunked_upload.file_name)[1])
+            file_upload, duplicate = register_stored_upload(
+                chunked_upload.customer, chunked_upload.product, chunked_upload.file_type,
+                chunked_upload.file_name, file_path, content_hash, file_size,
+                user=chunked_upload.uploaded_by, force=chunked_upload.force
+            )
+            chunked_upload.status = 'COMPLETED'
+            chunked_upload.file_upload = file_upload
+            chunked_upload.save(update_fields=['status', 'file_upload', 'updated_at'])
+
+        # Processing starts only once the upload is committed
+        try:
+            return _upload_response(file_upload, duplicate, chunked_upload.file_name, file_size, chunked_upload.product)
         except Exception as e:
             return Response(
                 {'error': f'Error uploading file: {str(e)}'},
@@ -638,6 +1097,131 @@ class FileUploadAPIView(APIView):
             )
 
 
+def _chunked_upload_status(chunked_upload):
+    return {
+        'upload_id': str(chunked_upload.id),
+        'status': chunked_upload.status,
+        'file_name': chunked_upload.file_name,
+        'file_size': chunked_upload.file_size,
+        'chunk_size': chunked_upload.chunk_size,
+        'total_chunks': chunked_upload.total_chunks,
+        'received_chunks': len(chunked_upload.received_chunks),
+        'missing_chunks': chunked_upload.missing_chunks if chunked_upload.status == 'ACTIVE' else [],
+        'file_upload_id': chunked_upload.file_upload_id,
+        'chunk_url': f'/api/upload-file/chunked/{chunked_upload.id}/chunks/',
+        'complete_url': f'/api/upload-file/chunked/{chunked_upload.id}/complete/'
+    }
+
+
+def _is_sha256(value):
+    return len(value) == 64 and all(c in '0123456789abcdef' for c in value)
+
+
+def _discard_chunked_upload(chunked_upload, new_status):
+    temp_path = chunked_upload_path(chunked_upload.id)
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    chunked_upload.status = new_status
+    chunked_upload.received_chunks = []
+    chunked_upload.save(update_fields=['status', 'received_chunks', 'updated_at'])
+
+
+def _expire_chunked_uploads():
+    """Drop the temporary files of chunked uploads that stopped receiving chunks"""
+    hours = getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+    cutoff = timezone.now() - timedelta(hours=hours)
+    for chunked_upload in ChunkedUpload.objects.filter(status='ACTIVE', updated_at__lt=cutoff):
+        _discard_chunked_upload(chunked_upload, 'EXPIRED')
+
+
+class FileValidationAPIView(APIView):
+    """Preview how a file would be ingested, reading only its header and first rows"""
+
+    def post(self, request):
+        """
+        Validate a file's template without ingesting it.
+
+        The file is sent as 'file' with its 'file_type', or referenced by the
+        'upload_id' of a chunked upload whose chunks have all arrived (so a
+        large file can be checked before it is completed) or by a
+        'file_upload_id'. Only the header and the first 'nrows' rows are read;
+        see ExcelProcessor.validate_file for the report.
+        """
+        max_rows = getattr(settings, 'VALIDATE_PREVIEW_MAX_ROWS', 5000)
+        try:
+            nrows = int(request.data.get('nrows') or getattr(settings, 'VALIDATE_PREVIEW_ROWS', 100))
+        except (TypeError, ValueError):
+            nrows = 0
+        if not 0 < nrows <= max_rows:
+            return Response(
+                {'error': f'nrows must be between 1 and {max_rows}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        uploaded_file = request.FILES.get('file')
+        file_type = request.data.get('file_type')
+        upload_id = request.data.get('upload_id')
+        file_upload_id = request.data.get('file_upload_id')
+
+        if uploaded_file is not None:
+            if not uploaded_file.name.lower().endswith(ALLOWED_UPLOAD_EXTENSIONS):
+                return Response(
+                    {'error': 'Only Excel or CSV files (.xlsx, .xlsm, .xlsb, .xls, .csv) are allowed'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            file_name = uploaded_file.name
+        elif upload_id:
+            chunked_upload = get_object_or_404(ChunkedUpload, id=upload_id)
+            if chunked_upload.status != 'ACTIVE' or chunked_upload.missing_chunks:
+                return Response(
+                    {'error': 'Chunked upload must be active with every chunk received'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            file_path = chunked_upload_path(chunked_upload.id)
+            file_name = chunked_upload.file_name
+            file_type = file_type or chunked_upload.file_type
+        elif file_upload_id:
+            file_upload = get_object_or_404(FileUpload, id=file_upload_id)
+            file_path = file_upload.file_path
+            file_name = file_upload.file_name
+            file_type = file_type or file_upload.file_type
+        else:
+            return Response(
+                {'error': 'file, upload_id or file_upload_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if file_type not in dict(FileUpload.FILE_TYPE_CHOICES):
+            return Response(
+                {'error': 'Invalid file type. Supported types: BATCH_PERFORMANCE, VOLUMETRICS, SLA_TRACKING, BATCH_SCHEDULE'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        temp_path = None
+        try:
+            if uploaded_file is not None:
+                if hasattr(uploaded_file, 'temporary_file_path'):
+                    file_path = uploaded_file.temporary_file_path()
+                else:
+                    # Small uploads are held in memory; the readers need a path
+                    with tempfile.NamedTemporaryFile(delete=False) as destination:
+                        for chunk in uploaded_file.chunks():
+                            destination.write(chunk)
+                    file_path = temp_path = destination.name
+
+            report = ExcelProcessor.validate_file(file_path, file_type, nrows=nrows)
+            return Response({'file_name': file_name, **report})
+
+        except Exception as e:
+            return Response(
+                {'error': f'Error validating file: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
 class FileProcessingAPIView(APIView):
     """API view for processing existing files (legacy endpoint)"""
     
@@ -667,37 +1251,15 @@ class FileProcessingAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        if file_type not in dict(FileUpload.FILE_TYPE_CHOICES):
+            return Response(
+                {'error': 'Invalid file type'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         # Process file based on type
         try:
-            if file_type == 'BATCH_PERFORMANCE':
-                success, message = ExcelProcessor.process_batch_performance_file(file_path, customer_id)
-                
-                # Automatically trigger SLA analysis after successful batch performance upload
-                if success:
-                    try:
-                        from .utils import SLAAnalyzer
-                        sla_result = SLAAnalyzer.analyze_batch_performance_for_sla(
-                            customer_id=customer_id
-                        )
-                        # Append SLA analysis results to the message
-                        message += f" | SLA Analysis: {sla_result['message']}"
-                    except Exception as sla_error:
-                        # Don't fail the upload if SLA analysis fails, just log it
-                        message += f" | SLA Analysis Warning: {str(sla_error)}"
-                        
-            elif file_type == 'VOLUMETRICS':
-                success, message = ExcelProcessor.process_volumetrics_file(file_path, customer_id)
-            elif file_type == 'SLA_TRACKING':
-                success, message = ExcelProcessor.process_sla_tracking_file(file_path, customer_id)
-            elif file_type == 'BATCH_SCHEDULE':
-                success, message = ExcelProcessor.process_batch_schedule_file(file_path, customer_id)
-            else:
-                return Response(
-                    {'error': 'Invalid file type'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Create or update file upload record
+            # Create or update file upload record first, so the ingested rows can refer to it
             file_upload, created = FileUpload.objects.get_or_create(
                 customer=customer,
                 file_path=file_path,
@@ -705,16 +1267,16 @@ class FileProcessingAPIView(APIView):
                     'file_type': file_type,
                     'file_name': os.path.basename(file_path),
                     'file_size': os.path.getsize(file_path),
-                    'processed': success,
-                    'processing_log': message,
                     'uploaded_by': request.user if request.user.is_authenticated else None
                 }
             )
-            
-            if not created:
-                file_upload.processed = success
-                file_upload.processing_log = message
-                file_upload.save()
+
+            if file_upload.file_type != file_type:
+                file_upload.file_type = file_type
+                file_upload.save(update_fields=['file_type'])
+
+            # Same dispatch and bookkeeping as the task worker, so Tidal schedules take the enhanced loader here too
+            success, message = process_file_upload(file_upload)
             
             return Response({
                 'success': success,
@@ -144,4 +144,63 @@ EXCEL_DATA_PATHS = {
     'VOLUMETRICS': os.path.join(BASE_DIR, 'data', 'volumetrics'),
     'SLA_TRACKING': os.path.join(BASE_DIR, 'data', 'sla_tracking'),
     'BATCH_SCHEDULE': os.path.join(BASE_DIR, 'data', 'batch_schedule'),
-} 
\ No newline at end of file
+} 
+# Rows per bulk_create / transaction when ingesting Excel files
+INGESTION_BATCH_SIZE = int(os.getenv('INGESTION_BATCH_SIZE', '2000'))
+
+# Rows per chunk when streaming large .xlsx uploads through the openpyxl read-only reader
+EXCEL_STREAM_CHUNK_ROWS = int(os.getenv('EXCEL_STREAM_CHUNK_ROWS', '10000'))
+
+# Spreadsheet reader engine: 'auto', 'calamine', 'openpyxl', 'xlrd' or 'csv'.
+# 'auto' uses python-calamine when it is installed and falls back to openpyxl/xlrd.
+EXCEL_READER_ENGINE = os.getenv('EXCEL_READER_ENGINE', 'auto')
+
+# Files larger than this are read with a streaming engine so memory stays bounded
+EXCEL_STREAMING_THRESHOLD_MB = int(os.getenv('EXCEL_STREAMING_THRESHOLD_MB', '50'))
+
+# Process uploads in the background task worker (manage.py run_task_worker).
+# Set to False to process uploads inside the request as before.
+FILE_PROCESSING_ASYNC = os.getenv('FILE_PROCESSING_ASYNC', 'True').lower() == 'true'
+
+# Seconds the task worker sleeps when the queue is empty
+TASK_WORKER_POLL_INTERVAL = float(os.getenv('TASK_WORKER_POLL_INTERVAL', '2'))
+
+# Seconds between the heartbeats a worker records on the task it is running
+# (run_task_worker --requeue-stale requeues tasks whose heartbeat has stopped)
+TASK_HEARTBEAT_INTERVAL = float(os.getenv('TASK_HEARTBEAT_INTERVAL', '30'))
+
+# Worker processes used to ingest the files of a bulk upload (0 = one per CPU)
+BULK_UPLOAD_PROCESSES = int(os.getenv('BULK_UPLOAD_PROCESSES', '0'))
+
+# Maximum number of files accepted by one bulk upload request
+BULK_UPLOAD_MAX_FILES = int(os.getenv('BULK_UPLOAD_MAX_FILES', '100'))
+
+# Seconds manage.py ingest_watch waits between scans of EXCEL_DATA_PATHS
+INGEST_WATCH_POLL_INTERVAL = float(os.getenv('INGEST_WATCH_POLL_INTERVAL', '30'))
+
+# Resumable chunked uploads (upload-file/chunked/) for files above the request size limit.
+# Chunks are streamed to disk, so the chunk size only bounds the size of one request.
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = int(os.getenv('CHUNKED_UPLOAD_MAX_CHUNK_SIZE', str(16 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_FILE_SIZE = int(os.getenv('CHUNKED_UPLOAD_MAX_FILE_SIZE', str(2 * 1024 * 1024 * 1024)))
+
+# Hours after its last chunk that an unfinished chunked upload is discarded
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.getenv('CHUNKED_UPLOAD_EXPIRY_HOURS', '24'))
+
+# Data rows read by the upload-file/validate/ preview by default, and the most a request may ask for
+VALIDATE_PREVIEW_ROWS = int(os.getenv('VALIDATE_PREVIEW_ROWS', '100'))
+VALIDATE_PREVIEW_MAX_ROWS = int(os.getenv('VALIDATE_PREVIEW_MAX_ROWS', '5000'))
+
+# Run /api/sla-data/analyze/ as set-based SQL inside the database instead of job by job in Python.
+# Supported on SQLite and PostgreSQL; other databases keep the Python analysis.
+SLA_ANALYSIS_IN_DATABASE = os.getenv('SLA_ANALYSIS_IN_DATABASE', 'False').lower() == 'true'
+
+# Worker processes of manage.py analyze_sla, one (customer, product) at a time each (0 = one per CPU)
+SLA_ANALYSIS_PROCESSES = int(os.getenv('SLA_ANALYSIS_PROCESSES', '0'))
+
+# SLA risk evaluation of in-flight runs (manage.py evaluate_sla_risk): seconds between
+# evaluations, days of completed runs whose durations the projections are based on, and
+# hours after its start beyond which an unfinished run is taken as stale rather than in flight
+SLA_RISK_EVALUATION_INTERVAL = int(os.getenv('SLA_RISK_EVALUATION_INTERVAL', '60'))
+SLA_RISK_HISTORY_DAYS = int(os.getenv('SLA_RISK_HISTORY_DAYS', '30'))
+SLA_RISK_MAX_RUN_HOURS = int(os.getenv('SLA_RISK_MAX_RUN_HOURS', '48'))
@@ -0,0 +1,10 @@
+"""
+Test settings for Dashboard Project
+
+python manage.py test --settings=dashboard_project.settings_test
+"""
+
+from .settings import *
+
+# Tests run without collectstatic, so there is no manifest to look static file names up in
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
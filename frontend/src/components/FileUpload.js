@@ -20,7 +20,7 @@ import {
   Error as ErrorIcon,
 } from '@mui/icons-material';
 import { useDropzone } from 'react-dropzone';
-import { fileProcessingAPI, customerAPI } from '../services/api';
+import { fileProcessingAPI, fileUploadAPI, customerAPI } from '../services/api';
 import { toast } from 'react-toastify';
 
 const FileUpload = ({ onUploadSuccess }) => {
@@ -112,20 +112,28 @@ const FileUpload = ({ onUploadSuccess }) => {
       const response = await fileProcessingAPI.uploadFile(formData);
 
       clearInterval(progressInterval);
+
+      // Queued uploads are processed by the background worker; poll until it finishes
+      let result = response.data;
+      if (response.data.queued) {
+        setUploadProgress(0);
+        result = await waitForProcessing(response.data.file_upload_id);
+      }
+
       setUploadProgress(100);
 
       setProcessResult({
-        success: response.data.success,
-        message: response.data.message,
+        success: result.success,
+        message: result.message,
       });
 
-      if (response.data.success) {
+      if (result.success) {
         toast.success('File uploaded and processed successfully!');
         if (onUploadSuccess) {
-          onUploadSuccess(response.data);
+          onUploadSuccess(result);
         }
       } else {
-        toast.error(`Processing failed: ${response.data.message}`);
+        toast.error(`Processing failed: ${result.message}`);
       }
 
     } catch (error) {
@@ -140,6 +148,20 @@ const FileUpload = ({ onUploadSuccess }) => {
     }
   };
 
+  const waitForProcessing = async (fileUploadId) => {
+    for (;;) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      const { data } = await fileUploadAPI.getById(fileUploadId);
+
+      if (data.status === 'COMPLETED' || data.status === 'FAILED') {
+        return { ...data, file_upload_id: data.id, success: data.status === 'COMPLETED', message: data.processing_log };
+      }
+      if (data.rows_total) {
+        setUploadProgress(Math.min(99, Math.round((data.rows_read / data.rows_total) * 100)));
+      }
+    }
+  };
+
   const resetUpload = () => {
     setUploadedFile(null);
     setProcessResult(null);
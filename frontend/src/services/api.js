@@ -85,6 +85,8 @@ export const slaAPI = {
   delete: (id) => api.delete(`/sla-data/${id}/`),
   getSummary: (params = {}) => api.get('/sla-data/summary/', { params }),
   getCompletionTrends: (params = {}) => api.get('/sla-data/completion_trends/', { params }),
+  // In-flight runs projected to miss their SLA (params: customer, product, risk_level)
+  getAtRisk: (params = {}) => api.get('/sla-data/at_risk/', { params }),
 };
 
 // Batch Schedule APIs
@@ -111,6 +113,8 @@ export const fileUploadAPI = {
   create: (data) => api.post('/file-uploads/', data),
   update: (id, data) => api.put(`/file-uploads/${id}/`, data),
   delete: (id) => api.delete(`/file-uploads/${id}/`),
+  // Deletes the rows the upload wrote
+  rollback: (id) => api.post(`/file-uploads/${id}/rollback/`),
 };
 
 // File Processing APIs
@@ -121,6 +125,57 @@ export const fileProcessingAPI = {
       'Content-Type': 'multipart/form-data',
     },
   }),
+  // formData: 'file' and 'file_type' (or 'upload_id' of a chunked upload), optional 'nrows'
+  validateFile: (formData) => api.post('/upload-file/validate/', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  }),
+  // formData: repeated 'files' (Excel/CSV or .zip), customer_id, product and a JSON 'manifest' of file types
+  uploadFilesBulk: (formData) => api.post('/upload-file/bulk/', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  }),
+  // Resumable upload for large files: fields are customer_id, product and file_type.
+  // Pass the upload_id of an interrupted upload to send only its missing chunks.
+  uploadFileChunked: async (file, fields, { uploadId = null, onProgress = null, retries = 3 } = {}) => {
+    let upload;
+    if (uploadId) {
+      upload = (await api.get(`/upload-file/chunked/${uploadId}/`)).data;
+    } else {
+      upload = (await api.post('/upload-file/chunked/', {
+        ...fields,
+        file_name: file.name,
+        file_size: file.size,
+      })).data;
+    }
+
+    for (const index of upload.missing_chunks) {
+      const chunk = file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size);
+      const body = await chunk.arrayBuffer();
+      const digest = await crypto.subtle.digest('SHA-256', body);
+      const checksum = Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+
+      for (let attempt = 1; ; attempt += 1) {
+        try {
+          await api.put(`/upload-file/chunked/${upload.upload_id}/chunks/${index}/`, body, {
+            timeout: 120000,
+            headers: {
+              'Content-Type': 'application/octet-stream',
+              'X-Chunk-Checksum': checksum,
+            },
+          });
+          break;
+        } catch (error) {
+          if (attempt >= retries) throw error;
+        }
+      }
+      if (onProgress) onProgress({ uploadId: upload.upload_id, index, totalChunks: upload.total_chunks });
+    }
+
+    return api.post(`/upload-file/chunked/${upload.upload_id}/complete/`);
+  },
 };
 
 // Dashboard APIs
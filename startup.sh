@@ -13,5 +13,8 @@ fi
 # Run database migrations
 python backend/manage.py migrate --noinput || true
 
+# Start the background worker that processes uploaded files
+python backend/manage.py run_task_worker &
+
 # Start Gunicorn serving Django from the backend module
 exec gunicorn --chdir backend --bind=0.0.0.0 --workers=4 dashboard_project.wsgi 
\ No newline at end of file